@@ -0,0 +1,762 @@
+import asyncio
+import copy
+import functools
+import logging
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    TypeVar,
+    cast,
+)
+
+from rich.progress import track
+
+from sector import client, graph, logger, output, state
+from sector.cache import Entry, HttpCache, cache_key
+from sector.defaults import CACHE_TTL, CONCURRENCY
+from sector.github import (
+    COMPARE_PAGE_SIZE,
+    GRAPHQL_BATCH,
+    PREFETCH_BATCH,
+    RAW,
+    Data,
+    PrIndex,
+    ReleaseData,
+    Repo,
+    add_merged,
+    batched,
+    check_fast_forward,
+    contents_path,
+    csv_path,
+    graph_repos,
+    lookup_query,
+    lookup_results,
+    mapper,
+    parse_relate_images,
+    parse_release_yaml_to_repos,
+    pinned,
+    prefetch_lookups,
+    prs_by_commit,
+    prs_query,
+    pulls_path,
+    related_images,
+    release_data,
+    release_path,
+    report,
+    report_graph,
+    result_document,
+    sort_data,
+    uncached,
+    use_pulls,
+)
+from sector.instrument import recorder
+from sector.ratelimit import RateLimiter, resource_for
+
+try:
+    import httpx
+
+    HAS_HTTPX = True
+except ImportError:  # pragma: no cover
+    HAS_HTTPX = False
+
+log: logging.Logger = logger.get_logger("aio")
+
+T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+class AsyncGitHubClient:
+    """
+    The asyncio counterpart of GitHubClient.
+    Every request goes through one httpx connection pool and at most
+    `concurrency` of them are in flight at a time.
+    """
+
+    def __init__(
+        self,
+        base_url: str = client.API_URL,
+        concurrency: int = CONCURRENCY,
+        timeout: float = client.TIMEOUT,
+        retries: int = client.RETRIES,
+        cache: bool = False,
+        cache_ttl: float = CACHE_TTL,
+        refresh: bool = False,
+        owner: str | None = None,
+    ) -> None:
+        if not HAS_HTTPX:
+            raise ValueError("The async backend needs httpx, install sector[async]")
+        self.options: dict[str, Any] = {
+            "base_url": base_url,
+            "concurrency": concurrency,
+            "timeout": timeout,
+            "retries": retries,
+            "cache": cache,
+            "cache_ttl": cache_ttl,
+            "refresh": refresh,
+        }
+        # The clients of the owners which have a token of their own.
+        self.owners: dict[str, AsyncGitHubClient] = {}
+        self.base_url = base_url.rstrip("/")
+        self.cache = HttpCache() if cache else None
+        self.cache_ttl = cache_ttl
+        self.refresh = refresh
+        self.limiter = RateLimiter()
+        self.semaphore = asyncio.Semaphore(concurrency)
+        # Calls which are shared by the tasks of a run, see memoized.
+        self.calls: dict[Hashable, asyncio.Future[Any]] = {}
+        limits = httpx.Limits(
+            max_connections=concurrency, max_keepalive_connections=concurrency
+        )
+        # Connection errors are retried by the transport, responses by the rate limiter.
+        self.http = httpx.AsyncClient(
+            headers=client.set_headers(owner),
+            timeout=timeout,
+            follow_redirects=True,
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=retries),
+        )
+
+    async def __aenter__(self) -> "AsyncGitHubClient":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    def url(self, path: str) -> str:
+        if path.startswith(("https://", "http://")):
+            return path
+        return f"{self.base_url}{path}"
+
+    async def get(
+        self, path: str, immutable: bool = False, headers: dict[str, str] | None = None
+    ) -> "httpx.Response":
+        """GET a path from the API, using the cache the same way as GitHubClient.get."""
+        url = self.url(path)
+        headers = dict(headers or {})
+        if self.cache is None:
+            return await self.send("GET", url, headers=headers)
+
+        key = cache_key(url, headers)
+        entry = self.cache.get(key)
+        if entry is not None and not self.refresh and entry.fresh(self.cache_ttl):
+            log.debug(f"cache hit for {key}")
+            recorder.request(url, time.perf_counter(), 200, len(entry.body), "hit")
+            return cached_response(entry)
+
+        if entry is not None:
+            if entry.etag is not None:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified is not None:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        cache = "miss" if entry is None else "revalidate"
+        response = await self.send("GET", url, cache=cache, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            log.debug(f"cache revalidated for {key}")
+            self.cache.touch(key)
+            return cached_response(entry)
+        if response.status_code == 200:
+            self.cache.put(key, response, immutable)
+        return response
+
+    async def post(self, path: str, **kwargs: Any) -> "httpx.Response":
+        return await self.send("POST", self.url(path), **kwargs)
+
+    async def send(
+        self, method: str, url: str, cache: str = "off", **kwargs: Any
+    ) -> "httpx.Response":
+        resource = resource_for(url)
+        start = time.perf_counter()
+        attempt = 0
+        async with self.semaphore:
+            while True:
+                await self.limiter.acquire_async(resource)
+                response = await self.http.request(method, url, **kwargs)
+                self.limiter.update(response)
+                delay = self.limiter.backoff(response, attempt)
+                if delay is None:
+                    break
+                await self.limiter.wait_async(delay)
+                attempt += 1
+        size = len(response.content)
+        recorder.request(url, start, response.status_code, size, cache, attempt)
+        return response
+
+    def cached(self, path: str, headers: dict[str, str] | None = None) -> bool:
+        """Whether a GET of path would be answered by the cache, see GitHubClient.cached."""
+        if self.cache is None or self.refresh:
+            return False
+        entry = self.cache.get(cache_key(self.url(path), headers or {}))
+        return entry is not None and entry.fresh(self.cache_ttl)
+
+    async def graphql(self, query: str, variables: dict[str, Any]) -> Any:
+        response = await self.post(
+            "/graphql", json={"query": query, "variables": variables}
+        )
+        response.raise_for_status()
+        body = response.json()
+        errors = body.get("errors")
+        if errors:
+            log.warning(f"GraphQL query returned errors: {errors}")
+        if body.get("data") is None:
+            raise ValueError(f"GraphQL query failed: {errors}")
+        return body["data"]
+
+    def for_owner(self, owner: str) -> "AsyncGitHubClient":
+        """
+        The client to use for an owner, see client.get_client. An owner's own client
+        shares the calls and the requests in flight with this one.
+        """
+        if client.owner_token(owner) is None:
+            return self
+        name = owner.lower()
+        if name not in self.owners:
+            owned = AsyncGitHubClient(owner=owner, **self.options)
+            owned.calls = self.calls
+            owned.semaphore = self.semaphore
+            self.owners[name] = owned
+        return self.owners[name]
+
+    async def aclose(self) -> None:
+        for owned in self.owners.values():
+            await owned.aclose()
+        await self.http.aclose()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def cached_response(entry: Entry) -> "httpx.Response":
+    return httpx.Response(
+        200,
+        headers=entry.headers,
+        content=entry.body,
+        request=httpx.Request("GET", entry.url),
+    )
+
+
+_client: AsyncGitHubClient | None = None
+
+
+def connect(concurrency: int = CONCURRENCY) -> AsyncGitHubClient:
+    """Create a client from the options set with client.configure."""
+    global _client
+    options = {k: v for k, v in client.options().items() if k != "pool_size"}
+    log.debug(f"creating async GitHub client with {options=}")
+    _client = AsyncGitHubClient(concurrency=concurrency, **options)
+    return _client
+
+
+def current() -> AsyncGitHubClient | None:
+    """Return the most recently created client, if any."""
+    return _client
+
+
+def memoized(key: Callable[..., Hashable]) -> Callable[[F], F]:
+    """
+    Share a call between every task of a run, keyed on everything but the client.
+    Calls that are still in flight are awaited rather than repeated.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(gh: AsyncGitHubClient, *args: Any) -> Any:
+            call_key = (func.__name__, key(*args))
+            future = gh.calls.get(call_key)
+            if future is None:
+                future = asyncio.ensure_future(func(gh, *args))
+                gh.calls[call_key] = future
+            # Callers are free to change what they get back, so each gets a copy.
+            return copy.deepcopy(await asyncio.shield(future))
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def prime(
+    gh: AsyncGitHubClient, func: Callable[..., Any], key: Hashable, result: Any
+) -> None:
+    """Store the result of a memoized call, None is stored as a 404 for the call."""
+    call_key = (func.__name__, key)
+    if call_key in gh.calls:
+        return
+    future = asyncio.get_running_loop().create_future()
+    if result is None:
+        request = httpx.Request("GET", f"{gh.base_url}/{func.__name__}")
+        response = httpx.Response(404, request=request)
+        future.set_exception(
+            httpx.HTTPStatusError(
+                f"404 Not Found: {key}", request=request, response=response
+            )
+        )
+        # Only awaiting callers should see the error, it is not an unhandled one.
+        future.exception()
+    else:
+        future.set_result(result)
+    gh.calls[call_key] = future
+
+
+async def call(repo: str, func: Callable[..., Awaitable[T]], *args: Any) -> T:
+    """Attribute the requests made by the call to a repo, like Recorder.call."""
+    with recorder.span(repo):
+        return await func(*args)
+
+
+@memoized(key=lambda owner, repo: (owner, repo.name, repo.tag, None))
+async def get_release(gh: AsyncGitHubClient, owner: str, repo: Repo) -> ReleaseData:
+    log.info(f"Getting release data for {owner}/{repo}")
+    response = await gh.get(release_path(owner, repo), immutable=pinned(repo.tag))
+    response.raise_for_status()
+    return release_data(response.json())
+
+
+async def get_commits_between(
+    gh: AsyncGitHubClient,
+    owner: str,
+    repo: str,
+    base: str,
+    head: str,
+    fast_forward: bool = False,
+) -> AsyncIterator[str]:
+    """See github.get_commits_between."""
+    async for _, commits in compare_pages(gh, owner, repo, base, head, fast_forward):
+        for sha in commits:
+            yield sha
+
+
+async def compare_pages(
+    gh: AsyncGitHubClient,
+    owner: str,
+    repo: str,
+    base: str,
+    head: str,
+    fast_forward: bool = False,
+) -> AsyncIterator[tuple[int, list[str]]]:
+    """See github.compare_pages."""
+    log.info(f"Getting commits for {owner}/{repo} {base}...{head}")
+    url: str | None = (
+        f"/repos/{owner}/{repo}/compare/{base}...{head}?per_page={COMPARE_PAGE_SIZE}"
+    )
+    immutable = pinned(base) and pinned(head)
+    while url is not None:
+        response = await gh.get(url, immutable=immutable)
+        if fast_forward and response.status_code == 404:
+            raise ValueError(f"{base} is no longer in {owner}/{repo}")
+        response.raise_for_status()
+        body = response.json()
+        if fast_forward:
+            check_fast_forward(body, base, head)
+        commits = [commit["sha"] for commit in body["commits"]]
+        yield body.get("total_commits", len(commits)), commits
+        url = response.links.get("next", {}).get("url")
+
+
+async def abatched(items: AsyncIterator[T], size: int) -> AsyncIterator[list[T]]:
+    batch: list[T] = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def find_prs_for_commit(
+    gh: AsyncGitHubClient, owner: str, repo: str, sha: str
+) -> Any:
+    response = await gh.get(f"/repos/{owner}/{repo}/commits/{sha}/pulls")
+    response.raise_for_status()
+    return response.json()
+
+
+async def find_prs_for_commits(
+    gh: AsyncGitHubClient, owner: str, repo: str, shas: list[str]
+) -> dict[str, list[dict[str, Any]]]:
+    """Resolve the pull requests for many commits, with the GraphQL batches sent concurrently."""
+    log.info(f"Getting PRs for {len(shas)} commits in {owner}/{repo}")
+
+    async def lookup(batch: list[str]) -> dict[str, list[dict[str, Any]]]:
+        query, variables = prs_query(owner, repo, batch)
+        data = await gh.graphql(query, variables)
+        return prs_by_commit(batch, data["repository"])
+
+    prs: dict[str, list[dict[str, Any]]] = {}
+    for found in await asyncio.gather(
+        *(lookup(batch) for batch in batched(shas, GRAPHQL_BATCH))
+    ):
+        prs.update(found)
+    return prs
+
+
+@memoized(key=lambda owner, repo, file_path, ref: (owner, repo, ref, file_path))
+async def get_file_content(
+    gh: AsyncGitHubClient, owner: str, repo: str, file_path: str, ref: str
+) -> str:
+    log.info(f"Getting file content for {owner}/{repo}/{file_path} at {ref}")
+    url = contents_path(owner, repo, file_path, ref)
+    response = await gh.get(url, immutable=pinned(ref), headers=RAW)
+    response.raise_for_status()
+    return response.content.decode("utf-8")
+
+
+async def get_related_images(
+    gh: AsyncGitHubClient, owner: str, _repo: Repo
+) -> list[str]:
+    log.info(f"Getting the related images from {_repo.name}'s CSV")
+    ref = _repo.tag if _repo.tag is not None else "main"
+    try:
+        content = await get_file_content(
+            gh, owner, _repo.name, csv_path(_repo.name), ref
+        )
+    except httpx.HTTPStatusError as e:
+        log.debug(f"file was not found, {e}")
+        raise ValueError("file not found")
+    return related_images(content)
+
+
+async def get_operator_release_yaml(
+    gh: AsyncGitHubClient, owner: str, _repo: str, _version: str = "latest"
+) -> tuple[str, str]:
+    repo = Repo(_repo)
+    repo.tag = _version
+    log.info(f"Getting {repo} release.yaml")
+    try:
+        release = await get_release(gh, owner, repo)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            raise ValueError(f"No release found for {repo}")
+        raise
+    if not release.tag:
+        raise ValueError(f"No release found for {repo}")
+
+    try:
+        content = await get_file_content(
+            gh, owner, repo.name, "release.yaml", release.tag
+        )
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            raise ValueError(f"release.yaml not found in {repo} release {release.tag}")
+        raise
+    return release.tag, content
+
+
+async def process_repo(
+    gh: AsyncGitHubClient, owner: str, repo: Repo, detailed: bool = False
+) -> Data:
+    owner = repo.owned_by(owner)
+    gh = gh.for_owner(owner)
+    log.info(f"Processing data for {owner}/{repo.name}")
+    data = Data(
+        owner=owner, project=repo.name, github=await get_release(gh, owner, repo)
+    )
+    if detailed:
+        base = repo.tag if repo.tag is not None else data.github.tag
+        sha_list, prs_by_sha = await incremental_commit_prs(
+            gh, owner, repo.name, base, "main", data.github.date
+        )
+        data.github.commit_count = len(sha_list)
+        data.github.prs = list(PrIndex.build(sha_list, prs_by_sha).prs.values())
+    return data
+
+
+async def incremental_commit_prs(
+    gh: AsyncGitHubClient,
+    owner: str,
+    repo: str,
+    base: str,
+    head: str,
+    since: str = "",
+) -> tuple[list[str], dict[str, list[dict[str, Any]]]]:
+    """See github.incremental_commit_prs."""
+    store = state.current()
+    if store is None:
+        return await commit_prs(gh, owner, repo, base, head, since=since)
+
+    previous = store.get(owner, repo, base)
+    if previous is None:
+        sha_list, prs_by_sha = await commit_prs(
+            gh, owner, repo, base, head, since=since
+        )
+    else:
+        try:
+            new_shas, new_prs = await commit_prs(
+                gh, owner, repo, previous.head, head, True, since
+            )
+        except ValueError as e:
+            log.info(f"Recomputing {owner}/{repo}, {e}")
+            sha_list, prs_by_sha = await commit_prs(
+                gh, owner, repo, base, head, since=since
+            )
+        else:
+            log.info(f"{len(new_shas)} new commits in {owner}/{repo} since last run")
+            sha_list = previous.shas + new_shas
+            prs_by_sha = {**previous.prs, **new_prs}
+
+    store.record(owner, repo, base, sha_list, prs_by_sha)
+    return sha_list, prs_by_sha
+
+
+async def commit_prs(
+    gh: AsyncGitHubClient,
+    owner: str,
+    repo: str,
+    base: str,
+    head: str,
+    fast_forward: bool = False,
+    since: str = "",
+) -> tuple[list[str], dict[str, list[dict[str, Any]]]]:
+    """See github.commit_prs."""
+    pages = compare_pages(gh, owner, repo, base, head, fast_forward)
+    total, first = await anext(pages, (0, []))
+    commits = chain_pages(first, pages)
+    sha_list: list[str] = []
+    prs_by_sha: dict[str, list[dict[str, Any]]] = {}
+    if use_pulls(total, since):
+        # The merged PRs are listed while the other compare pages are read.
+        pulls = asyncio.ensure_future(merged_pulls(gh, owner, repo, head, since))
+        sha_list = [sha async for sha in commits]
+        prs_by_sha.update((sha, []) for sha in sha_list)
+        add_merged(prs_by_sha, await pulls)
+        return sha_list, prs_by_sha
+
+    # Later compare pages are fetched while earlier batches are resolved.
+    lookups = []
+    async for batch in abatched(commits, GRAPHQL_BATCH):
+        sha_list.extend(batch)
+        lookups.append(
+            asyncio.ensure_future(find_prs_for_commits(gh, owner, repo, batch))
+        )
+
+    for found in await asyncio.gather(*lookups):
+        prs_by_sha.update(found)
+    return sha_list, prs_by_sha
+
+
+async def chain_pages(
+    first: list[str], pages: AsyncIterator[tuple[int, list[str]]]
+) -> AsyncIterator[str]:
+    for sha in first:
+        yield sha
+    async for _, commits in pages:
+        for sha in commits:
+            yield sha
+
+
+async def merged_pulls(
+    gh: AsyncGitHubClient, owner: str, repo: str, head: str, since: str
+) -> list[dict[str, Any]]:
+    """See github.merged_pulls."""
+    log.info(f"Getting PRs merged into {owner}/{repo} {head} since {since}")
+    pulls: list[dict[str, Any]] = []
+    url: str | None = pulls_path(owner, repo, head)
+    while url is not None:
+        response = await gh.get(url)
+        response.raise_for_status()
+        page = response.json()
+        pulls.extend(page)
+        if not page or page[-1]["updated_at"] < since:
+            break
+        url = response.links.get("next", {}).get("url")
+    return pulls
+
+
+async def process_repos(
+    gh: AsyncGitHubClient,
+    owner: str,
+    repos: list[Repo],
+    detailed: bool,
+    progress: bool = False,
+    on_result: Callable[[Data], None] | None = None,
+) -> list[Data]:
+    """Process every repo at once, on_result is called for each one as it finishes."""
+    tasks = [
+        asyncio.ensure_future(call(str(repo), process_repo, gh, owner, repo, detailed))
+        for repo in repos
+    ]
+    completed: Iterable[Awaitable[Data]] = asyncio.as_completed(tasks)
+    if progress:
+        completed = track(completed, total=len(tasks), description="Processing...")
+    for next_done in completed:
+        data = await next_done
+        if on_result is not None:
+            on_result(data)
+    # Results are collected in submission order so sorting stays stable.
+    return [task.result() for task in tasks]
+
+
+async def info(
+    owner: str,
+    repos: list[Repo],
+    logger: logging.Logger,
+    _sort: str,
+    detailed: bool,
+    concurrency: int = CONCURRENCY,
+    fmt: str = output.TEXT,
+) -> None:
+    logger.info(f"starting async run with {concurrency} concurrent requests")
+    async with connect(concurrency) as gh:
+        await run_info(gh, owner, repos, _sort, detailed, fmt)
+
+
+async def run_info(
+    gh: AsyncGitHubClient,
+    owner: str,
+    repos: list[Repo],
+    _sort: str,
+    detailed: bool,
+    fmt: str,
+) -> None:
+    if fmt == output.NDJSON:
+        await process_repos(
+            gh,
+            owner,
+            repos,
+            detailed,
+            on_result=lambda d: output.write_record("release", output.data_record(d)),
+        )
+        return
+    data = await process_repos(gh, owner, repos, detailed, fmt == output.TEXT)
+    report(sort_data(data, _sort), _sort, detailed, fmt)
+
+
+async def result(
+    owner: str,
+    project: str,
+    log: logging.Logger,
+    config: dict[Any, Any],
+    _sort: str,
+    _version: str = "latest",
+    concurrency: int = CONCURRENCY,
+    max_depth: int | None = None,
+    fmt: str = output.TEXT,
+) -> None:
+    async with connect(concurrency) as gh:
+        root_repo = Repo(f"{project}")
+        try:
+            root_edges = await expand_root(
+                gh, owner, root_repo, config["mapper"], _version
+            )
+        except ValueError:
+            log.debug(f"Error trying to find CSV file for {project}")
+            exit(0)
+
+        dependency_graph = await graph.resolve_async(
+            root_repo,
+            root_edges,
+            lambda repo: call(str(repo), expand, gh, owner, repo, config["mapper"]),
+            max_depth,
+            prefetch=lambda repos: prefetch_files(gh, owner, repos),
+        )
+        repos = graph_repos(dependency_graph)
+
+        if fmt not in (output.TEXT, output.NDJSON):
+            data = sort_data(await process_repos(gh, owner, repos, True), _sort)
+            output.write_document(result_document(dependency_graph, data), fmt)
+            return
+
+        report_graph(log, dependency_graph, repos, fmt)
+        await run_info(gh, owner, repos, _sort, True, fmt)
+
+
+async def prefetch_files(gh: AsyncGitHubClient, owner: str, repos: list[Repo]) -> None:
+    """See github.prefetch_files, the batches of a level are sent concurrently."""
+    by_owner: dict[str, list[Repo]] = {}
+    for repo in repos:
+        by_owner.setdefault(repo.owned_by(owner), []).append(repo)
+    await asyncio.gather(
+        *(
+            prefetch_owner(gh.for_owner(repo_owner), repo_owner, owned)
+            for repo_owner, owned in by_owner.items()
+        )
+    )
+
+
+async def prefetch_owner(gh: AsyncGitHubClient, owner: str, repos: list[Repo]) -> None:
+    lookups = uncached(owner, prefetch_lookups(repos), gh.cached)
+    while lookups:
+        batches = list(batched(lookups, PREFETCH_BATCH))
+        try:
+            responses = await asyncio.gather(
+                *(gh.graphql(*lookup_query(owner, batch)) for batch in batches)
+            )
+        except (httpx.HTTPError, ValueError) as e:
+            # Anything that is not primed is fetched by expand itself.
+            log.warning(f"Prefetching files failed, {e}")
+            return
+        follow_up = []
+        for batch, data in zip(batches, responses):
+            found, more = lookup_results(owner, batch, data)
+            for item in found:
+                prime(gh, item.func, item.key, item.value)
+            follow_up.extend(more)
+        lookups = follow_up
+
+
+async def expand_root(
+    gh: AsyncGitHubClient,
+    owner: str,
+    root_repo: Repo,
+    mapping: dict[str, str],
+    _version: str,
+) -> list[graph.Edge]:
+    """See github.expand_root."""
+    owner = root_repo.owned_by(owner)
+    gh = gh.for_owner(owner)
+    try:
+        release_tag, content = await get_operator_release_yaml(
+            gh, owner, root_repo.name, _version
+        )
+        repos = parse_release_yaml_to_repos(content)
+        root_repo.tag = release_tag
+        source = graph.RELEASE_YAML
+    except ValueError:
+        log.debug(f"Error trying to find release.yaml for {root_repo.name}")
+        root_repo.tag = _version
+        release = await get_release(gh, owner, root_repo)
+        root_repo.tag = release.tag
+        images = await get_related_images(gh, owner, root_repo)
+        repos = parse_relate_images(log, images)
+        source = graph.CSV
+
+    return [graph.Edge(repo, source) for repo in mapper(mapping, repos)]
+
+
+async def expand(
+    gh: AsyncGitHubClient, owner: str, repo: Repo, mapping: dict[str, str]
+) -> list[graph.Edge]:
+    """See github.expand, the release.yaml and CSV are fetched concurrently."""
+    log.debug(f"trying to find details on {repo}")
+    owner = repo.owned_by(owner)
+    gh = gh.for_owner(owner)
+
+    async def from_release_yaml() -> list[graph.Edge]:
+        _, content = await get_operator_release_yaml(
+            gh, owner, repo.name, repo.tag or "latest"
+        )
+        return [
+            graph.Edge(r, graph.RELEASE_YAML)
+            for r in parse_release_yaml_to_repos(content)
+        ]
+
+    async def from_csv() -> list[graph.Edge]:
+        images = await get_related_images(gh, owner, repo)
+        return [graph.Edge(r, graph.CSV) for r in parse_relate_images(log, images)]
+
+    edges: list[graph.Edge] = []
+    for found in await asyncio.gather(
+        from_release_yaml(), from_csv(), return_exceptions=True
+    ):
+        if isinstance(found, ValueError):
+            log.debug(f"Error trying to find details for {repo.name}: {found}")
+        elif isinstance(found, BaseException):
+            raise found
+        else:
+            edges.extend(found)
+
+    mapper(mapping, [edge.repo for edge in edges])
+    return edges
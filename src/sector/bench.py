@@ -0,0 +1,335 @@
+import asyncio
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from sector import aio, client, github, logger
+from sector.defaults import JOBS
+from sector.instrument import category
+
+log: logging.Logger = logger.get_logger("bench")
+
+OWNER = "bench"
+ROOT = "bench-operator"
+MERGED = datetime(2024, 2, 1)
+TIMESTAMP = "%Y-%m-%dT%H:%M:%SZ"
+
+
+@dataclass
+class Corpus:
+    """
+    Recorded GitHub responses keyed by path, with the `ref` query kept for file contents.
+    `pulls` maps `owner/repo@sha` to the pull requests of a commit and answers GraphQL lookups.
+    """
+
+    routes: dict[str, Any] = field(default_factory=dict)
+    pulls: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    repos: list[str] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: Path) -> "Corpus":
+        with open(path) as f:
+            return cls(**json.load(f))
+
+    def dump(self, path: Path) -> None:
+        with open(path, "w") as f:
+            json.dump(asdict(self), f)
+
+    @classmethod
+    def generate(cls, repos: int, commits: int) -> "Corpus":
+        corpus = cls()
+        names = [ROOT] + [f"bench-{i}" for i in range(1, repos)]
+        corpus.repos = names
+        for i, name in enumerate(names):
+            release = {
+                "name": f"{name} v1.0.0",
+                "tag_name": "v1.0.0",
+                "published_at": f"2024-01-{i % 28 + 1:02d}T00:00:00Z",
+                "html_url": f"https://github.com/{OWNER}/{name}/releases/tag/v1.0.0",
+            }
+            base = f"/repos/{OWNER}/{name}"
+            corpus.routes[f"{base}/releases/latest"] = release
+            corpus.routes[f"{base}/releases/tags/v1.0.0"] = release
+
+            shas = [
+                hashlib.sha1(f"{name}-{j}".encode()).hexdigest() for j in range(commits)
+            ]
+            corpus.routes[f"{base}/compare/v1.0.0...main"] = {
+                "commits": [{"sha": sha} for sha in shas]
+            }
+            pulls = []
+            for j, sha in enumerate(shas):
+                # Every pull request has two commits.
+                number = j // 2 + 1
+                pr = {
+                    "id": i * 100000 + number,
+                    "title": f"{name} change {number}",
+                    "html_url": f"https://github.com/{OWNER}/{name}/pull/{number}",
+                }
+                corpus.pulls[f"{OWNER}/{name}@{sha}"] = [pr]
+                corpus.routes[f"{base}/commits/{sha}/pulls"] = [pr]
+                # The last commit of a pull request stands in for its merge commit.
+                if j % 2 == 1 or j == len(shas) - 1:
+                    merged_at = (MERGED + timedelta(minutes=number)).strftime(TIMESTAMP)
+                    pulls.append(
+                        {
+                            **pr,
+                            "merge_commit_sha": sha,
+                            "merged_at": merged_at,
+                            "updated_at": merged_at,
+                        }
+                    )
+            # Listed from the most recently updated, down to one merged before the release.
+            pulls.reverse()
+            pulls.append(
+                {
+                    "id": i * 100000,
+                    "title": f"{name} change 0",
+                    "html_url": f"https://github.com/{OWNER}/{name}/pull/0",
+                    "merge_commit_sha": hashlib.sha1(
+                        f"{name}-merged".encode()
+                    ).hexdigest(),
+                    "merged_at": "2023-12-01T00:00:00Z",
+                    "updated_at": "2023-12-01T00:00:00Z",
+                }
+            )
+            corpus.routes[f"{base}/pulls"] = pulls
+
+        dependencies = "".join(f"  {name}: 1.0.0\n" for name in names[1:])
+        corpus.routes[f"/repos/{OWNER}/{ROOT}/contents/release.yaml?ref=v1.0.0"] = {
+            "content": base64.b64encode(
+                f"dependencies:\n{dependencies}".encode()
+            ).decode()
+        }
+        return corpus
+
+
+class FixtureServer:
+    """Local stand-in for the GitHub API which replays a corpus with injected latency."""
+
+    def __init__(self, corpus: Corpus, latency: float = 0.0) -> None:
+        self.corpus = corpus
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self, category: str) -> None:
+        with self._lock:
+            self.requests[category] += 1
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                time.sleep(server.latency)
+                accept = self.headers.get("Accept", "")
+                status, body, headers = server.route(self.path, accept)
+                self.reply(status, body, headers)
+
+            def do_POST(self) -> None:
+                time.sleep(server.latency)
+                length = int(self.headers.get("Content-Length", 0))
+                status, body = server.graphql(json.loads(self.rfile.read(length)))
+                self.reply(status, body, {})
+
+            def reply(self, status: int, body: Any, headers: dict[str, str]) -> None:
+                raw = isinstance(body, bytes)
+                data = body if raw else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header(
+                    "Content-Type", "text/plain" if raw else "application/json"
+                )
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def route(self, target: str, accept: str = "") -> tuple[int, Any, dict[str, str]]:
+        split = urlsplit(target)
+        query = parse_qs(split.query)
+        path = split.path
+        self.count(category(path))
+        key = path if "ref" not in query else f"{path}?ref={query['ref'][0]}"
+        if key not in self.corpus.routes:
+            return 404, {"message": "Not Found"}, {}
+
+        body = self.corpus.routes[key]
+        headers: dict[str, str] = {}
+        if (
+            accept.endswith(".raw+json")
+            and isinstance(body, dict)
+            and "content" in body
+        ):
+            return 200, base64.b64decode(body["content"]), headers
+        if "per_page" in query:
+            per_page = int(query["per_page"][0])
+            page = int(query.get("page", ["1"])[0])
+            items = body["commits"] if isinstance(body, dict) else body
+            if page * per_page < len(items):
+                next_query = urlencode({**query, "page": [page + 1]}, doseq=True)
+                headers["Link"] = f'<{self.url}{path}?{next_query}>; rel="next"'
+            total = len(items)
+            items = items[(page - 1) * per_page : page * per_page]
+            if isinstance(body, dict):
+                body = {**body, "total_commits": total, "commits": items}
+            else:
+                body = items
+        return 200, body, headers
+
+    def graphql(self, request: dict[str, Any]) -> tuple[int, Any]:
+        self.count("graphql")
+        variables = request["variables"]
+        if "associatedPullRequests" not in request["query"]:
+            return 200, {"data": self.lookups(variables)}
+        repo = f"{variables['owner']}/{variables['repo']}"
+        repository = {
+            alias: {
+                "associatedPullRequests": {
+                    "nodes": self.corpus.pulls.get(f"{repo}@{sha}", [])
+                }
+            }
+            for alias, sha in variables.items()
+            if alias not in ("owner", "repo")
+        }
+        return 200, {"data": {"repository": repository}}
+
+    def lookups(self, variables: dict[str, Any]) -> dict[str, Any]:
+        """Answer a github.lookup_query, every field that can be answered is included."""
+        owner = variables["owner"]
+        data: dict[str, Any] = {}
+        for name_var, name in variables.items():
+            if not name_var.startswith("n"):
+                continue
+            i = name_var[1:]
+            base = f"/repos/{owner}/{name}"
+            tag = variables.get(f"t{i}")
+            release = self.corpus.routes.get(
+                f"{base}/releases/tags/{tag}" if tag else f"{base}/releases/latest"
+            )
+            repository: dict[str, Any] = {"release": None}
+            if release is not None:
+                repository["release"] = {
+                    "name": release["name"],
+                    "tagName": release["tag_name"],
+                    "publishedAt": release["published_at"],
+                    "url": release["html_url"],
+                }
+            for file_var, expression in variables.items():
+                if not file_var.startswith(f"f{i}_"):
+                    continue
+                ref, path = expression.split(":", 1)
+                contents = self.corpus.routes.get(f"{base}/contents/{path}?ref={ref}")
+                repository[f"f{file_var.split('_')[1]}"] = (
+                    None
+                    if contents is None
+                    else {
+                        "text": base64.b64decode(contents["content"]).decode(),
+                        "isTruncated": False,
+                    }
+                )
+            data[f"r{i}"] = repository
+        return data
+
+
+@dataclass
+class Result:
+    scenario: str
+    repos: int
+    commits: int
+    seconds: float
+    requests: int
+    peak_memory: int
+    requests_by_category: dict[str, int]
+
+
+@contextlib.contextmanager
+def pointed_at(server: FixtureServer, jobs: int) -> Iterator[None]:
+    """Send the client to the fixture server, which does not need a real token."""
+    token = os.environ.setdefault("GITHUB_TOKEN", "bench")
+    saved = client.options()
+    client.configure(base_url=server.url, cache=False, pool_size=max(jobs, 4))
+    try:
+        yield
+    finally:
+        client.restore(saved)
+        if token == "bench":
+            del os.environ["GITHUB_TOKEN"]
+
+
+def run(
+    scenario: str, corpus: Corpus, latency: float = 0.0, jobs: int = JOBS
+) -> Result:
+    commits = max(
+        (len(body["commits"]) for k, body in corpus.routes.items() if "/compare/" in k),
+        default=0,
+    )
+    with FixtureServer(corpus, latency) as server, pointed_at(server, jobs):
+        repos = [github.Repo(name) for name in corpus.repos]
+        tracemalloc.start()
+        start = time.perf_counter()
+        # Only the work is measured, the rendered output is thrown away.
+        with contextlib.redirect_stdout(io.StringIO()):
+            if scenario == "future":
+                github.info(OWNER, repos, log, "time", False, jobs)
+            elif scenario == "future-detailed":
+                github.info(OWNER, repos, log, "time", True, jobs)
+            elif scenario == "current":
+                github.result(OWNER, ROOT, log, {"mapper": {}}, "time", "latest", jobs)
+            elif scenario == "future-detailed-async":
+                asyncio.run(aio.info(OWNER, repos, log, "time", True))
+            elif scenario == "current-async":
+                asyncio.run(aio.result(OWNER, ROOT, log, {"mapper": {}}, "time"))
+            else:
+                raise ValueError(f"Unknown scenario {scenario}")
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return Result(
+        scenario=scenario,
+        repos=len(corpus.repos),
+        commits=commits,
+        seconds=seconds,
+        requests=sum(server.requests.values()),
+        peak_memory=peak,
+        requests_by_category=dict(server.requests),
+    )
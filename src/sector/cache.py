@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from sector import logger
+from sector.ratelimit import Response
+
+log: logging.Logger = logger.get_logger("cache")
+
+
+def cache_dir() -> Path:
+    base = os.getenv("XDG_CACHE_HOME", "")
+    if len(base) == 0:
+        return Path.home() / ".cache" / "sector"
+    return Path(base) / "sector"
+
+
+def cache_key(url: str, headers: dict[str, str]) -> str:
+    """The same url fetched with another media type is cached on its own."""
+    return url if "Accept" not in headers else f"{headers['Accept']} {url}"
+
+
+class CachedResponse(requests.Response):
+    """A response rebuilt from the on-disk cache."""
+
+    from_cache = True
+
+
+@dataclass
+class Entry:
+    url: str
+    etag: str | None
+    last_modified: str | None
+    headers: dict[str, str]
+    body: bytes
+    stored_at: float
+    immutable: bool
+
+    def fresh(self, ttl: float) -> bool:
+        return self.immutable or time.time() - self.stored_at < ttl
+
+    def response(self) -> CachedResponse:
+        response = CachedResponse()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.encoding = "utf-8"
+        return response
+
+
+class HttpCache:
+    """URL keyed store of response bodies along with their validators."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        if path is None:
+            path = cache_dir() / "http.sqlite"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        log.debug(f"using http cache at {path}")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT, etag TEXT, last_modified TEXT, "
+                "headers TEXT, body BLOB, stored_at REAL, immutable INTEGER)"
+            )
+
+    def get(self, key: str) -> Entry | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, etag, last_modified, headers, body, stored_at, immutable "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        url, etag, last_modified, headers, body, stored_at, immutable = row
+        return Entry(
+            url=url,
+            etag=etag,
+            last_modified=last_modified,
+            headers=json.loads(headers),
+            body=body,
+            stored_at=stored_at,
+            immutable=bool(immutable),
+        )
+
+    def put(self, key: str, response: Response, immutable: bool) -> None:
+        headers = dict(response.headers)
+        # The body is stored decoded, so the transfer headers no longer apply.
+        for name in ("Content-Encoding", "Content-Length", "Transfer-Encoding"):
+            headers.pop(name, None)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    str(response.url),
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    json.dumps(headers),
+                    response.content,
+                    time.time(),
+                    int(immutable),
+                ),
+            )
+
+    def touch(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key)
+            )
+
+    def invalidate(self, fragment: str) -> int:
+        """Drop the responses which are not immutable and have fragment in their url, in any case."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE immutable = 0 AND instr(lower(url), lower(?)) > 0",
+                (fragment,),
+            )
+        log.debug(f"dropped {cursor.rowcount} responses for {fragment}")
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
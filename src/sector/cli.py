@@ -1,26 +1,215 @@
+import logging
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+
 import click
+from click.core import ParameterSource
 from rich import print
 from rich_click import RichGroup
 
-from sector import configuration, github, logger
+from sector import __version__, defaults, logger, output
+from sector.instrument import recorder
+
+if TYPE_CHECKING:
+    from sector.github import Repo
+    from sector.snapshot import Snapshot
+
+# The GitHub clients pull in requests, yaml, httpx and most of rich, so they are imported by
+# the commands that use them rather than here. This keeps `sector --help` fast.
 
 
 @click.group(cls=RichGroup)
-@click.option("--debug", is_flag=True, help="Enable debug logs.")
+@click.option(
+    "--debug", is_flag=True, help=f"Enable debug logs, written to {logger.LOG_FILE}."
+)
+@click.option(
+    "--log-file",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the logs to this file.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Do not read or write the local cache of GitHub responses.",
+)
+@click.option(
+    "--refresh",
+    is_flag=True,
+    help="Revalidate every cached GitHub response, including pinned tags.",
+)
+@click.option(
+    "--cache-ttl",
+    default=defaults.CACHE_TTL,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help="Seconds before a cached response for a branch or 'latest' is revalidated.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Keep the commits and PRs found by detailed runs, and only look up what landed on main since the last run.",
+)
+@click.option(
+    "--no-daemon",
+    is_flag=True,
+    help="Do not ask a running `sector serve` for the answer.",
+)
+@click.option(
+    "--stats",
+    is_flag=True,
+    help="Print a summary of the GitHub API calls and the time spent on each project.",
+)
+@click.option(
+    "--trace",
+    "trace_path",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write a Chrome trace event file of the GitHub API calls.",
+)
 @click.pass_context
-def cli(ctx: click.Context, debug: bool) -> None:
-    logger.configure(debug)
+def cli(
+    ctx: click.Context,
+    debug: bool,
+    log_file: str | None,
+    no_cache: bool,
+    refresh: bool,
+    cache_ttl: int,
+    incremental: bool,
+    no_daemon: bool,
+    stats: bool,
+    trace_path: str | None,
+) -> None:
+    logger.configure(debug, log_file)
+    recorder.enabled = stats or trace_path is not None
+    if incremental:
+        from sector import state
+
+        state.enable()
+        ctx.call_on_close(state.disable)
+    ctx.call_on_close(print_rate_limit)
+    if stats:
+        ctx.call_on_close(print_stats)
+    if trace_path is not None:
+        ctx.call_on_close(lambda: recorder.write_trace(trace_path))
     ctx.ensure_object(dict)
     ctx.obj["DEBUG"] = debug
+    # The client is configured by the commands which use it, so `<command> --help` stays fast.
+    ctx.obj["CLIENT"] = {
+        "cache": not no_cache,
+        "cache_ttl": cache_ttl,
+        "refresh": refresh,
+    }
+    # The daemon keeps its own cache and state, so it is not asked when these are changed.
+    ctx.obj["DAEMON"] = not (no_daemon or no_cache or refresh or incremental)
     if debug:
         print("Debug mode is ON")
 
 
+def configure_client(ctx: click.Context, jobs: int) -> None:
+    """Configure the GitHub clients with the options given to `sector` and a pool for jobs."""
+    from sector import client
+
+    options = ctx.obj.get("CLIENT", {}) if ctx.obj is not None else {}
+    client.configure(pool_size=max(defaults.POOL_SIZE, jobs), **options)
+
+
+def print_rate_limit() -> None:
+    from rich.console import Console
+
+    # The clients are only imported by the commands which used them.
+    client = sys.modules.get("sector.client")
+    if client is None:
+        return
+    gh: Any = client.current()
+    owners: dict[str, Any] = client.owners()
+    # The async backend is only imported when it was used.
+    aio = sys.modules.get("sector.aio")
+    if aio is not None and aio.current() is not None:
+        gh = aio.current()
+        owners = gh.owners
+    if gh is None:
+        return
+    # Each owner with its own token has a rate limit of its own.
+    for owner, limited in [(None, gh), *owners.items()]:
+        summary = limited.limiter.summary()
+        if owner is not None:
+            summary = f"{owner}: {summary}"
+        logger.get_logger("cli").info(summary)
+        Console(stderr=True).print(f"[dim]{summary}[/dim]")
+
+
+def ask_daemon(ctx: click.Context, kind: str, query: dict[str, Any]) -> Any | None:
+    """Return the answer of a running `sector serve`, None when there is none to ask."""
+    if ctx.obj is None or not ctx.obj.get("DAEMON"):
+        return None
+    from sector import server
+
+    connection = server.find()
+    if connection is None:
+        return None
+    try:
+        return connection.ask(kind, query)
+    except server.Unavailable as e:
+        logger.get_logger("cli").warning(f"{e}, answering without it")
+        return None
+
+
+def take_snapshot(
+    document: Any | None, query: dict[str, Any], log: logging.Logger, jobs: int
+) -> "Snapshot":
+    """The snapshot of a `current` answer from the daemon, or resolved here when there is none."""
+    from sector import snapshot
+
+    if document is None:
+        return snapshot.capture(
+            query["owner"],
+            query["project"],
+            log,
+            {"mapper": query["mapper"]},
+            query["version"],
+            jobs,
+            query["max_depth"],
+        )
+    return snapshot.Snapshot(
+        query["owner"],
+        query["project"],
+        query["version"],
+        output.read_graph(document["graph"]),
+        [output.read_data(r) for r in document["repos"]],
+    )
+
+
+def snapshot_suffix(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> str | None:
+    """Only accept a snapshot path which diff will also read as a snapshot."""
+    from sector import snapshot
+
+    if value is not None and not snapshot.is_snapshot(value):
+        raise click.BadParameter(f"must end in {' or '.join(snapshot.SUFFIXES)}")
+    return value
+
+
+def print_stats() -> None:
+    from rich.console import Console
+
+    console = Console(stderr=True)
+    console.print(recorder.endpoint_table())
+    console.print(recorder.repo_table())
+
+
 @cli.command()
 @click.option(
     "--owner",
-    default="kuadrant",
-    help="Set the owner/org used in GitHub",
+    "owners",
+    multiple=True,
+    default=("kuadrant",),
+    help="Set the owner/org used in GitHub. This can be used multiple times, "
+    "the first is used for projects which do not name an owner and `--all`, `--topic` "
+    "and `--pattern` look through every owner at once.",
     show_default=True,
     type=str,
 )
@@ -41,9 +230,26 @@ def cli(ctx: click.Context, debug: bool) -> None:
     ),
     help="Look up information for a project. This can be used multiple times."
     "When used with `--detailed` adding `@<tag>` list details all the way back to that release"
-    "Accepted formats <project> | <project>@<tag>",
+    "Accepted formats <project> | <project>@<tag> | <owner>/<project>@<tag>",
     show_default=True,
 )
+@click.option(
+    "--all",
+    "all_repos",
+    is_flag=True,
+    help="Look up every repo of the owner which has a release, instead of the default projects.",
+)
+@click.option(
+    "--topic",
+    "topics",
+    multiple=True,
+    help="Look up the owner's repos with this topic. This can be used multiple times.",
+)
+@click.option(
+    "--pattern",
+    default=None,
+    help="Look up the owner's repos with a name matching this glob, e.g. '*-operator'.",
+)
 @click.option(
     "--sort",
     "_sort",
@@ -59,17 +265,114 @@ def cli(ctx: click.Context, debug: bool) -> None:
     help="Display more details about the projects. "
     "This requires a number of calls to the github api and can be very slow.",
 )
-def future(owner: str, project: tuple[str], _sort: str, detailed: bool) -> None:
+@click.option(
+    "-j",
+    "--jobs",
+    default=defaults.JOBS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of projects to process in parallel.",
+)
+@click.option(
+    "--backend",
+    default=defaults.THREADS,
+    type=click.Choice(defaults.BACKENDS, case_sensitive=False),
+    show_choices=True,
+    show_default=True,
+    help="Make the GitHub calls from a thread pool, or from one asyncio event loop (needs httpx).",
+)
+@click.option(
+    "--concurrency",
+    default=defaults.CONCURRENCY,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Maximum number of GitHub requests in flight with the async backend.",
+)
+@click.option(
+    "--pr-strategy",
+    default=defaults.AUTO,
+    type=click.Choice(defaults.PR_STRATEGIES, case_sensitive=False),
+    show_choices=True,
+    show_default=True,
+    help="Find the PRs of the commits one batch at a time, or from the PRs merged since the release. "
+    "'auto' lists the merged PRs when a project has many commits.",
+)
+@click.option(
+    "-o",
+    "--output",
+    "fmt",
+    default=output.TEXT,
+    type=click.Choice(output.FORMATS, case_sensitive=False),
+    show_choices=True,
+    show_default=True,
+    help="Output format. 'ndjson' writes one record per project as soon as it is processed.",
+)
+@click.pass_context
+def future(
+    ctx: click.Context,
+    owners: tuple[str, ...],
+    project: tuple[str],
+    all_repos: bool,
+    topics: tuple[str],
+    pattern: str | None,
+    _sort: str,
+    detailed: bool,
+    jobs: int,
+    backend: str,
+    concurrency: int,
+    pr_strategy: str,
+    fmt: str,
+) -> None:
     """
     List the information about the different projects.
+    With `--all`, `--topic` or `--pattern` the projects are discovered from the owner's repos,
+    along with any given with `--project`.
     GITHUB_TOKEN is a required envoriment variable
     """
+    import asyncio
+    import itertools
+
+    from sector import github
+
     log = logger.get_logger("cli")
     log.info("Running 'sector info'")
     log.debug(f"{locals()=}")
+    configure_client(ctx, jobs)
+    github.pr_strategy = pr_strategy
+    owner = owners[0]
     try:
-        _project = [github.Repo(p) for p in project]
-        github.info(owner, _project, log, _sort, detailed)
+        _project: Iterable[Repo] = [github.Repo(p) for p in project]
+        discover = all_repos or topics or pattern is not None
+        query = {"owner": owner, "projects": list(project), "detailed": detailed}
+        # The daemon finds the PRs with the default strategy.
+        asked = not discover and pr_strategy == defaults.AUTO
+        document = ask_daemon(ctx, "future", query) if asked else None
+        if document is not None:
+            data = [output.read_data(r) for r in document["repos"]]
+            github.report(github.sort_data(data, _sort), _sort, detailed, fmt)
+            return
+        if discover:
+            explicit = []
+            if ctx.get_parameter_source("project") == ParameterSource.COMMANDLINE:
+                explicit = list(_project)
+            names = {(repo.owned_by(owner), repo.name) for repo in explicit}
+            # Discovered repos are processed while the later pages are listed.
+            _project = itertools.chain(
+                explicit,
+                (
+                    repo
+                    for repo in github.discover_owners(list(owners), topics, pattern)
+                    if (repo.owned_by(owner), repo.name) not in names
+                ),
+            )
+        if backend == defaults.ASYNC:
+            from sector import aio
+
+            asyncio.run(
+                aio.info(owner, list(_project), log, _sort, detailed, concurrency, fmt)
+            )
+        else:
+            github.info(owner, _project, log, _sort, detailed, jobs, fmt)
     except ValueError as e:
         log.exception(e)
         print(e)
@@ -88,7 +391,7 @@ def future(owner: str, project: tuple[str], _sort: str, detailed: bool) -> None:
     "--project",
     "project",
     default="kuadrant-operator",
-    help="Set the project at the top of the chain."
+    help="Set the project at the top of the chain, as <project> or <owner>/<project>."
     "This project needs to have a `release.yaml` in the root of the project",
     show_default=True,
     type=str,
@@ -118,21 +421,144 @@ def future(owner: str, project: tuple[str], _sort: str, detailed: bool) -> None:
     show_default=True,
     help="Set the version to look up the details on. The 'latest' tag means the latest release version, and not the main branch",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    default=defaults.JOBS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of projects to process in parallel.",
+)
+@click.option(
+    "--depth",
+    "max_depth",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Limit how many levels of dependencies are resolved. There is no limit by default.",
+)
+@click.option(
+    "--backend",
+    default=defaults.THREADS,
+    type=click.Choice(defaults.BACKENDS, case_sensitive=False),
+    show_choices=True,
+    show_default=True,
+    help="Make the GitHub calls from a thread pool, or from one asyncio event loop (needs httpx).",
+)
+@click.option(
+    "--concurrency",
+    default=defaults.CONCURRENCY,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Maximum number of GitHub requests in flight with the async backend.",
+)
+@click.option(
+    "--pr-strategy",
+    default=defaults.AUTO,
+    type=click.Choice(defaults.PR_STRATEGIES, case_sensitive=False),
+    show_choices=True,
+    show_default=True,
+    help="Find the PRs of the commits one batch at a time, or from the PRs merged since the release. "
+    "'auto' lists the merged PRs when a project has many commits.",
+)
+@click.option(
+    "-o",
+    "--output",
+    "fmt",
+    default=output.TEXT,
+    type=click.Choice(output.FORMATS, case_sensitive=False),
+    show_choices=True,
+    show_default=True,
+    help="Output format. 'ndjson' writes one record per project as soon as it is processed.",
+)
+@click.option(
+    "--snapshot",
+    "snapshot_path",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    callback=snapshot_suffix,
+    help="Report the graph saved in a snapshot file, without calling GitHub.",
+)
+@click.option(
+    "--save-snapshot",
+    "save_path",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+    callback=snapshot_suffix,
+    help="Save the resolved graph and the details of its repos to a snapshot file, ending in .jsonl or .jsonl.gz.",
+)
+@click.pass_context
 def current(
-    owner: str, project: str, config_path: str, _sort: str, _version: str
+    ctx: click.Context,
+    owner: str,
+    project: str,
+    config_path: str,
+    _sort: str,
+    _version: str,
+    jobs: int,
+    max_depth: int | None,
+    backend: str,
+    concurrency: int,
+    pr_strategy: str,
+    fmt: str,
+    snapshot_path: str | None,
+    save_path: str | None,
 ) -> None:
     """
     Get the break down of what is in the current released version of the project and its dependencies.
     This includes fetching the release.yaml file for the latest kuadrant-operator release.
     GITHUB_TOKEN is a required environment variable.
     """
+    import asyncio
+
+    from sector import configuration, github, snapshot
+
     log = logger.get_logger("cli")
     log.info("Running 'sector result'")
     log.debug(f"{locals()=}")
 
+    configure_client(ctx, jobs)
+    github.pr_strategy = pr_strategy
     try:
+        if snapshot_path is not None:
+            saved = snapshot.read(snapshot_path)
+            github.report_result(log, saved.graph, saved.data, _sort, fmt)
+            return
         _config = configuration.load(config_path)
-        github.result(owner, project, log, _config, _sort, _version)
+        query = {
+            "owner": owner,
+            "project": project,
+            "mapper": _config["mapper"],
+            "version": _version,
+            "max_depth": max_depth,
+        }
+        document = None
+        if pr_strategy == defaults.AUTO:
+            document = ask_daemon(ctx, "current", query)
+        if document is not None or save_path is not None:
+            saved = take_snapshot(document, query, log, jobs)
+            if save_path is not None:
+                snapshot.write(save_path, saved)
+            github.report_result(log, saved.graph, saved.data, _sort, fmt)
+        elif backend == defaults.ASYNC:
+            from sector import aio
+
+            asyncio.run(
+                aio.result(
+                    owner,
+                    project,
+                    log,
+                    _config,
+                    _sort,
+                    _version,
+                    concurrency,
+                    max_depth,
+                    fmt,
+                )
+            )
+        else:
+            github.result(
+                owner, project, log, _config, _sort, _version, jobs, max_depth, fmt
+            )
 
     except ValueError as e:
         log.exception(e)
@@ -142,5 +568,300 @@ def current(
         print(f"[bold red]Unexpected error:[/bold red] {e}")
 
 
+@cli.command()
+@click.argument("old")
+@click.argument("new")
+@click.option(
+    "--owner",
+    default="kuadrant",
+    help="Set the owner/org used in GitHub",
+    show_default=True,
+    type=str,
+)
+@click.option(
+    "-p",
+    "--project",
+    "project",
+    default="kuadrant-operator",
+    help="Set the project at the top of the chain, as <project> or <owner>/<project>.",
+    show_default=True,
+    type=str,
+)
+@click.option(
+    "-c",
+    "--configuration-file",
+    "config_path",
+    default="./config.toml",
+    help="Set the path to a configuration file which is needed for mapper some elements within the setup",
+    show_default=True,
+    type=str,
+)
+@click.option(
+    "-j",
+    "--jobs",
+    default=defaults.JOBS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of projects to process in parallel.",
+)
+@click.option(
+    "--depth",
+    "max_depth",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Limit how many levels of dependencies are resolved. There is no limit by default.",
+)
+@click.option(
+    "-o",
+    "--output",
+    "fmt",
+    default=output.TEXT,
+    type=click.Choice(output.FORMATS, case_sensitive=False),
+    show_choices=True,
+    show_default=True,
+    help="Output format. 'ndjson' writes one record per dependency.",
+)
+@click.pass_context
+def diff(
+    ctx: click.Context,
+    old: str,
+    new: str,
+    owner: str,
+    project: str,
+    config_path: str,
+    jobs: int,
+    max_depth: int | None,
+    fmt: str,
+) -> None:
+    """
+    Compare the dependency chains of two releases of the project, e.g. `sector diff v1.1.0 v1.2.0`.
+    The commits and PRs are only looked up for the dependencies whose tag changed.
+    OLD and NEW can also be snapshot files saved with `current --save-snapshot`, which are
+    recognised by their .jsonl or .jsonl.gz suffix. Two snapshots are compared without calling GitHub.
+    GITHUB_TOKEN is a required environment variable.
+    """
+    from sector import configuration
+    from sector import diff as _diff
+
+    log = logger.get_logger("cli")
+    log.info("Running 'sector diff'")
+    log.debug(f"{locals()=}")
+    configure_client(ctx, jobs)
+    try:
+        _config = configuration.load(config_path)
+        _diff.diff(owner, project, log, _config, old, new, jobs, max_depth, fmt)
+    except ValueError as e:
+        log.exception(e)
+        print(f"[bold red]Error:[/bold red] {e}")
+
+
+@cli.command()
+@click.option(
+    "--host",
+    default=defaults.HOST,
+    show_default=True,
+    help="Address to listen on.",
+)
+@click.option(
+    "--port",
+    default=defaults.PORT,
+    show_default=True,
+    type=click.IntRange(min=0, max=65535),
+    help="Port to listen on, any free port by default.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    default=defaults.JOBS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of projects to process in parallel.",
+)
+@click.option(
+    "--interval",
+    default=defaults.INTERVAL,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Seconds between refreshes of the answers held by the daemon.",
+)
+@click.option(
+    "--webhook-secret",
+    "secret",
+    default=None,
+    envvar="SECTOR_WEBHOOK_SECRET",
+    help="Accept GitHub release, push and pull_request webhooks signed with this secret on /webhook.",
+)
+@click.pass_context
+def serve(
+    ctx: click.Context,
+    host: str,
+    port: int,
+    jobs: int,
+    interval: int,
+    secret: str | None,
+) -> None:
+    """
+    Run a daemon which keeps the GitHub client and the answers to `future` and `current` warm.
+    The answers are refreshed in the background and the commands use the daemon while it runs.
+    GITHUB_TOKEN is a required environment variable.
+    """
+    from sector import server
+
+    log = logger.get_logger("cli")
+    log.info("Running 'sector serve'")
+    log.debug(f"{locals()=}")
+    configure_client(ctx, jobs)
+    server.serve(host, port, jobs, interval, secret)
+
+
+@cli.command()
+@click.option(
+    "--event",
+    required=True,
+    type=click.Choice(["release", "push", "pull_request", "ping"]),
+    help="The X-GitHub-Event of the payloads.",
+)
+@click.option(
+    "--webhook-secret",
+    "secret",
+    required=True,
+    envvar="SECTOR_WEBHOOK_SECRET",
+    help="The secret the daemon was started with.",
+)
+@click.argument(
+    "payloads", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+def replay(event: str, secret: str, payloads: tuple[str]) -> None:
+    """
+    Deliver captured GitHub webhook payloads to the running `sector serve`, signed with the secret.
+    """
+    from sector import server
+
+    log = logger.get_logger("cli")
+    log.info("Running 'sector replay'")
+    connection = server.find()
+    if connection is None:
+        print("[bold red]Error:[/bold red] sector serve is not running")
+        return
+    for payload in payloads:
+        try:
+            reply = connection.deliver(event, Path(payload).read_bytes(), secret)
+        except (ValueError, server.Unavailable) as e:
+            log.exception(e)
+            print(f"[bold red]Error:[/bold red] {payload}: {e}")
+            continue
+        print(f"{payload}: {reply}")
+
+
+@cli.command("bench")
+@click.option(
+    "--repos",
+    default=9,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of projects in the generated corpus.",
+)
+@click.option(
+    "--commits",
+    default=50,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help="Number of commits ahead of the release for each project.",
+)
+@click.option(
+    "--latency",
+    default=0.05,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="Seconds added to every response from the fixture server.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    default=defaults.JOBS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of projects to process in parallel.",
+)
+@click.option(
+    "-s",
+    "--scenario",
+    "scenarios",
+    multiple=True,
+    default=defaults.SCENARIOS,
+    type=click.Choice(defaults.SCENARIOS + defaults.ASYNC_SCENARIOS),
+    show_default=True,
+    help="Scenario to run. This can be used multiple times.",
+)
+@click.option(
+    "--corpus",
+    "corpus_path",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Replay a recorded corpus instead of generating one.",
+)
+@click.option(
+    "-o",
+    "--output",
+    "fmt",
+    default=output.TEXT,
+    type=click.Choice([output.TEXT, output.JSON], case_sensitive=False),
+    show_default=True,
+    help="Output format.",
+)
+def bench_command(
+    repos: int,
+    commits: int,
+    latency: float,
+    jobs: int,
+    scenarios: tuple[str],
+    corpus_path: str | None,
+    fmt: str,
+) -> None:
+    """
+    Measure wall time, request count and peak memory of the main commands.
+    The GitHub API is replaced by a local fixture server so no token or network is needed.
+    """
+    from rich.table import Table
+
+    from sector import bench
+
+    log = logger.get_logger("cli")
+    log.info("Running 'sector bench'")
+    log.debug(f"{locals()=}")
+    if corpus_path is not None:
+        corpus = bench.Corpus.load(Path(corpus_path))
+    else:
+        corpus = bench.Corpus.generate(repos, commits)
+
+    results = [bench.run(scenario, corpus, latency, jobs) for scenario in scenarios]
+    if fmt == output.JSON:
+        output.write_document([asdict(r) for r in results], fmt)
+        return
+
+    table = Table(
+        title=f"sector {__version__} benchmark (latency {latency}s, {jobs} jobs)"
+    )
+    for column in (
+        "Scenario",
+        "Repos",
+        "Commits",
+        "Wall time",
+        "Requests",
+        "Peak memory",
+    ):
+        table.add_column(column)
+    for r in results:
+        table.add_row(
+            r.scenario,
+            str(r.repos),
+            str(r.commits),
+            f"{r.seconds:.2f}s",
+            str(r.requests),
+            f"{r.peak_memory / 1024 / 1024:.1f} MiB",
+        )
+    print(table)
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,246 @@
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from sector import logger
+from sector.cache import HttpCache, cache_key
+from sector.defaults import CACHE_TTL, POOL_SIZE
+from sector.instrument import recorder
+from sector.ratelimit import RateLimiter, resource_for
+
+log: logging.Logger = logger.get_logger("client")
+
+API_URL = "https://api.github.com"
+TIMEOUT = 30
+RETRIES = 3
+
+
+def owner_token(owner: str) -> str | None:
+    """The token set for one owner in GITHUB_TOKEN_<OWNER>, e.g. GITHUB_TOKEN_MY_ORG for my-org."""
+    name = re.sub(r"\W", "_", owner.upper())
+    return os.getenv(f"GITHUB_TOKEN_{name}") or None
+
+
+def set_headers(owner: str | None = None) -> dict[str, str]:
+    github_token = owner_token(owner) if owner is not None else None
+    if github_token is None:
+        github_token = os.getenv("GITHUB_TOKEN", "")
+    if len(github_token) == 0:
+        raise ValueError("GITHUB_TOKEN not set")
+    return {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github+json",
+        "Accept-Encoding": "gzip, deflate",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+
+
+class GitHubClient:
+    """Shared keep-alive session used for every call to the GitHub API."""
+
+    def __init__(
+        self,
+        base_url: str = API_URL,
+        pool_size: int = POOL_SIZE,
+        timeout: float = TIMEOUT,
+        retries: int = RETRIES,
+        cache: bool = False,
+        cache_ttl: float = CACHE_TTL,
+        refresh: bool = False,
+        owner: str | None = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache = HttpCache() if cache else None
+        self.cache_ttl = cache_ttl
+        self.refresh = refresh
+        self.session = requests.Session()
+        self.session.headers.update(set_headers(owner))
+        self.limiter = RateLimiter()
+        # Connection errors are retried here, responses are retried by the rate limiter.
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            # Only read-only GraphQL queries are POSTed so they are safe to retry.
+            allowed_methods=frozenset({"GET", "POST"}),
+            status=0,
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def url(self, path: str) -> str:
+        if path.startswith(("https://", "http://")):
+            return path
+        return f"{self.base_url}{path}"
+
+    def get(
+        self, path: str, immutable: bool = False, **kwargs: Any
+    ) -> requests.Response:
+        """
+        GET a path from the API.
+        Content which is marked as immutable is served from the cache without
+        going to the network, anything else is revalidated once it is older
+        than the cache ttl.
+        """
+        url = self.url(path)
+        kwargs.setdefault("timeout", self.timeout)
+        if self.cache is None:
+            return self.send(self.session.get, url, **kwargs)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        key = cache_key(url, headers)
+        entry = self.cache.get(key)
+        if entry is not None and not self.refresh and entry.fresh(self.cache_ttl):
+            log.debug(f"cache hit for {key}")
+            recorder.request(url, time.perf_counter(), 200, len(entry.body), "hit")
+            return entry.response()
+
+        if entry is not None:
+            if entry.etag is not None:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified is not None:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        cache = "miss" if entry is None else "revalidate"
+        response = self.send(
+            self.session.get, url, cache=cache, headers=headers, **kwargs
+        )
+        if response.status_code == 304 and entry is not None:
+            log.debug(f"cache revalidated for {key}")
+            self.cache.touch(key)
+            return entry.response()
+        if response.status_code == 200:
+            self.cache.put(key, response, immutable)
+        return response
+
+    def cached(self, path: str, headers: dict[str, str] | None = None) -> bool:
+        """Whether a GET of path would be answered by the cache without a request."""
+        if self.cache is None or self.refresh:
+            return False
+        entry = self.cache.get(cache_key(self.url(path), headers or {}))
+        return entry is not None and entry.fresh(self.cache_ttl)
+
+    def post(self, path: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.send(self.session.post, self.url(path), **kwargs)
+
+    def send(
+        self,
+        method: Callable[..., requests.Response],
+        url: str,
+        cache: str = "off",
+        **kwargs: Any,
+    ) -> requests.Response:
+        resource = resource_for(url)
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            self.limiter.acquire(resource)
+            response = method(url, **kwargs)
+            self.limiter.update(response)
+            delay = self.limiter.backoff(response, attempt)
+            if delay is None:
+                break
+            self.limiter.wait(delay)
+            attempt += 1
+        size = int(response.headers.get("Content-Length", 0))
+        if size == 0 and not kwargs.get("stream"):
+            size = len(response.content)
+        recorder.request(url, start, response.status_code, size, cache, attempt)
+        return response
+
+    def graphql(self, query: str, variables: dict[str, Any]) -> Any:
+        response = self.post("/graphql", json={"query": query, "variables": variables})
+        response.raise_for_status()
+        body = response.json()
+        errors = body.get("errors")
+        if errors:
+            log.warning(f"GraphQL query returned errors: {errors}")
+        if body.get("data") is None:
+            raise ValueError(f"GraphQL query failed: {errors}")
+        return body["data"]
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_client: GitHubClient | None = None
+# The clients of the owners which have a token of their own.
+_owners: dict[str, GitHubClient] = {}
+_options: dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def configure(**options: Any) -> None:
+    """Set the options used for the shared client, replacing any existing one."""
+    with _lock:
+        _options.update(options)
+        _close()
+
+
+def restore(options: dict[str, Any]) -> None:
+    """Go back to options saved with options(), dropping any set since."""
+    with _lock:
+        _options.clear()
+        _options.update(options)
+        _close()
+
+
+def _close() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+    for owned in _owners.values():
+        owned.close()
+    _owners.clear()
+
+
+def options() -> dict[str, Any]:
+    """Return a copy of the options used for the shared client."""
+    with _lock:
+        return dict(_options)
+
+
+def current() -> GitHubClient | None:
+    """Return the shared client if one has been created."""
+    return _client
+
+
+def owners() -> dict[str, GitHubClient]:
+    """Return the clients created for owners with their own token."""
+    with _lock:
+        return dict(_owners)
+
+
+def get_client(owner: str | None = None) -> GitHubClient:
+    """
+    Return the shared client, or the owner's own client when GITHUB_TOKEN_<OWNER> is set,
+    so each token has its own connection pool and rate limit.
+    """
+    global _client
+    with _lock:
+        if owner is not None and owner_token(owner) is not None:
+            name = owner.lower()
+            if name not in _owners:
+                log.debug(f"creating GitHub client for {owner} with {_options=}")
+                _owners[name] = GitHubClient(owner=owner, **_options)
+            return _owners[name]
+        if _client is None:
+            log.debug(f"creating GitHub client with {_options=}")
+            _client = GitHubClient(**_options)
+        return _client
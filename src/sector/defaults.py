@@ -0,0 +1,34 @@
+"""
+Defaults and choices of the command line options. They live apart from the modules which use
+them, so the CLI can build its options without importing requests, yaml or httpx.
+"""
+
+# github
+JOBS = 4
+AUTO = "auto"
+COMMITS = "commits"
+PULLS = "pulls"
+PR_STRATEGIES = (AUTO, COMMITS, PULLS)
+
+# client
+POOL_SIZE = 16
+
+# cache
+CACHE_TTL = 300
+
+# aio
+THREADS = "threads"
+ASYNC = "async"
+BACKENDS = (THREADS, ASYNC)
+CONCURRENCY = 100
+
+# server
+HOST = "127.0.0.1"
+PORT = 0
+# Seconds between background refreshes of the queries that were asked for.
+INTERVAL = 900
+
+# bench
+SCENARIOS = ("future", "future-detailed", "current")
+# Only run when asked for, as they need httpx.
+ASYNC_SCENARIOS = ("future-detailed-async", "current-async")
@@ -0,0 +1,194 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from typing import Any
+
+import requests
+from rich import print
+
+from sector import graph, logger, memo, output, snapshot
+from sector.defaults import JOBS
+from sector.github import PrData, PrIndex, commit_prs, resolve_graph
+from sector.instrument import recorder
+
+log: logging.Logger = logger.get_logger("diff")
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+
+@dataclass
+class Change:
+    """The tag of a dependency in two releases, None when it is not a dependency of one."""
+
+    owner: str
+    project: str
+    old: str | None
+    new: str | None
+    commit_count: int = 0
+    prs: list[PrData] = field(default_factory=list)
+
+    @property
+    def status(self) -> str:
+        if self.old is None:
+            return ADDED
+        if self.new is None:
+            return REMOVED
+        return UNCHANGED if self.old == self.new else CHANGED
+
+
+def diff(
+    owner: str,
+    project: str,
+    log: logging.Logger,
+    config: dict[Any, Any],
+    old: str,
+    new: str,
+    jobs: int = JOBS,
+    max_depth: int | None = None,
+    fmt: str = output.TEXT,
+) -> None:
+    with memo.scope():
+        before, after = resolve_both(
+            owner, project, log, config, old, new, jobs, max_depth
+        )
+        changes = compare_graphs(before, after, owner)
+        # Two snapshots are compared offline, only the tags are compared.
+        if not (snapshot.is_snapshot(old) and snapshot.is_snapshot(new)):
+            find_commits(changes, jobs)
+    report(changes, old, new, fmt)
+
+
+def resolve_both(
+    owner: str,
+    project: str,
+    log: logging.Logger,
+    config: dict[Any, Any],
+    old: str,
+    new: str,
+    jobs: int = JOBS,
+    max_depth: int | None = None,
+) -> tuple[graph.Graph, graph.Graph]:
+    """
+    Resolve the graphs of both versions at once. They share the memo of the scope, so a
+    dependency both have in common is only looked up once and its subtree costs nothing.
+    A version which is the path of a snapshot is read from it instead.
+    """
+    with memo.scope(), ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [
+            (
+                pool.submit(read_graph, version)
+                if snapshot.is_snapshot(version)
+                else pool.submit(
+                    copy_context().run,
+                    resolve_graph,
+                    owner,
+                    project,
+                    log,
+                    config,
+                    version,
+                    jobs,
+                    max_depth,
+                )
+            )
+            for version in (old, new)
+        ]
+        return futures[0].result(), futures[1].result()
+
+
+def read_graph(path: str) -> graph.Graph:
+    """The graph of a snapshot, with the repos named with the owner it was taken for."""
+    saved = snapshot.read(path)
+    for node in saved.graph.nodes.values():
+        for repo in [node.repo, *(edge.repo for edge in node.edges)]:
+            repo.owner = repo.owned_by(saved.owner)
+    return saved.graph
+
+
+def tags(
+    dependency_graph: graph.Graph, owner: str
+) -> dict[tuple[str, str], str | None]:
+    """The tag of each repo, the one closest to the root when it is in the graph more than once."""
+    found: dict[tuple[str, str], str | None] = {}
+    for node in sorted(dependency_graph.nodes.values(), key=lambda n: n.depth):
+        found.setdefault((node.repo.owned_by(owner), node.repo.name), node.repo.tag)
+    return found
+
+
+def compare_graphs(before: graph.Graph, after: graph.Graph, owner: str) -> list[Change]:
+    old, new = tags(before, owner), tags(after, owner)
+    # The project at the top comes first, the dependencies follow by name.
+    root = (after.root.repo.owned_by(owner), after.root.repo.name)
+    names = sorted(
+        old.keys() | new.keys(), key=lambda name: (name != root, name[1], name[0])
+    )
+    return [Change(o, n, old.get((o, n)), new.get((o, n))) for o, n in names]
+
+
+def find_commits(changes: list[Change], jobs: int = JOBS) -> None:
+    """Find the commits and PRs between the tags of the changed dependencies only."""
+    changed = [change for change in changes if change.status == CHANGED]
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = [
+            pool.submit(
+                copy_context().run,
+                recorder.call,
+                f"{change.owner}/{change.project}",
+                compare,
+                change,
+            )
+            for change in changed
+        ]
+        for future in futures:
+            future.result()
+
+
+def compare(change: Change) -> None:
+    if change.old is None or change.new is None:
+        return
+    try:
+        shas, prs_by_sha = commit_prs(
+            change.owner, change.project, change.old, change.new
+        )
+    except (requests.HTTPError, ValueError) as e:
+        log.warning(f"Comparing {change.owner}/{change.project} failed, {e}")
+        return
+    change.commit_count = len(shas)
+    change.prs = list(PrIndex.build(shas, prs_by_sha).prs.values())
+
+
+def report(changes: list[Change], old: str, new: str, fmt: str) -> None:
+    if fmt == output.NDJSON:
+        for change in changes:
+            output.write_record("change", output.change_record(change))
+        return
+    if fmt != output.TEXT:
+        document = {
+            "from": old,
+            "to": new,
+            "changes": [output.change_record(change) for change in changes],
+        }
+        output.write_document(document, fmt)
+        return
+
+    print(f"[bold cyan]Changes from {old} to {new}:[/bold cyan]")
+    unchanged = 0
+    for change in changes:
+        name = f"{change.owner}/{change.project}"
+        if change.status == UNCHANGED:
+            unchanged += 1
+        elif change.status == ADDED:
+            print(f"{name}: added at {change.new}")
+        elif change.status == REMOVED:
+            print(f"{name}: removed, was {change.old}")
+        else:
+            print(
+                f"{name}: {change.old} -> {change.new}"
+                f" ({len(change.prs)} PRs, {change.commit_count} commits)"
+            )
+            for pr in change.prs:
+                print(f"-  {pr.title}\n   {pr.url}")
+    print(f"{unchanged} unchanged")
@@ -1,19 +1,64 @@
-import base64
+import fnmatch
 import logging
-import os
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from contextvars import copy_context
 from dataclasses import dataclass, field
-from typing import Any, Dict
+from itertools import chain
+from queue import Queue
+from typing import Any, Callable, Iterable, Iterator, TypeVar
 
 import requests
-import yaml
 from rich import print
-from rich.progress import track
-from rich.tree import Tree
+from rich.progress import Progress
 
-from sector import logger
+from sector import graph, logger, manifest, memo, output, state
+from sector.client import get_client
+from sector.defaults import AUTO, COMMITS, JOBS, PULLS
+from sector.instrument import recorder
+from sector.memo import memoized
 
 log: logging.Logger = logger.get_logger("github")
-TIMEOUT = 30
+GRAPHQL_BATCH = 50
+PREFETCH_BATCH = 20
+PR_LOOKUP_JOBS = 2
+COMPARE_PAGE_SIZE = 100
+PULLS_PAGE_SIZE = 100
+# With the auto strategy, a range with more commits than this gets its PRs from /pulls.
+PULLS_THRESHOLD = 200
+RAW = {"Accept": "application/vnd.github.raw+json"}
+DISCOVERY_PAGE_SIZE = 100
+DISCOVERY_QUERY = """
+query($owner: String!, $first: Int!, $cursor: String) {
+  repositoryOwner(login: $owner) {
+    # Without the affiliation a user's collaborator repos of other owners are listed too.
+    repositories(
+      first: $first
+      after: $cursor
+      ownerAffiliations: [OWNER]
+      orderBy: {field: NAME, direction: ASC}
+    ) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        isArchived
+        releases { totalCount }
+        repositoryTopics(first: 20) { nodes { topic { name } } }
+      }
+    }
+  }
+}
+"""
+
+T = TypeVar("T")
+
+# How the PRs of the commits ahead of a release are found, see use_pulls.
+pr_strategy = AUTO
 
 
 @dataclass
@@ -22,6 +67,40 @@ class PrData:
     url: str
 
 
+@dataclass
+class PrIndex:
+    """
+    The pull requests of a range of commits, built in one pass over the commits.
+    prs is keyed on the PR id in the order they were first seen, and commits maps each
+    commit to the ids of its PRs.
+    """
+
+    prs: dict[int, PrData] = field(default_factory=dict)
+    commits: dict[str, list[int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls, sha_list: list[str], prs_by_sha: dict[str, list[dict[str, Any]]]
+    ) -> "PrIndex":
+        index = cls()
+        for sha in sha_list:
+            ids = index.commits.setdefault(sha, [])
+            for pr in prs_by_sha.get(sha, []):
+                if pr["id"] not in index.prs:
+                    index.prs[pr["id"]] = PrData(title=pr["title"], url=pr["html_url"])
+                ids.append(pr["id"])
+        return index
+
+    def covering(self, shas: Iterable[str]) -> list[PrData]:
+        """The PRs of the given commits, each one once."""
+        ids = dict.fromkeys(i for sha in shas for i in self.commits.get(sha, []))
+        return [self.prs[i] for i in ids]
+
+    def unattributed(self) -> list[str]:
+        """The commits which did not come from a PR."""
+        return [sha for sha, ids in self.commits.items() if not ids]
+
+
 @dataclass
 class ReleaseData:
     name: str = ""
@@ -41,34 +120,65 @@ class Data:
 
 @dataclass
 class Repo:
+    """A project given as `name`, `name@tag`, `owner/name` or `owner/name@tag`."""
+
+    owner: str | None
     name: str
     tag: str | None
 
     def __init__(self, project: str) -> None:
         _project = project.split("@")
-        self.name = _project[0]
+        self.owner, _, self.name = _project[0].rpartition("/")
+        self.owner = self.owner or None
         self.tag = _project[1] if 1 < len(_project) else None
 
     def __repr__(self) -> str:
+        owner = f"{self.owner}/" if self.owner is not None else ""
         tag = f"@{self.tag}" if self.tag is not None else ""
-        return f"{self.name}{tag}"
+        return f"{owner}{self.name}{tag}"
+
+    def owned_by(self, owner: str) -> str:
+        """The owner of the repo, owner when the spec did not name one."""
+        return self.owner if self.owner is not None else owner
 
 
 def info(
     owner: str,
-    repos: list[Repo],
+    repos: Iterable[Repo],
     logger: logging.Logger,
     _sort: str,
     detailed: bool,
+    jobs: int = JOBS,
+    fmt: str = output.TEXT,
 ) -> None:
     global log
     log = logger
-    log.info("starting run")
-    data = []
-    for repo in track(repos, description="Processing..."):
-        data.append(process_repo(owner, repo, detailed))
-    if _sort == "time":
-        data.sort(key=lambda d: d.github.date)
+    log.info(f"starting run with {jobs} jobs")
+    if fmt == output.NDJSON:
+        process_repos(
+            owner,
+            repos,
+            detailed,
+            jobs,
+            on_result=lambda d: output.write_record("release", output.data_record(d)),
+        )
+        return
+
+    data = sort_data(
+        process_repos(owner, repos, detailed, jobs, fmt == output.TEXT), _sort
+    )
+    report(data, _sort, detailed, fmt)
+
+
+def report(data: list[Data], _sort: str, detailed: bool, fmt: str) -> None:
+    if fmt == output.NDJSON:
+        for d in data:
+            output.write_record("release", output.data_record(d))
+        return
+    if fmt != output.TEXT:
+        output.write_document([output.data_record(d) for d in data], fmt)
+        return
+
     new = False
     print()
     for item in data:
@@ -78,28 +188,150 @@ def info(
             new = True
 
 
-def set_headers() -> dict[str, str]:
-    github_token = os.getenv("GITHUB_TOKEN", "")
-    if len(github_token) == 0:
-        raise ValueError("GITHUB_TOKEN not set")
-    return {
-        "Authorization": f"token {github_token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
+def process_repos(
+    owner: str,
+    repos: Iterable[Repo],
+    detailed: bool,
+    jobs: int = JOBS,
+    progress: bool = False,
+    on_result: Callable[[Data], None] | None = None,
+) -> list[Data]:
+    """
+    Process the repos in parallel, on_result is called for each one as it finishes.
+    Repos are submitted as they are iterated, so a lazy listing is processed while it is read.
+    """
+    futures: list[Future[Data]] = []
+    pending: set[Future[Data]] = set()
+    with (
+        memo.scope(),
+        ThreadPoolExecutor(max_workers=max(1, jobs)) as pool,
+        Progress(disable=not progress) as bar,
+    ):
+        task = bar.add_task("Processing...", total=None)
+
+        def finished(done: Iterable[Future[Data]]) -> None:
+            for future in done:
+                bar.advance(task)
+                if on_result is not None:
+                    on_result(future.result())
+
+        for repo in repos:
+            future = pool.submit(
+                recorder.call, str(repo), process_repo, owner, repo, detailed
+            )
+            futures.append(future)
+            pending.add(future)
+            bar.update(task, total=len(futures))
+            # Report what finished so far without waiting for the next repo.
+            done, pending = wait(pending, timeout=0, return_when=FIRST_COMPLETED)
+            finished(done)
+        finished(as_completed(pending))
+    # Results are collected in submission order so sorting stays stable.
+    return [future.result() for future in futures]
+
+
+def discover_repos(
+    owner: str, topics: Iterable[str] = (), pattern: str | None = None
+) -> Iterator[Repo]:
+    """
+    Yield the owner's repos which have at least one release, one page at a time.
+    Archived repos are skipped. When topics are given a repo needs one of them,
+    and when a pattern is given the repo name has to match the glob.
+    """
+    log.info(f"Discovering repos for {owner}")
+    topics = set(topics)
+    cursor: str | None = None
+    while True:
+        variables = {"owner": owner, "first": DISCOVERY_PAGE_SIZE, "cursor": cursor}
+        data = get_client(owner).graphql(DISCOVERY_QUERY, variables)
+        if data["repositoryOwner"] is None:
+            raise ValueError(f"No GitHub user or organization called {owner}")
+        repositories = data["repositoryOwner"]["repositories"]
+        for node in repositories["nodes"]:
+            if node["isArchived"] or node["releases"]["totalCount"] == 0:
+                continue
+            if pattern is not None and not fnmatch.fnmatch(node["name"], pattern):
+                continue
+            repo_topics = {
+                t["topic"]["name"] for t in node["repositoryTopics"]["nodes"]
+            }
+            if topics and not topics & repo_topics:
+                continue
+            log.debug(f"discovered {owner}/{node['name']}")
+            yield Repo(node["name"])
+        if not repositories["pageInfo"]["hasNextPage"]:
+            return
+        cursor = repositories["pageInfo"]["endCursor"]
+
+
+def discover_owners(
+    owners: list[str], topics: Iterable[str] = (), pattern: str | None = None
+) -> Iterator[Repo]:
+    """
+    Yield the repos of several owners as `owner/name`, discovering every owner at once
+    so the repos are yielded as soon as any owner's page comes back.
+    """
+    found: Queue[Repo | BaseException | None] = Queue()
+
+    def discover(owner: str) -> None:
+        try:
+            for repo in discover_repos(owner, topics, pattern):
+                repo.owner = owner
+                found.put(repo)
+        except BaseException as e:
+            found.put(e)
+        finally:
+            found.put(None)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(owners))) as pool:
+        for owner in owners:
+            pool.submit(copy_context().run, discover, owner)
+        remaining = len(owners)
+        while remaining:
+            item = found.get()
+            if item is None:
+                remaining -= 1
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                yield item
+
+
+def sort_data(data: list[Data], _sort: str) -> list[Data]:
+    if _sort == "time":
+        data.sort(key=lambda d: d.github.date)
+    return data
+
+
+def pinned(ref: str | None) -> bool:
+    """Tags are treated as immutable, branches and 'latest' can move."""
+    return ref is not None and ref not in ("latest", "main", "master", "HEAD")
+
 
+def is_latest(tag: str | None) -> bool:
+    """Only 'latest' or no tag at all is the latest release, any other is looked up by tag."""
+    return tag in ("latest", None)
 
+
+@memoized(key=lambda owner, repo: (owner, repo.name, repo.tag, None))
 def get_release(owner: str, repo: Repo) -> ReleaseData:
     global log
     log = log
     log.info(f"Getting release data for {owner}/{repo}")
-    version = "latest" if repo.tag == "latest" else f"tags/{repo.tag}"
-    url = f"https://api.github.com/repos/{owner}/{repo.name}/releases/{version}"
-    response = requests.get(url, headers=set_headers(), timeout=TIMEOUT)
+    response = get_client(owner).get(
+        release_path(owner, repo), immutable=pinned(repo.tag)
+    )
     response.raise_for_status()
-    release = response.json()
+    return release_data(response.json())
+
+
+def release_path(owner: str, repo: Repo) -> str:
+    version = "latest" if is_latest(repo.tag) else f"tags/{repo.tag}"
+    return f"/repos/{owner}/{repo.name}/releases/{version}"
+
+
+def release_data(release: dict[str, Any]) -> ReleaseData:
     if not release:
-        print("No releases found.")
         log.warning("no releases found")
         return ReleaseData()
 
@@ -107,32 +339,169 @@ def get_release(owner: str, repo: Repo) -> ReleaseData:
     tag = release.get("tag_name", "No tag")
     date = release.get("published_at", "No date")
     url = release.get("html_url", "No URL")
-    release_data = ReleaseData(name=name, tag=tag, date=date, url=url)
-    log.debug(f"{release_data=}")
-    return release_data
+    data = ReleaseData(name=name, tag=tag, date=date, url=url)
+    log.debug(f"{data=}")
+    return data
+
 
+def get_commits_between(
+    owner: str, repo: str, base: str, head: str, fast_forward: bool = False
+) -> Iterator[str]:
+    """Yield the commits between two refs, see compare_pages."""
+    for _, commits in compare_pages(owner, repo, base, head, fast_forward):
+        yield from commits
 
-def get_commits_between(owner: str, repo: str, base: str, head: str) -> list[str]:
+
+def compare_pages(
+    owner: str, repo: str, base: str, head: str, fast_forward: bool = False
+) -> Iterator[tuple[int, list[str]]]:
+    """
+    Yield the number of commits between two refs with the commits of each page of the
+    compare api. Each page is only requested once the previous one is used.
+    With fast_forward a ValueError is raised when head does not contain base.
+    """
     global log
     log = log
     log.info(f"Getting commits for {owner}/{repo} {base}...{head}")
-    url = f"https://api.github.com/repos/{owner}/{repo}/compare/{base}...{head}"
-    response = requests.get(url, headers=set_headers(), timeout=TIMEOUT)
-    response.raise_for_status()
-    commits = [commit["sha"] for commit in response.json()["commits"]]
-    log.debug(f"{commits=}")
-    return commits
+    url: str | None = (
+        f"/repos/{owner}/{repo}/compare/{base}...{head}?per_page={COMPARE_PAGE_SIZE}"
+    )
+    immutable = pinned(base) and pinned(head)
+    while url is not None:
+        response = get_client(owner).get(url, immutable=immutable)
+        if fast_forward and response.status_code == 404:
+            raise ValueError(f"{base} is no longer in {owner}/{repo}")
+        response.raise_for_status()
+        body = response.json()
+        if fast_forward:
+            check_fast_forward(body, base, head)
+        commits = [commit["sha"] for commit in body["commits"]]
+        log.debug(f"{commits=}")
+        yield body.get("total_commits", len(commits)), commits
+        url = response.links.get("next", {}).get("url")
+
+
+def check_fast_forward(body: dict[str, Any], base: str, head: str) -> None:
+    if body.get("status") not in ("ahead", "identical"):
+        raise ValueError(f"{head} is {body.get('status')} from {base}")
 
 
 def find_prs_for_commit(owner: str, repo: str, sha: str) -> Any:
-    url = f"https://api.github.com/repos/{owner}/{repo}/commits/{sha}/pulls"
-    response = requests.get(url, headers=set_headers(), timeout=TIMEOUT)
+    url = f"/repos/{owner}/{repo}/commits/{sha}/pulls"
+    response = get_client(owner).get(url)
     response.raise_for_status()
     return response.json()
 
 
+def batched(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    batch: list[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def find_prs_for_commits(
+    owner: str, repo: str, shas: list[str]
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    Resolve the pull requests for many commits with one GraphQL query per batch.
+    The pull requests are returned in the same shape as the REST api.
+    """
+    log.info(f"Getting PRs for {len(shas)} commits in {owner}/{repo}")
+    prs: dict[str, list[dict[str, Any]]] = {}
+    for batch in batched(shas, GRAPHQL_BATCH):
+        query, variables = prs_query(owner, repo, batch)
+        repository = get_client(owner).graphql(query, variables)["repository"]
+        prs.update(prs_by_commit(batch, repository))
+    log.debug(f"{prs=}")
+    return prs
+
+
+def prs_query(owner: str, repo: str, batch: list[str]) -> tuple[str, dict[str, Any]]:
+    params = "".join(f", $c{i}: GitObjectID!" for i in range(len(batch)))
+    fields = "".join(
+        f" c{i}: object(oid: $c{i}) {{ ... on Commit {{"
+        " associatedPullRequests(first: 10) {"
+        " nodes { id: databaseId title html_url: url } } } }"
+        for i in range(len(batch))
+    )
+    query = (
+        f"query($owner: String!, $repo: String!{params}) {{"
+        f" repository(owner: $owner, name: $repo) {{{fields} }} }}"
+    )
+    variables: dict[str, Any] = {"owner": owner, "repo": repo}
+    variables.update({f"c{i}": sha for i, sha in enumerate(batch)})
+    return query, variables
+
+
+def prs_by_commit(
+    batch: list[str], repository: dict[str, Any]
+) -> dict[str, list[dict[str, Any]]]:
+    prs: dict[str, list[dict[str, Any]]] = {}
+    for i, sha in enumerate(batch):
+        commit = repository.get(f"c{i}")
+        prs[sha] = [] if commit is None else commit["associatedPullRequests"]["nodes"]
+    return prs
+
+
+def use_pulls(count: int, since: str) -> bool:
+    """
+    Whether the PRs of count commits are found from the PRs merged since the release,
+    which is a page of requests per 100 PRs instead of one query per 50 commits.
+    """
+    if pr_strategy == COMMITS or not since[:1].isdigit():
+        return False
+    return pr_strategy == PULLS or count > PULLS_THRESHOLD
+
+
+def merged_pulls(owner: str, repo: str, head: str, since: str) -> list[dict[str, Any]]:
+    """
+    List the PRs merged into head since the release, paging through the closed PRs
+    from the most recently updated one until they were last updated before since.
+    """
+    log.info(f"Getting PRs merged into {owner}/{repo} {head} since {since}")
+    pulls: list[dict[str, Any]] = []
+    url: str | None = pulls_path(owner, repo, head)
+    while url is not None:
+        response = get_client(owner).get(url)
+        response.raise_for_status()
+        page = response.json()
+        pulls.extend(page)
+        if not page or page[-1]["updated_at"] < since:
+            break
+        url = response.links.get("next", {}).get("url")
+    return pulls
+
+
+def pulls_path(owner: str, repo: str, head: str) -> str:
+    return (
+        f"/repos/{owner}/{repo}/pulls?state=closed&base={head}"
+        f"&sort=updated&direction=desc&per_page={PULLS_PAGE_SIZE}"
+    )
+
+
+def add_merged(
+    prs: dict[str, list[dict[str, Any]]], pulls: list[dict[str, Any]]
+) -> None:
+    """
+    Add each merged PR to the commits it was merged as.
+    A PR is matched on its merge commit, so only one commit of a rebased PR is attributed.
+    """
+    for pr in pulls:
+        sha = pr.get("merge_commit_sha")
+        if pr.get("merged_at") and sha in prs:
+            # The same shape as the PRs found with the GraphQL api.
+            prs[sha].append(
+                {"id": pr["id"], "title": pr["title"], "html_url": pr["html_url"]}
+            )
+
+
 def list_pr_commits(url: str) -> list[str]:
-    response = requests.get(url, headers=set_headers(), timeout=TIMEOUT)
+    response = get_client().get(url)
     response.raise_for_status()
     return [commit["sha"] for commit in response.json()]
 
@@ -140,28 +509,103 @@ def list_pr_commits(url: str) -> list[str]:
 def process_repo(owner: str, repo: Repo, detailed: bool = False) -> Data:
     global log
     log = log
-    log.info(f"Processing data for {owner}/{repo}")
+    owner = repo.owned_by(owner)
+    log.info(f"Processing data for {owner}/{repo.name}")
 
     github = get_release(owner, repo)
     if github is not None:
         data = Data(owner=owner, project=repo.name, github=github)
     if detailed:
         base = repo.tag if repo.tag is not None else data.github.tag
-        sha_list = get_commits_between(owner, repo.name, base, "main")
+        sha_list, prs_by_sha = incremental_commit_prs(
+            owner, repo.name, base, "main", data.github.date
+        )
         data.github.commit_count = len(sha_list)
-        seen = []
-        for sha in sha_list:
-            prs = find_prs_for_commit(owner, repo.name, sha)
-            for pr in prs:
-                if pr["id"] in seen:
-                    break
-                seen.append(pr["id"])
-                prData = PrData(title=pr["title"], url=pr["html_url"])
-
-                data.github.prs.append(prData)
+        data.github.prs = list(PrIndex.build(sha_list, prs_by_sha).prs.values())
     return data
 
 
+def incremental_commit_prs(
+    owner: str, repo: str, base: str, head: str, since: str = ""
+) -> tuple[list[str], dict[str, list[dict[str, Any]]]]:
+    """
+    Find the commits between base and head along with their pull requests.
+    When incremental runs are enabled only the commits since the last run are looked
+    up, unless a new release was cut or the history was rewritten since.
+    """
+    store = state.current()
+    if store is None:
+        return commit_prs(owner, repo, base, head, since=since)
+
+    previous = store.get(owner, repo, base)
+    if previous is None:
+        sha_list, prs_by_sha = commit_prs(owner, repo, base, head, since=since)
+    else:
+        try:
+            new_shas, new_prs = commit_prs(
+                owner, repo, previous.head, head, True, since
+            )
+        except ValueError as e:
+            log.info(f"Recomputing {owner}/{repo}, {e}")
+            sha_list, prs_by_sha = commit_prs(owner, repo, base, head, since=since)
+        else:
+            log.info(f"{len(new_shas)} new commits in {owner}/{repo} since last run")
+            sha_list = previous.shas + new_shas
+            prs_by_sha = {**previous.prs, **new_prs}
+
+    store.record(owner, repo, base, sha_list, prs_by_sha)
+    return sha_list, prs_by_sha
+
+
+def commit_prs(
+    owner: str,
+    repo: str,
+    base: str,
+    head: str,
+    fast_forward: bool = False,
+    since: str = "",
+) -> tuple[list[str], dict[str, list[dict[str, Any]]]]:
+    """
+    Find the commits between base and head along with their pull requests.
+    since is when base was released, it is needed to find the PRs from /pulls.
+    """
+    pages = compare_pages(owner, repo, base, head, fast_forward)
+    # The first page tells the number of commits, which picks the strategy.
+    total, first = next(pages, (0, []))
+    commits = chain(first, chain.from_iterable(page for _, page in pages))
+    sha_list: list[str] = []
+    prs_by_sha: dict[str, list[dict[str, Any]]] = {}
+    if use_pulls(total, since):
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            # The merged PRs are listed while the other compare pages are read.
+            pulls = pool.submit(
+                copy_context().run, merged_pulls, owner, repo, head, since
+            )
+            sha_list.extend(commits)
+            prs_by_sha.update((sha, []) for sha in sha_list)
+            add_merged(prs_by_sha, pulls.result())
+        return sha_list, prs_by_sha
+
+    # Later compare pages are fetched while earlier batches are resolved.
+    with ThreadPoolExecutor(max_workers=PR_LOOKUP_JOBS) as pool:
+        futures = []
+        for batch in batched(commits, GRAPHQL_BATCH):
+            sha_list.extend(batch)
+            # Copy the context so the requests are attributed to this repo.
+            futures.append(
+                pool.submit(
+                    copy_context().run,
+                    find_prs_for_commits,
+                    owner,
+                    repo,
+                    batch,
+                )
+            )
+        for future in futures:
+            prs_by_sha.update(future.result())
+    return sha_list, prs_by_sha
+
+
 def new_string(new: bool) -> str:
     if new:
         return "[bold red]NEW[/bold red]"
@@ -187,13 +631,26 @@ def print_data(data: Data, new: bool = False, detailed: bool = False) -> None:
 
 
 def mapper(config: dict[str, str], repos: list[Repo]) -> list[Repo]:
+    """Rename repos with the config, a mapping to `owner/name` also moves the repo."""
     for repo in repos:
         if repo.name in config:
-            repo.name = config[repo.name]
+            mapped = Repo(config[repo.name])
+            repo.owner = mapped.owner or repo.owner
+            repo.name = mapped.name
 
     return repos
 
 
+def dedup(repos: list[Repo]) -> list[Repo]:
+    seen: set[str] = set()
+    out: list[Repo] = []
+    for repo in repos:
+        if str(repo) not in seen:
+            seen.add(str(repo))
+            out.append(repo)
+    return out
+
+
 def result(
     owner: str,
     project: str,
@@ -201,71 +658,326 @@ def result(
     config: dict[Any, Any],
     _sort: str,
     _version: str = "latest",
+    jobs: int = JOBS,
+    max_depth: int | None = None,
+    fmt: str = output.TEXT,
 ) -> None:
+    with memo.scope():
+        try:
+            dependency_graph = resolve_graph(
+                owner, project, log, config, _version, jobs, max_depth
+            )
+        except ValueError:
+            log.debug(f"Error trying to find CSV file for {project}")
+            exit(0)
+        repos = graph_repos(dependency_graph)
+
+        if fmt not in (output.TEXT, output.NDJSON):
+            data = sort_data(process_repos(owner, repos, True, jobs), _sort)
+            output.write_document(result_document(dependency_graph, data), fmt)
+            return
+
+        report_graph(log, dependency_graph, repos, fmt)
+        info(owner, repos, log, _sort, True, jobs, fmt)
+
+
+def resolve_graph(
+    owner: str,
+    project: str,
+    log: logging.Logger,
+    config: dict[Any, Any],
+    _version: str = "latest",
+    jobs: int = JOBS,
+    max_depth: int | None = None,
+) -> graph.Graph:
+    """Resolve the dependency graph of project, a ValueError is raised when it has no release."""
     root_repo = Repo(f"{project}")
+    root_edges = expand_root(log, owner, root_repo, config["mapper"], _version)
+    return graph.resolve(
+        root_repo,
+        root_edges,
+        lambda repo: recorder.call(
+            str(repo), expand, log, owner, repo, config["mapper"]
+        ),
+        jobs,
+        max_depth,
+        prefetch=lambda repos: prefetch_files(owner, repos),
+    )
+
+
+def graph_repos(dependency_graph: graph.Graph) -> list[Repo]:
+    repos = dedup(dependency_graph.repos())
+    repos.sort(key=lambda r: r.name)
+    return repos
+
+
+def report_result(
+    log: logging.Logger,
+    dependency_graph: graph.Graph,
+    data: list[Data],
+    _sort: str,
+    fmt: str,
+) -> None:
+    """Report a graph along with the release data of its repos, which are already known."""
+    data = sort_data(data, _sort)
+    if fmt not in (output.TEXT, output.NDJSON):
+        output.write_document(result_document(dependency_graph, data), fmt)
+        return
+    report_graph(log, dependency_graph, graph_repos(dependency_graph), fmt)
+    report(data, _sort, True, fmt)
+
+
+def report_graph(
+    log: logging.Logger, dependency_graph: graph.Graph, repos: list[Repo], fmt: str
+) -> None:
+    log.debug(f"Extracted {len(repos)} repositories:")
+    if log.level == logging.DEBUG:
+        for repo in repos:
+            log.debug(f"  - {repo}")
+
+    if fmt == output.TEXT:
+        print(f"[bold cyan]Extracted {len(repos)} repositories:[/bold cyan]")
+        print(graph.render(dependency_graph))
+    elif fmt == output.NDJSON:
+        output.write_record("graph", output.graph_record(dependency_graph))
+
+
+def result_document(dependency_graph: graph.Graph, data: list[Data]) -> dict[str, Any]:
+    return {
+        "graph": output.graph_record(dependency_graph),
+        "repos": [output.data_record(d) for d in data],
+    }
+
+
+def expand_root(
+    log: logging.Logger,
+    owner: str,
+    root_repo: Repo,
+    mapping: dict[str, str],
+    _version: str,
+) -> list[graph.Edge]:
+    """
+    Find the dependencies of the project at the top of the chain, setting its tag.
+    The release.yaml is preferred and the CSV related images are used as a fallback.
+    """
+    owner = root_repo.owned_by(owner)
     try:
         release_tag, release_yaml_content = get_operator_release_yaml(
-            log, owner, project, _version
+            log, owner, root_repo.name, _version
         )
         log.debug("Parse the release.yaml to extract repository versions")
         repos = parse_release_yaml_to_repos(release_yaml_content)
         root_repo.tag = release_tag
+        source = graph.RELEASE_YAML
+    except ValueError:
+        log.debug(f"Error trying to find release.yaml for {root_repo.name}")
+        root_repo.tag = _version
+        release_data = get_release(owner, root_repo)
+        root_repo.tag = release_data.tag
+        related_images = get_related_images(log, owner, root_repo)
+        repos = parse_relate_images(log, related_images)
+        source = graph.CSV
+
+    return [graph.Edge(repo, source) for repo in mapper(mapping, repos)]
+
+
+def expand(
+    log: logging.Logger, owner: str, repo: Repo, mapping: dict[str, str]
+) -> list[graph.Edge]:
+    """Find the dependencies of a project from both its release.yaml and CSV."""
+    log.debug(f"trying to find details on {repo}")
+    owner = repo.owned_by(owner)
+    edges: list[graph.Edge] = []
+    try:
+        _, release_yaml_content = get_operator_release_yaml(
+            log, owner, repo.name, _version=repo.tag or "latest"
+        )
+        parsed_release_yaml = parse_release_yaml_to_repos(release_yaml_content)
+        edges.extend(graph.Edge(r, graph.RELEASE_YAML) for r in parsed_release_yaml)
     except ValueError:
-        log.debug(f"Error trying to find release.yaml for {project}")
+        log.debug(f"Error trying to find release.yaml for {repo.name}")
 
-        try:
-            root_repo.tag = _version
-            release_data = get_release(owner, root_repo)
-            root_repo.tag = release_data.tag
-            related_images = get_related_images(log, owner, root_repo)
-            repos = parse_relate_images(log, related_images)
-        except ValueError:
-            log.debug(f"Error trying to find CSV file for {project}")
-            exit(0)
+    try:
+        related_images = get_related_images(log, owner, repo)
+        parsed_relate_images = parse_relate_images(log, related_images)
+        edges.extend(graph.Edge(r, graph.CSV) for r in parsed_relate_images)
+    except ValueError:
+        log.debug(f"Error trying to find CSV file for {repo.name}")
 
-    tree = Tree(str(root_repo))
-    sub_repos = []
-    for repo in repos:
-        local_tree = tree.add(str(repo))
-        log.debug(f"trying to find details on {repo}")
-        try:
-            if repo.tag is None:
-                log.error("this should never happen")
-                raise Exception("Tag is none")
-            release_tag, release_yaml_content = get_operator_release_yaml(
-                log, owner, repo.name, _version=repo.tag
-            )
-            parsed_release_yaml = parse_release_yaml_to_repos(release_yaml_content)
-            [local_tree.add(str(r)) for r in parsed_release_yaml]
-            sub_repos.extend(parsed_release_yaml)
-        except ValueError:
-            log.debug(f"Error trying to find release.yaml for {repo.name}")
+    mapper(mapping, [edge.repo for edge in edges])
+    return edges
 
-        try:
-            related_images = get_related_images(log, owner, repo)
-            parsed_relate_images = parse_relate_images(log, related_images)
-            [local_tree.add(str(r)) for r in parsed_relate_images]
 
-            sub_repos.extend(parsed_relate_images)
-        except ValueError:
-            log.debug(f"Error trying to find CSV file for {repo.name}")
+@dataclass
+class Lookup:
+    """The release and files of a repo to look up in a batched GraphQL query."""
 
-    repos.extend(sub_repos)
+    name: str
+    version: str | None = None
+    files: list[tuple[str, str]] = field(default_factory=list)
 
-    repos.append(root_repo)
 
-    repos = mapper(config["mapper"], repos)
-    repos.sort(key=lambda r: r.name)
+@dataclass
+class Found:
+    """The outcome of a memoized call found by a lookup, value is None when it does not exist."""
 
-    print(f"[bold cyan]Extracted {len(repos)} repositories:[/bold cyan]")
-    print(tree)
+    func: Callable[..., Any]
+    key: tuple[Any, ...]
+    value: Any
 
-    log.debug(f"Extracted {len(repos)} repositories:")
-    if log.level == logging.DEBUG:
-        for repo in repos:
-            log.debug(f"  - {repo}")
 
-    info(owner, repos, log, _sort, True)
+def prefetch_files(owner: str, repos: list[Repo]) -> None:
+    """
+    Look up what expand needs for many repos with batched GraphQL queries and prime
+    the memo with it, so a level of the graph takes one or two round trips in total.
+    A query is about the repos of one owner, so each owner is looked up on its own.
+    """
+    by_owner: dict[str, list[Repo]] = {}
+    for repo in repos:
+        by_owner.setdefault(repo.owned_by(owner), []).append(repo)
+    with ThreadPoolExecutor(max_workers=max(1, len(by_owner))) as pool:
+        futures = [
+            pool.submit(copy_context().run, prefetch_owner, repo_owner, owned)
+            for repo_owner, owned in by_owner.items()
+        ]
+        for future in futures:
+            future.result()
+
+
+def prefetch_owner(owner: str, repos: list[Repo]) -> None:
+    try:
+        gh = get_client(owner)
+    except ValueError as e:
+        log.warning(f"Prefetching files failed, {e}")
+        return
+    lookups = uncached(owner, prefetch_lookups(repos), gh.cached)
+    while lookups:
+        follow_up: list[Lookup] = []
+        for batch in batched(lookups, PREFETCH_BATCH):
+            query, variables = lookup_query(owner, batch)
+            try:
+                data = gh.graphql(query, variables)
+            except (requests.RequestException, ValueError) as e:
+                # Anything that is not primed is fetched by expand itself.
+                log.warning(f"Prefetching files failed, {e}")
+                return
+            found, more = lookup_results(owner, batch, data)
+            for item in found:
+                error = None if item.value is not None else not_found(item.key)
+                memo.prime(item.func, item.key, item.value, error)
+            follow_up.extend(more)
+        lookups = follow_up
+
+
+def not_found(key: tuple[Any, ...]) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = 404
+    return requests.HTTPError(f"404 Not Found: {key}", response=response)
+
+
+def prefetch_lookups(repos: list[Repo]) -> list[Lookup]:
+    """
+    The release and CSV of every repo. The release.yaml is included when a tag is given,
+    otherwise it is looked up once the latest release is known.
+    """
+    lookups = []
+    for repo in repos:
+        version = repo.tag or "latest"
+        lookup = Lookup(repo.name, version, [(repo.tag or "main", csv_path(repo.name))])
+        if not is_latest(version):
+            lookup.files.append((version, "release.yaml"))
+        lookups.append(lookup)
+    return lookups
+
+
+def uncached(
+    owner: str,
+    lookups: list[Lookup],
+    cached: Callable[[str, dict[str, str]], bool],
+) -> list[Lookup]:
+    """
+    Leave out the repos whose release and files are all in the client's cache, a GraphQL
+    query is never cached so asking it for them would be the only request of a repeat run.
+    """
+    needed = []
+    for lookup in lookups:
+        paths = [
+            (contents_path(owner, lookup.name, path, ref), RAW)
+            for ref, path in lookup.files
+        ]
+        if lookup.version is not None:
+            release = Repo(f"{lookup.name}@{lookup.version}")
+            paths.append((release_path(owner, release), {}))
+        if not all(cached(path, headers) for path, headers in paths):
+            needed.append(lookup)
+    return needed
+
+
+def lookup_query(owner: str, lookups: list[Lookup]) -> tuple[str, dict[str, Any]]:
+    params = ""
+    fields = ""
+    variables: dict[str, Any] = {"owner": owner}
+    for i, lookup in enumerate(lookups):
+        params += f", $n{i}: String!"
+        variables[f"n{i}"] = lookup.name
+        fields += f" r{i}: repository(owner: $owner, name: $n{i}) {{"
+        if lookup.version is not None:
+            release = "latestRelease"
+            # The same release as release_path, a branch like main is a tag name here too.
+            if not is_latest(lookup.version):
+                params += f", $t{i}: String!"
+                variables[f"t{i}"] = lookup.version
+                release = f"release(tagName: $t{i})"
+            fields += f" release: {release} {{ name tagName publishedAt url }}"
+        for j, (ref, path) in enumerate(lookup.files):
+            params += f", $f{i}_{j}: String!"
+            variables[f"f{i}_{j}"] = f"{ref}:{path}"
+            fields += (
+                f" f{j}: object(expression: $f{i}_{j})"
+                " { ... on Blob { text isTruncated } }"
+            )
+        fields += " }"
+    query = f"query($owner: String!{params}) {{{fields} }}"
+    return query, variables
+
+
+def lookup_results(
+    owner: str, lookups: list[Lookup], data: dict[str, Any]
+) -> tuple[list[Found], list[Lookup]]:
+    """
+    Turn a lookup query response into the memoized calls it answers, along with the
+    release.yaml lookups of the repos whose latest release is now known.
+    """
+    found: list[Found] = []
+    follow_up: list[Lookup] = []
+    for i, lookup in enumerate(lookups):
+        repository = data.get(f"r{i}") or {}
+        if lookup.version is not None:
+            release = repository.get("release")
+            value = None
+            if release is not None:
+                value = release_data(
+                    {
+                        "name": release["name"],
+                        "tag_name": release["tagName"],
+                        "published_at": release["publishedAt"],
+                        "html_url": release["url"],
+                    }
+                )
+                if is_latest(lookup.version):
+                    follow_up.append(
+                        Lookup(lookup.name, files=[(value.tag, "release.yaml")])
+                    )
+            key = (owner, lookup.name, lookup.version, None)
+            found.append(Found(get_release, key, value))
+        for j, (ref, path) in enumerate(lookup.files):
+            blob = repository.get(f"f{j}")
+            if blob is not None and (blob.get("text") is None or blob["isTruncated"]):
+                # Binary or large files are left to the contents api.
+                continue
+            text = None if blob is None else blob["text"]
+            found.append(Found(get_file_content, (owner, lookup.name, ref, path), text))
+    return found, follow_up
 
 
 def parse_relate_images(log: logging.Logger, images: list[str]) -> list[Repo]:
@@ -287,50 +999,57 @@ def parse_relate_images(log: logging.Logger, images: list[str]) -> list[Repo]:
     return out
 
 
+@memoized(key=lambda owner, repo, file_path, ref: (owner, repo, ref, file_path))
 def get_file_content(owner: str, repo: str, file_path: str, ref: str) -> str:
     global log
     log = log
     log.info(f"Getting file content for {owner}/{repo}/{file_path} at {ref}")
 
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}?ref={ref}"
-    response = requests.get(url, headers=set_headers(), timeout=TIMEOUT)
+    url = contents_path(owner, repo, file_path, ref)
+    # The raw media type returns the file itself rather than base64 inside JSON.
+    response = get_client(owner).get(url, immutable=pinned(ref), headers=RAW)
     response.raise_for_status()
-    file_data = response.json()
-
-    # GitHub API returns content in base64 encoding
-    content = base64.b64decode(file_data["content"]).decode("utf-8")
+    content = response.content.decode("utf-8")
 
     log.debug(f"Successfully fetched {file_path} content from {ref}")
     return content
 
 
+def contents_path(owner: str, repo: str, file_path: str, ref: str) -> str:
+    return f"/repos/{owner}/{repo}/contents/{file_path}?ref={ref}"
+
+
+def csv_path(name: str) -> str:
+    return f"bundle/manifests/{name}.clusterserviceversion.yaml"
+
+
 def get_related_images(log: logging.Logger, owner: str, _repo: Repo) -> list[str]:
     log.info(f"Getting the related images from {_repo.name}'s CSV")
-    _images: list[str] = []
-
     try:
         ref = _repo.tag if _repo.tag is not None else "main"
         csv_yaml_content = get_file_content(
             owner,
             _repo.name,
-            f"bundle/manifests/{_repo.name}.clusterserviceversion.yaml",
+            csv_path(_repo.name),
             ref,
         )
     except requests.exceptions.HTTPError as e:
         log.debug(f"file was not found, {e}")
         raise ValueError("file not found")
-    content: Dict[str, Any] = yaml.safe_load(csv_yaml_content)
+    return related_images(csv_yaml_content)
+
+
+def related_images(csv_yaml_content: str) -> list[str]:
+    _images: list[str] = []
+    # Only spec.relatedImages is built, the rest of the CSV is skipped over.
+    images = manifest.extract(csv_yaml_content, ["spec", "relatedImages"])
     log.info("CSV file loaded")
-    spec = content.get("spec")
-    if spec is None:
-        return _images
-    related_images = spec.get("relatedImages")
-    log.debug(f"{related_images=}")
+    log.debug(f"{images=}")
 
-    if related_images is None:
+    if images is None:
         return _images
 
-    for image in related_images:
+    for image in images:
         log.debug(image)
         _images.append(image["image"])
     log.debug(f"{_images=}")
@@ -348,7 +1067,12 @@ def get_operator_release_yaml(
 
     tag = _version
     log.debug("Get the latest release information")
-    release_data = get_release(owner, repo)
+    try:
+        release_data = get_release(owner, repo)
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            raise ValueError(f"No release found for {repo}")
+        raise
 
     if not release_data.tag:
         raise ValueError(f"No release found for {repo}")
@@ -378,7 +1102,7 @@ def get_operator_release_yaml(
 
 def parse_release_yaml_to_repos(yaml_str: str) -> list[Repo]:
     repos: list[Repo] = []
-    data = yaml.safe_load(yaml_str)
+    data = manifest.load(yaml_str)
     for key, value in data["dependencies"].items():
         repos.append(Repo(f"{key}@{version_formatter(value)}"))
     return repos
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from rich.tree import Tree
+
+from sector import logger
+
+if TYPE_CHECKING:
+    from sector.github import Repo
+
+log: logging.Logger = logger.get_logger("graph")
+
+RELEASE_YAML = "release.yaml"
+CSV = "csv"
+
+
+@dataclass
+class Edge:
+    repo: "Repo"
+    source: str
+
+
+@dataclass
+class Node:
+    repo: "Repo"
+    depth: int = 0
+    edges: list[Edge] = field(default_factory=list)
+
+
+Key = tuple[str | None, str, str | None]
+
+
+def key(repo: "Repo") -> Key:
+    return repo.owner, repo.name, repo.tag
+
+
+@dataclass
+class Graph:
+    root: Node
+    nodes: dict[Key, Node] = field(default_factory=dict)
+
+    def repos(self) -> list["Repo"]:
+        return [node.repo for node in self.nodes.values()]
+
+
+def resolve(
+    root: "Repo",
+    root_edges: list[Edge],
+    expand: Callable[["Repo"], list[Edge]],
+    jobs: int,
+    max_depth: int | None = None,
+    prefetch: Callable[[list["Repo"]], None] | None = None,
+) -> Graph:
+    """
+    Breadth first walk of the dependency graph starting from an already expanded root.
+    Each level is expanded on a worker pool and every (owner, name, tag) is only expanded once,
+    so shared dependencies and cycles are not fetched again.
+    When given, prefetch is called with each level before it is expanded.
+    """
+    graph = Graph(root=Node(repo=root, edges=root_edges))
+    graph.nodes[key(root)] = graph.root
+    frontier = [graph.root]
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while frontier:
+            level = next_level(graph, frontier, max_depth)
+            if prefetch is not None and level:
+                prefetch([node.repo for node in level])
+            for node, edges in zip(level, pool.map(lambda n: expand(n.repo), level)):
+                node.edges = edges
+            frontier = level
+    log.info(f"resolved {len(graph.nodes)} nodes")
+    return graph
+
+
+async def resolve_async(
+    root: "Repo",
+    root_edges: list[Edge],
+    expand: Callable[["Repo"], Awaitable[list[Edge]]],
+    max_depth: int | None = None,
+    prefetch: Callable[[list["Repo"]], Awaitable[None]] | None = None,
+) -> Graph:
+    """The same walk as resolve, with each level expanded concurrently on the event loop."""
+    graph = Graph(root=Node(repo=root, edges=root_edges))
+    graph.nodes[key(root)] = graph.root
+    frontier = [graph.root]
+    while frontier:
+        level = next_level(graph, frontier, max_depth)
+        if prefetch is not None and level:
+            await prefetch([node.repo for node in level])
+        expanded = await asyncio.gather(*(expand(node.repo) for node in level))
+        for node, edges in zip(level, expanded):
+            node.edges = edges
+        frontier = level
+    log.info(f"resolved {len(graph.nodes)} nodes")
+    return graph
+
+
+def next_level(graph: Graph, frontier: list[Node], max_depth: int | None) -> list[Node]:
+    """Add the unseen dependencies of the frontier to the graph, returning those to expand."""
+    level: list[Node] = []
+    for parent in frontier:
+        for edge in parent.edges:
+            if key(edge.repo) in graph.nodes:
+                continue
+            node = Node(repo=edge.repo, depth=parent.depth + 1)
+            graph.nodes[key(edge.repo)] = node
+            level.append(node)
+
+    if max_depth is not None:
+        level = [node for node in level if node.depth < max_depth]
+    log.debug(f"expanding {len(level)} nodes")
+    return level
+
+
+def render(graph: Graph) -> Tree:
+    tree = Tree(str(graph.root.repo))
+    rendered = {key(graph.root.repo)}
+
+    def add(branch: Tree, node: Node) -> None:
+        for edge in node.edges:
+            child = graph.nodes[key(edge.repo)]
+            sub_branch = branch.add(str(edge.repo))
+            # Shared dependencies and cycles are only expanded once, at their shallowest point.
+            if key(edge.repo) not in rendered and child.depth == node.depth + 1:
+                rendered.add(key(edge.repo))
+                add(sub_branch, child)
+
+    add(tree, graph.root)
+    return tree
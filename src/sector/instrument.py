@@ -0,0 +1,220 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Iterator, TypeVar
+
+from sector import logger
+
+if TYPE_CHECKING:
+    from rich.table import Table
+
+log: logging.Logger = logger.get_logger("instrument")
+
+T = TypeVar("T")
+
+_repo: ContextVar[str | None] = ContextVar("repo", default=None)
+
+
+def category(url: str) -> str:
+    path = url.split("?")[0]
+    if path.endswith("/graphql"):
+        return "graphql"
+    if "/releases/" in path:
+        return "releases"
+    if "/compare/" in path:
+        return "compare"
+    if "/commits/" in path and path.endswith("/pulls"):
+        return "commit-pulls"
+    if path.endswith("/pulls"):
+        return "pulls"
+    if "/contents/" in path:
+        return "contents"
+    if "/git/blobs/" in path:
+        return "blobs"
+    return "other"
+
+
+@dataclass
+class Event:
+    name: str
+    category: str
+    start: float
+    duration: float
+    thread: int
+    repo: str | None = None
+    url: str = ""
+    status: int = 0
+    size: int = 0
+    cache: str = "off"
+    retries: int = 0
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class Recorder:
+    """Collects timings of API calls and per repo spans while enabled."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.requests: list[Event] = []
+        self.spans: list[Event] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.spans.clear()
+            self._origin = time.perf_counter()
+
+    def request(
+        self,
+        url: str,
+        start: float,
+        status: int,
+        size: int,
+        cache: str = "off",
+        retries: int = 0,
+    ) -> None:
+        if not self.enabled:
+            return
+        event = Event(
+            name=category(url),
+            category="request",
+            start=start,
+            duration=time.perf_counter() - start,
+            thread=threading.get_ident(),
+            repo=_repo.get(),
+            url=url,
+            status=status,
+            size=size,
+            cache=cache,
+            retries=retries,
+        )
+        with self._lock:
+            self.requests.append(event)
+
+    @contextmanager
+    def span(self, repo: str) -> Iterator[None]:
+        """Attribute the requests made inside the block to a repo and time it."""
+        token = _repo.set(repo)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            _repo.reset(token)
+            if self.enabled:
+                event = Event(
+                    name=repo,
+                    category="repo",
+                    start=start,
+                    duration=time.perf_counter() - start,
+                    thread=threading.get_ident(),
+                    repo=repo,
+                )
+                with self._lock:
+                    self.spans.append(event)
+
+    def call(self, repo: str, func: Callable[..., T], *args: Any) -> T:
+        with self.span(repo):
+            return func(*args)
+
+    def endpoint_table(self) -> "Table":
+        from rich.table import Table
+
+        by_category: dict[str, list[Event]] = defaultdict(list)
+        for event in self.requests:
+            by_category[event.name].append(event)
+
+        table = Table(title="GitHub API calls")
+        for column in (
+            "Endpoint",
+            "Count",
+            "p50",
+            "p95",
+            "Total",
+            "Bytes",
+            "Cache hits",
+            "Retries",
+        ):
+            table.add_column(
+                column, justify="left" if column == "Endpoint" else "right"
+            )
+        for name, events in sorted(by_category.items()):
+            durations = [e.duration for e in events]
+            table.add_row(
+                name,
+                str(len(events)),
+                f"{percentile(durations, 50) * 1000:.0f}ms",
+                f"{percentile(durations, 95) * 1000:.0f}ms",
+                f"{sum(durations):.2f}s",
+                str(sum(e.size for e in events)),
+                str(sum(1 for e in events if e.cache == "hit")),
+                str(sum(e.retries for e in events)),
+            )
+        return table
+
+    def repo_table(self) -> "Table":
+        from rich.table import Table
+
+        totals: dict[str, float] = defaultdict(float)
+        requests: dict[str, int] = defaultdict(int)
+        for span in self.spans:
+            totals[span.name] += span.duration
+        for event in self.requests:
+            requests[event.repo or "-"] += 1
+
+        table = Table(title="Time per repo")
+        table.add_column("Repo")
+        table.add_column("Total", justify="right")
+        table.add_column("Requests", justify="right")
+        for repo, total in sorted(totals.items(), key=lambda t: t[1], reverse=True):
+            table.add_row(repo, f"{total:.2f}s", str(requests[repo]))
+        return table
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Events in the Chrome trace event format, viewable in chrome://tracing or Perfetto."""
+        pid = os.getpid()
+        events = []
+        for event in self.spans + self.requests:
+            args: dict[str, Any] = {"repo": event.repo}
+            if event.category == "request":
+                args.update(
+                    url=event.url,
+                    status=event.status,
+                    bytes=event.size,
+                    cache=event.cache,
+                    retries=event.retries,
+                )
+            events.append(
+                {
+                    "name": event.name,
+                    "cat": event.category,
+                    "ph": "X",
+                    "ts": (event.start - self._origin) * 1_000_000,
+                    "dur": event.duration * 1_000_000,
+                    "pid": pid,
+                    "tid": event.thread,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: str) -> None:
+        log.info(f"writing trace to {path}")
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+recorder = Recorder()
@@ -1,9 +1,15 @@
 import logging
 
+LOG_FILE = "sector.log"
 
-def configure(debug: bool = False) -> None:
+
+def configure(debug: bool = False, log_file: str | None = None) -> None:
+    # Without --debug or --log-file no file is written, warnings still reach
+    # stderr through the last resort handler of logging.
+    if not debug and log_file is None:
+        return
     level = logging.INFO
-    handlers = [logging.FileHandler("sector.log")]
+    handlers = [logging.FileHandler(log_file or LOG_FILE)]
     if debug:
         level = logging.DEBUG
         # handlers.append(logging.StreamHandler(sys.stdout))
@@ -14,6 +20,7 @@ def configure(debug: bool = False) -> None:
     )
     logging.getLogger("requests").setLevel(logging.WARNING)
     logging.getLogger("urllib3").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
 
 
 def get_logger(name: str | None = None) -> logging.Logger:
@@ -0,0 +1,116 @@
+import logging
+from typing import Any
+
+import yaml
+
+from sector import logger
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader  # type: ignore[assignment]
+
+log: logging.Logger = logger.get_logger("manifest")
+
+
+class UnknownAlias(Exception):
+    """An alias refers to an anchor outside of the extracted value."""
+
+
+def load(document: str) -> Any:
+    """yaml.safe_load, with the libyaml loader when it is available."""
+    return yaml.load(document, Loader=SafeLoader)
+
+
+def extract(document: str, path: list[str]) -> Any:
+    """
+    Load only the value at path in the first document, e.g. ["spec", "relatedImages"].
+    The parser stops once the value has been read, and the rest of the document is
+    skipped over as events instead of being built. None is returned when the path
+    does not exist.
+    """
+    loader = SafeLoader(document)
+    try:
+        loader.get_event()
+        if loader.check_event(yaml.StreamEndEvent):
+            return None
+        loader.get_event()
+        node = find(loader, path)
+        return None if node is None else loader.construct_document(node)
+    except UnknownAlias:
+        log.debug(f"falling back to a full load to extract {path}")
+        value = load(document)
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    finally:
+        loader.dispose()
+
+
+def find(loader: Any, path: list[str]) -> yaml.Node | None:
+    if not path:
+        return compose(loader, {})
+    if not loader.check_event(yaml.MappingStartEvent):
+        skip(loader)
+        return None
+    loader.get_event()
+    while not loader.check_event(yaml.MappingEndEvent):
+        key = compose(loader, {})
+        if isinstance(key, yaml.ScalarNode) and key.value == path[0]:
+            return find(loader, path[1:])
+        skip(loader)
+    return None
+
+
+def compose(loader: Any, anchors: dict[str, yaml.Node]) -> yaml.Node:
+    """Build the node starting at the next event, resolving tags as yaml.compose does."""
+    event = loader.get_event()
+    if isinstance(event, yaml.AliasEvent):
+        if event.anchor not in anchors:
+            raise UnknownAlias(event.anchor)
+        return anchors[event.anchor]
+
+    node: yaml.Node
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node = yaml.ScalarNode(tag, event.value, style=event.style)
+    elif isinstance(event, yaml.SequenceStartEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.SequenceNode, None, event.implicit)
+        node = yaml.SequenceNode(tag, [])
+        while not loader.check_event(yaml.SequenceEndEvent):
+            node.value.append(compose(loader, anchors))
+        loader.get_event()
+    else:
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.MappingNode, None, event.implicit)
+        node = yaml.MappingNode(tag, [])
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = compose(loader, anchors)
+            node.value.append((key, compose(loader, anchors)))
+        loader.get_event()
+    # Set apart from the constructors, the libyaml loader has its own Mark type.
+    node.start_mark = event.start_mark
+    node.end_mark = event.end_mark
+    if event.anchor is not None:
+        anchors[event.anchor] = node
+    return node
+
+
+def skip(loader: Any) -> None:
+    """Consume the events of the next node without building it."""
+    depth = 0
+    while True:
+        event = loader.get_event()
+        if isinstance(event, (yaml.SequenceStartEvent, yaml.MappingStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.SequenceEndEvent, yaml.MappingEndEvent)):
+            depth -= 1
+        if depth == 0:
+            return
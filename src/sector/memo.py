@@ -0,0 +1,102 @@
+import copy
+import functools
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator, TypeVar, cast
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Memo:
+    """
+    Thread safe store of call results.
+    A call that is already in flight is waited on instead of being repeated.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future[Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def call(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if future is None:
+                future = Future()
+                self._calls[key] = future
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if owner:
+            try:
+                future.set_result(func())
+            except BaseException as e:
+                future.set_exception(e)
+        # Callers are free to change what they get back, so each gets a copy.
+        return copy.deepcopy(future.result())
+
+    def prime(
+        self, key: Hashable, result: Any = None, error: BaseException | None = None
+    ) -> None:
+        """Store the outcome of a call that was made some other way, unless it is already known."""
+        with self._lock:
+            if key in self._calls:
+                return
+            future: Future[Any] = Future()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+            self._calls[key] = future
+
+
+_memo: Memo | None = None
+
+
+@contextmanager
+def scope() -> Iterator[Memo]:
+    """Memoize the decorated calls until the scope is left, nested scopes share the outer one."""
+    global _memo
+    if _memo is not None:
+        yield _memo
+        return
+    _memo = Memo()
+    try:
+        yield _memo
+    finally:
+        _memo = None
+
+
+def prime(
+    func: Callable[..., Any],
+    key: Hashable,
+    result: Any = None,
+    error: BaseException | None = None,
+) -> None:
+    """Prime a memoized function with the outcome for key, while a scope is active."""
+    memo = _memo
+    if memo is not None:
+        memo.prime((func.__name__, key), result, error)
+
+
+def memoized(key: Callable[..., Hashable]) -> Callable[[F], F]:
+    """Memoize a function on the given key while a scope is active."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            memo = _memo
+            if memo is None:
+                return func(*args, **kwargs)
+            return memo.call(
+                (func.__name__, key(*args, **kwargs)),
+                lambda: func(*args, **kwargs),
+            )
+
+        return cast(F, wrapper)
+
+    return decorator
@@ -0,0 +1,101 @@
+import json
+import sys
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from sector.diff import Change
+    from sector.github import Data, Repo
+    from sector.graph import Graph
+
+TEXT = "text"
+JSON = "json"
+NDJSON = "ndjson"
+YAML = "yaml"
+FORMATS = (TEXT, JSON, NDJSON, YAML)
+
+
+def data_record(data: "Data") -> dict[str, Any]:
+    return asdict(data)
+
+
+def change_record(change: "Change") -> dict[str, Any]:
+    return {**asdict(change), "status": change.status}
+
+
+def graph_record(graph: "Graph") -> dict[str, Any]:
+    return {
+        "root": str(graph.root.repo),
+        "nodes": [
+            {
+                **repo_fields(node.repo),
+                "depth": node.depth,
+                "dependencies": [
+                    {
+                        **repo_fields(edge.repo),
+                        "source": edge.source,
+                    }
+                    for edge in node.edges
+                ],
+            }
+            for node in graph.nodes.values()
+        ],
+    }
+
+
+def repo_fields(repo: "Repo") -> dict[str, Any]:
+    """The owner is only included for a repo which named one."""
+    fields = {"name": repo.name, "tag": repo.tag}
+    if repo.owner is not None:
+        fields = {"owner": repo.owner, **fields}
+    return fields
+
+
+def read_data(record: dict[str, Any]) -> "Data":
+    """The reverse of data_record."""
+    from sector.github import Data, PrData, ReleaseData
+
+    release = dict(record["github"])
+    release["prs"] = [PrData(**pr) for pr in release["prs"]]
+    return Data(record["owner"], record["project"], ReleaseData(**release))
+
+
+def read_graph(record: dict[str, Any]) -> "Graph":
+    """The reverse of graph_record."""
+    from sector.github import Repo
+    from sector.graph import Edge, Graph, Node, key
+
+    def repo(record: dict[str, Any]) -> Repo:
+        found = Repo(record["name"])
+        found.owner = record.get("owner")
+        found.tag = record["tag"]
+        return found
+
+    nodes = [
+        Node(
+            repo(node),
+            node["depth"],
+            [Edge(repo(edge), edge["source"]) for edge in node["dependencies"]],
+        )
+        for node in record["nodes"]
+    ]
+    graph = Graph(root=Node(Repo(record["root"])))
+    graph.nodes = {key(node.repo): node for node in nodes}
+    graph.root = graph.nodes.get(key(graph.root.repo), graph.root)
+    return graph
+
+
+def write_record(kind: str, record: dict[str, Any]) -> None:
+    """Write a single NDJSON line and flush it so consumers can start straight away."""
+    sys.stdout.write(json.dumps({"kind": kind, **record}) + "\n")
+    sys.stdout.flush()
+
+
+def write_document(document: Any, fmt: str) -> None:
+    if fmt == YAML:
+        import yaml
+
+        sys.stdout.write(yaml.safe_dump(document, sort_keys=False))
+    else:
+        sys.stdout.write(json.dumps(document, indent=2) + "\n")
+    sys.stdout.flush()
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Mapping, Protocol
+
+from sector import logger
+
+log: logging.Logger = logger.get_logger("ratelimit")
+
+RESERVE = 100
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+
+class Response(Protocol):
+    """The parts of a requests or httpx response that are needed here."""
+
+    @property
+    def status_code(self) -> int: ...
+
+    @property
+    def headers(self) -> Mapping[str, str]: ...
+
+    @property
+    def url(self) -> Any: ...
+
+    @property
+    def text(self) -> str: ...
+
+    @property
+    def content(self) -> bytes: ...
+
+
+@dataclass
+class Budget:
+    limit: int
+    remaining: int
+    reset: float
+
+
+def resource_for(url: str) -> str:
+    if url.endswith("/graphql"):
+        return "graphql"
+    if "/search/" in url:
+        return "search"
+    return "core"
+
+
+class RateLimiter:
+    """
+    Tracks the GitHub rate limit budgets from response headers.
+    Requests are spread out once a budget runs low, and throttled or failed
+    responses are retried with jittered backoff.
+    """
+
+    def __init__(
+        self,
+        reserve: int = RESERVE,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+    ) -> None:
+        self.reserve = reserve
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.budgets: dict[str, Budget] = {}
+        self.requests = 0
+        self.retries = 0
+        self.waited = 0.0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def delay(self, resource: str) -> float:
+        """Reserve a request against the budget and return how long to wait before sending it."""
+        now = time.time()
+        with self._lock:
+            self.requests += 1
+            wait = max(0.0, self._paused_until - now)
+            budget = self.budgets.get(resource)
+            if budget is None or budget.reset <= now:
+                return wait
+            if budget.remaining <= 0:
+                wait = max(wait, budget.reset - now)
+            elif budget.remaining <= self.reserve:
+                # Spread what is left of the budget over the time until it resets.
+                wait = max(wait, (budget.reset - now) / budget.remaining)
+            # Count requests that are in flight so concurrent callers see them.
+            budget.remaining -= 1
+            return wait
+
+    def acquire(self, resource: str) -> None:
+        self.wait(self.delay(resource))
+
+    def wait(self, seconds: float) -> None:
+        if self._waiting(seconds):
+            time.sleep(seconds)
+
+    async def acquire_async(self, resource: str) -> None:
+        await self.wait_async(self.delay(resource))
+
+    async def wait_async(self, seconds: float) -> None:
+        if self._waiting(seconds):
+            await asyncio.sleep(seconds)
+
+    def _waiting(self, seconds: float) -> bool:
+        if seconds <= 0:
+            return False
+        log.info(f"waiting {seconds:.1f}s for the GitHub rate limit")
+        with self._lock:
+            self.waited += seconds
+        return True
+
+    def update(self, response: Response) -> None:
+        headers = response.headers
+        if "X-RateLimit-Remaining" not in headers:
+            return
+        resource = headers.get("X-RateLimit-Resource", "core")
+        budget = Budget(
+            limit=int(headers.get("X-RateLimit-Limit", 0)),
+            remaining=int(headers["X-RateLimit-Remaining"]),
+            reset=float(headers.get("X-RateLimit-Reset", 0)),
+        )
+        with self._lock:
+            current = self.budgets.get(resource)
+            # Ignore late responses from a window that has already reset.
+            if current is None or budget.reset >= current.reset:
+                self.budgets[resource] = budget
+
+    def backoff(self, response: Response, attempt: int) -> float | None:
+        """Return how long to wait before retrying the response, or None if it should not be retried."""
+        status = response.status_code
+        if status not in (403, 429) and status < 500:
+            return None
+        if attempt >= self.max_retries:
+            log.warning(f"giving up on {response.url} after {attempt} retries")
+            return None
+
+        retry_after = response.headers.get("Retry-After")
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if retry_after is not None:
+            delay = float(retry_after)
+        elif remaining == "0" and reset is not None:
+            delay = max(0.0, float(reset) - time.time()) + 1
+        elif status == 403 and "rate limit" not in response.text.lower():
+            # A plain permission error, retrying will not help.
+            return None
+        else:
+            delay = random.uniform(
+                0, min(self.backoff_max, self.backoff_base * 2**attempt)
+            )
+
+        with self._lock:
+            self.retries += 1
+            if status in (403, 429):
+                # Rate limits apply to the token, so pause every thread.
+                self._paused_until = max(self._paused_until, time.time() + delay)
+        log.warning(f"{status} from {response.url}, retrying in {delay:.1f}s")
+        return delay
+
+    def summary(self) -> str:
+        with self._lock:
+            parts = [
+                f"GitHub API: {self.requests} requests, {self.retries} retries, "
+                f"{self.waited:.1f}s throttled"
+            ]
+            for resource, budget in sorted(self.budgets.items()):
+                reset = datetime.fromtimestamp(budget.reset).strftime("%H:%M:%S")
+                parts.append(
+                    f"{resource} {budget.remaining}/{budget.limit} remaining "
+                    f"(resets {reset})"
+                )
+        return "; ".join(parts)
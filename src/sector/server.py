@@ -0,0 +1,419 @@
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+from urllib import error, request
+
+from rich import print
+
+if TYPE_CHECKING:
+    from sector.github import Repo
+
+from sector import logger, output, state, webhook
+from sector.defaults import HOST, INTERVAL, JOBS, PORT
+
+log: logging.Logger = logger.get_logger("server")
+
+# The first answer to a query is worked out while the caller waits.
+TIMEOUT = 600
+FUTURE = "future"
+CURRENT = "current"
+
+
+class Unavailable(Exception):
+    """The daemon could not be reached."""
+
+
+def runtime_file() -> Path:
+    """Where a running daemon writes its address and token."""
+    base = os.getenv("XDG_RUNTIME_DIR", "")
+    if len(base) == 0:
+        return state.state_dir() / "server.json"
+    return Path(base) / "sector" / "server.json"
+
+
+def future(query: dict[str, Any], jobs: int) -> Any:
+    from sector import github
+
+    repos = [github.Repo(p) for p in query["projects"]]
+    data = github.process_repos(query["owner"], repos, query["detailed"], jobs)
+    return {"repos": [output.data_record(d) for d in data]}
+
+
+def current(query: dict[str, Any], jobs: int) -> Any:
+    from sector import github, memo
+
+    with memo.scope():
+        dependency_graph = github.resolve_graph(
+            query["owner"],
+            query["project"],
+            log,
+            {"mapper": query["mapper"]},
+            query["version"],
+            jobs,
+            query["max_depth"],
+        )
+        repos = github.graph_repos(dependency_graph)
+        data = github.process_repos(query["owner"], repos, True, jobs)
+    return github.result_document(dependency_graph, data)
+
+
+VIEWS: dict[str, Callable[[dict[str, Any], int], Any]] = {
+    FUTURE: future,
+    CURRENT: current,
+}
+
+
+@dataclass
+class Answer:
+    kind: str
+    query: dict[str, Any]
+    document: Any = None
+    updated_at: float = 0.0
+    hits: int = 0
+
+
+class Daemon:
+    """
+    The answers to the queries asked so far, kept in memory and refreshed in the background.
+    Answers are worked out one at a time, as the memo scope of a run is shared by the process.
+    """
+
+    def __init__(self, jobs: int = JOBS, interval: float = INTERVAL) -> None:
+        self.jobs = jobs
+        self.interval = interval
+        self.answers: dict[str, Answer] = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._work = threading.Lock()
+        self._stop = threading.Event()
+        # Webhook deliveries are answered straight away, the answers are updated after.
+        self._updates = ThreadPoolExecutor(max_workers=1)
+
+    def ask(self, kind: str, query: dict[str, Any]) -> Answer:
+        if kind not in VIEWS:
+            raise ValueError(f"Unknown query {kind}")
+        key = json.dumps([kind, query], sort_keys=True)
+        with self._lock:
+            answer = self.answers.get(key)
+            if answer is not None:
+                answer.hits += 1
+                return answer
+        with self._work:
+            # It may have been worked out while waiting for the previous one.
+            answer = self.answers.get(key)
+            if answer is None:
+                answer = self.work(Answer(kind, query))
+                with self._lock:
+                    self.answers[key] = answer
+        return answer
+
+    def work(self, answer: Answer) -> Answer:
+        start = time.perf_counter()
+        answer.document = VIEWS[answer.kind](answer.query, self.jobs)
+        answer.updated_at = time.time()
+        log.info(
+            f"answered {answer.kind} {answer.query} in {time.perf_counter() - start:.2f}s"
+        )
+        return answer
+
+    def refresh(self) -> None:
+        """Work out every answer again, they are kept when it fails."""
+        with self._lock:
+            answers = list(self.answers.values())
+        for answer in answers:
+            with self._work:
+                try:
+                    self.work(answer)
+                except Exception as e:
+                    log.warning(f"refreshing {answer.kind} {answer.query} failed: {e}")
+
+    def notify(self, event: webhook.Event) -> "Future[None]":
+        """Drop what an event made stale, and update the answers it changes in the background."""
+        webhook.invalidate(event)
+        return self._updates.submit(self.update, event)
+
+    def update(self, event: webhook.Event) -> None:
+        """Work out again only the records of the event's repo, in the answers which have it."""
+        from sector import github
+
+        with self._lock:
+            answers = list(self.answers.values())
+        for answer in answers:
+            records = answer.document["repos"]
+            # Compared as the state store keys them, GitHub names are case insensitive.
+            found = {
+                state.key(record["owner"], record["project"]) for record in records
+            }
+            if state.key(event.owner, event.repo) not in found:
+                continue
+            with self._work:
+                try:
+                    if answer.kind == CURRENT and event.name == webhook.RELEASE:
+                        # A release can change the dependencies, so the graph is resolved again.
+                        self.work(answer)
+                        continue
+                    detailed = answer.kind == CURRENT or answer.query["detailed"]
+                    records = list(records)
+                    for i, repo in enumerate(query_repos(answer)):
+                        owner = repo.owned_by(answer.query["owner"])
+                        if state.key(owner, repo.name) == state.key(
+                            event.owner, event.repo
+                        ):
+                            data = github.process_repo(owner, repo, detailed)
+                            records[i] = output.data_record(data)
+                    answer.document = {**answer.document, "repos": records}
+                    answer.updated_at = time.time()
+                    log.info(f"updated {event.owner}/{event.repo} in {answer.kind}")
+                except Exception as e:
+                    log.warning(f"updating {answer.kind} {answer.query} failed: {e}")
+
+    def wait(self) -> None:
+        """Block until the answers are updated for the events so far."""
+        self._updates.submit(lambda: None).result()
+
+    def run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._updates.shutdown(wait=False)
+
+    def health(self) -> dict[str, Any]:
+        from sector import client
+
+        gh = client.current()
+        return {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "queries": len(self.answers),
+            "rate_limit": None if gh is None else gh.limiter.summary(),
+        }
+
+
+def query_repos(answer: Answer) -> list["Repo"]:
+    """The repos of the records in an answer, in the same order."""
+    from sector.github import Repo
+
+    if answer.kind == FUTURE:
+        return [Repo(p) for p in answer.query["projects"]]
+    repos = []
+    for record in answer.document["repos"]:
+        repo = Repo(f"{record['project']}@{record['github']['tag']}")
+        # A dependency can be of another owner than the one asked about.
+        repo.owner = record["owner"]
+        repos.append(repo)
+    return repos
+
+
+class Server:
+    """
+    Local HTTP front of a daemon, only the holder of the token can ask it anything.
+    When a secret is given GitHub webhooks signed with it are accepted on /webhook.
+    """
+
+    def __init__(
+        self,
+        daemon: Daemon,
+        host: str = HOST,
+        port: int = PORT,
+        secret: str | None = None,
+    ) -> None:
+        self.daemon = daemon
+        self.secret = secret
+        self.token = secrets.token_urlsafe(32)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, daemon=True),
+            threading.Thread(target=daemon.run, daemon=True),
+        ]
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def __enter__(self) -> "Server":
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.daemon.stop()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def publish(self, path: Path | None = None) -> Path:
+        """Write the runtime file the CLI finds the daemon with, readable by the user only."""
+        path = path or runtime_file()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        runtime = {"url": self.url, "token": self.token, "pid": os.getpid()}
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(runtime, f)
+        log.info(f"serving on {self.url}, runtime file {path}")
+        return path
+
+    def receive(
+        self, name: str, body: bytes, signature: str
+    ) -> tuple[int, dict[str, Any]]:
+        """Handle a webhook delivery, returning the status and body of the reply."""
+        if self.secret is None:
+            return 404, {"error": "Webhooks need a secret to be set"}
+        if not webhook.verify(self.secret, body, signature):
+            return 401, {"error": "Missing or wrong signature"}
+        try:
+            event = webhook.parse(name, json.loads(body))
+        except (ValueError, KeyError) as e:
+            return 400, {"error": str(e)}
+        if event is None:
+            return 200, {"ignored": True}
+        self.daemon.notify(event)
+        return 202, {"event": event.name, "repo": f"{event.owner}/{event.repo}"}
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                log.debug(format % args)
+
+            def do_GET(self) -> None:
+                if not self.authorized():
+                    return
+                if self.path != "/health":
+                    self.reply(404, {"error": f"No route for {self.path}"})
+                    return
+                self.reply(200, server.daemon.health())
+
+            def do_POST(self) -> None:
+                if self.path == "/webhook":
+                    self.webhook()
+                    return
+                if not self.authorized():
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    query = json.loads(self.rfile.read(length))
+                    answer = server.daemon.ask(self.path.strip("/"), query)
+                except (ValueError, KeyError) as e:
+                    self.reply(400, {"error": str(e)})
+                    return
+                except Exception as e:
+                    log.exception(e)
+                    self.reply(502, {"error": str(e)})
+                    return
+                self.reply(
+                    200, {"document": answer.document, "updated_at": answer.updated_at}
+                )
+
+            def webhook(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.reply(
+                    *server.receive(
+                        self.headers.get(webhook.EVENT, ""),
+                        body,
+                        self.headers.get(webhook.SIGNATURE, ""),
+                    )
+                )
+
+            def authorized(self) -> bool:
+                expected = f"Bearer {server.token}"
+                if secrets.compare_digest(
+                    self.headers.get("Authorization", ""), expected
+                ):
+                    return True
+                self.reply(401, {"error": "Missing or wrong token"})
+                return False
+
+            def reply(self, status: int, body: Any) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def serve(
+    host: str = HOST,
+    port: int = PORT,
+    jobs: int = JOBS,
+    interval: float = INTERVAL,
+    secret: str | None = None,
+) -> None:
+    """Run a daemon until interrupted, the runtime file is removed on the way out."""
+    with Server(Daemon(jobs, interval), host, port, secret) as server:
+        path = server.publish()
+        print(f"sector is serving on {server.url}, stop it with Ctrl+C")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            path.unlink(missing_ok=True)
+
+
+@dataclass
+class Connection:
+    url: str
+    token: str
+
+    def ask(self, kind: str, query: dict[str, Any]) -> Any:
+        """
+        Return the daemon's answer to a query. A ValueError is raised when the daemon
+        could not answer it, and Unavailable when the daemon could not be reached.
+        """
+        headers = {"Authorization": f"Bearer {self.token}"}
+        body = self.post(f"/{kind}", json.dumps(query).encode(), headers)
+        log.info(f"answered by the daemon, as of {time.ctime(body['updated_at'])}")
+        return body["document"]
+
+    def deliver(self, event: str, payload: bytes, secret: str) -> Any:
+        """Send a webhook payload to the daemon, signed the way GitHub signs it."""
+        headers = {
+            webhook.EVENT: event,
+            webhook.SIGNATURE: webhook.sign(secret, payload),
+        }
+        return self.post("/webhook", payload, headers)
+
+    def post(self, path: str, data: bytes, headers: dict[str, str]) -> Any:
+        req = request.Request(
+            f"{self.url}{path}",
+            data=data,
+            headers={"Content-Type": "application/json", **headers},
+            method="POST",
+        )
+        try:
+            with request.urlopen(req, timeout=TIMEOUT) as response:
+                return json.loads(response.read())
+        except error.HTTPError as e:
+            if e.code == 401 and "Authorization" in headers:
+                raise Unavailable(f"the daemon at {self.url} refused the token") from e
+            raise ValueError(json.loads(e.read()).get("error", str(e))) from e
+        except OSError as e:
+            raise Unavailable(f"the daemon at {self.url} is not answering: {e}") from e
+
+
+def find(path: Path | None = None) -> Connection | None:
+    """Return a connection to the running daemon, None when there is none."""
+    path = path or runtime_file()
+    try:
+        runtime = json.loads(path.read_text())
+        os.kill(runtime["pid"], 0)
+    except (OSError, ValueError, KeyError):
+        return None
+    return Connection(runtime["url"], runtime["token"])
@@ -0,0 +1,120 @@
+import gzip
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from sector import logger, output
+from sector.defaults import JOBS
+
+if TYPE_CHECKING:
+    from sector.github import Data
+    from sector.graph import Graph
+
+log: logging.Logger = logger.get_logger("snapshot")
+
+SNAPSHOT = "snapshot"
+# Bumped when a snapshot written by an older sector can no longer be read.
+FORMAT = 1
+# A version given to diff is only read as a snapshot when it ends in one of these.
+SUFFIXES = (".jsonl", ".jsonl.gz")
+
+
+@dataclass
+class Snapshot:
+    """
+    A resolved dependency graph along with the release data and PRs of its repos.
+    On disk it is JSON lines, the header followed by the same `graph` and `release`
+    records `current --output ndjson` writes, gzipped when the path ends in `.gz`.
+    """
+
+    owner: str
+    project: str
+    version: str
+    graph: "Graph"
+    data: list["Data"] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+
+
+def is_snapshot(path: str) -> bool:
+    return path.endswith(SUFFIXES)
+
+
+def open_file(path: str | Path, writing: bool = False) -> IO[str]:
+    gzipped = str(path).endswith(".gz")
+    if writing:
+        if gzipped:
+            return gzip.open(path, "wt", encoding="utf-8")
+        return open(path, "w", encoding="utf-8")
+    if gzipped:
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def write(path: str | Path, snapshot: Snapshot) -> None:
+    header = {
+        "kind": SNAPSHOT,
+        "format": FORMAT,
+        "owner": snapshot.owner,
+        "project": snapshot.project,
+        "version": snapshot.version,
+        "created_at": snapshot.created_at,
+    }
+    records = [
+        header,
+        {"kind": "graph", **output.graph_record(snapshot.graph)},
+        *({"kind": "release", **output.data_record(d)} for d in snapshot.data),
+    ]
+    with open_file(path, writing=True) as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    log.info(f"Wrote a snapshot of {len(snapshot.data)} repos to {path}")
+
+
+def read(path: str | Path) -> Snapshot:
+    """Read a snapshot written by write, a ValueError is raised when it is not one."""
+    try:
+        with open_file(path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+        raise ValueError(f"{path} is not a snapshot, {e}")
+    if not records or records[0].get("kind") != SNAPSHOT:
+        raise ValueError(f"{path} is not a snapshot")
+    header = records[0]
+    if header["format"] > FORMAT:
+        raise ValueError(f"{path} was written by a newer sector")
+
+    graphs = [r for r in records if r["kind"] == "graph"]
+    if len(graphs) != 1:
+        raise ValueError(f"{path} does not have a dependency graph")
+    return Snapshot(
+        owner=header["owner"],
+        project=header["project"],
+        version=header["version"],
+        graph=output.read_graph(graphs[0]),
+        data=[output.read_data(r) for r in records if r["kind"] == "release"],
+        created_at=header["created_at"],
+    )
+
+
+def capture(
+    owner: str,
+    project: str,
+    log: logging.Logger,
+    config: dict[Any, Any],
+    _version: str = "latest",
+    jobs: int = JOBS,
+    max_depth: int | None = None,
+) -> Snapshot:
+    """Resolve the graph of project and look up the details of all its repos."""
+    from sector import github, memo
+
+    with memo.scope():
+        dependency_graph = github.resolve_graph(
+            owner, project, log, config, _version, jobs, max_depth
+        )
+        repos = github.graph_repos(dependency_graph)
+        data = github.process_repos(owner, repos, True, jobs)
+    return Snapshot(owner, project, _version, dependency_graph, data)
@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from sector import logger
+
+log: logging.Logger = logger.get_logger("state")
+
+
+def state_dir() -> Path:
+    base = os.getenv("XDG_STATE_HOME", "")
+    if len(base) == 0:
+        return Path.home() / ".local" / "state" / "sector"
+    return Path(base) / "sector"
+
+
+@dataclass
+class RepoState:
+    """
+    What a detailed run found for a repo: the commits from the release `base` up to `head`
+    along with the pull requests of each commit.
+    """
+
+    owner: str
+    name: str
+    base: str
+    head: str
+    shas: list[str] = field(default_factory=list)
+    prs: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
+    updated_at: float = 0.0
+
+
+class StateStore:
+    """Per repo state kept between runs, so only the commits since the last run are fetched."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        if path is None:
+            path = state_dir() / "state.sqlite"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        log.debug(f"using state store at {path}")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS repos (key TEXT PRIMARY KEY, state TEXT)"
+            )
+
+    def get(self, owner: str, name: str, base: str) -> RepoState | None:
+        """Return the state of a repo, unless it was built from a different release."""
+        state = self.load(owner, name)
+        if state is None:
+            return None
+        if state.base != base:
+            log.info(f"{owner}/{name} was released as {base}, dropping its state")
+            return None
+        return state
+
+    def load(self, owner: str, name: str) -> RepoState | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM repos WHERE key = ?", (key(owner, name),)
+            ).fetchone()
+        if row is None:
+            return None
+        return RepoState(**json.loads(row[0]))
+
+    def record(
+        self,
+        owner: str,
+        name: str,
+        base: str,
+        shas: list[str],
+        prs: dict[str, list[dict[str, Any]]],
+    ) -> None:
+        """Store the commits since the release, the last one is where the next run starts."""
+        head = shas[-1] if shas else base
+        self.put(RepoState(owner, name, base, head, shas, prs))
+
+    def put(self, state: RepoState) -> None:
+        state.updated_at = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO repos VALUES (?, ?)",
+                (key(state.owner, state.name), json.dumps(asdict(state))),
+            )
+
+    def delete(self, owner: str, name: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM repos WHERE key = ?", (key(owner, name),))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def key(owner: str, name: str) -> str:
+    """GitHub names are case insensitive, so Kuadrant/Authorino is kuadrant/authorino."""
+    return f"{owner}/{name}".lower()
+
+
+_store: StateStore | None = None
+
+
+def enable(path: Path | None = None) -> StateStore:
+    """Turn on incremental runs, using the store at path."""
+    global _store
+    disable()
+    _store = StateStore(path)
+    return _store
+
+
+def disable() -> None:
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
+
+
+def current() -> StateStore | None:
+    """Return the store when incremental runs are enabled."""
+    return _store
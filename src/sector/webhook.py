@@ -0,0 +1,98 @@
+import hashlib
+import hmac
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from sector import logger, state
+
+log: logging.Logger = logger.get_logger("webhook")
+
+RELEASE = "release"
+PUSH = "push"
+PULL_REQUEST = "pull_request"
+EVENTS = (RELEASE, PUSH, PULL_REQUEST)
+SIGNATURE = "X-Hub-Signature-256"
+EVENT = "X-GitHub-Event"
+
+
+def sign(secret: str, body: bytes) -> str:
+    """The X-Hub-Signature-256 GitHub sends along with a delivery of body."""
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify(secret: str, body: bytes, signature: str) -> bool:
+    return hmac.compare_digest(sign(secret, body), signature)
+
+
+@dataclass
+class Event:
+    name: str
+    owner: str
+    repo: str
+    payload: dict[str, Any]
+
+
+def parse(name: str, payload: dict[str, Any]) -> Event | None:
+    """
+    Return the event for a delivery, None when it does not change any data sector has.
+    Only pushes to the default branch count, as that is what releases are compared with.
+    """
+    if name not in EVENTS or "repository" not in payload:
+        return None
+    repository = payload["repository"]
+    if name == PUSH:
+        if payload.get("ref") != f"refs/heads/{repository.get('default_branch')}":
+            return None
+    # GitHub names are case insensitive, the login is sent as the owner spells it, e.g. Kuadrant.
+    owner, repo = repository["owner"]["login"].lower(), repository["name"].lower()
+    return Event(name, owner, repo, payload)
+
+
+def invalidate(event: Event) -> None:
+    """
+    Drop the cached responses of the repo which can change, the responses for pinned
+    tags are kept. A release also drops the incremental state, as the commits are now
+    counted from a new base, and a pull request is updated in place.
+    """
+    from sector.client import get_client
+
+    gh = get_client(event.owner)
+    if gh.cache is not None:
+        dropped = gh.cache.invalidate(f"/repos/{event.owner}/{event.repo}/")
+        log.info(
+            f"{event.name} dropped {dropped} responses of {event.owner}/{event.repo}"
+        )
+
+    store = state.current()
+    if store is None:
+        return
+    if event.name == RELEASE:
+        store.delete(event.owner, event.repo)
+    elif event.name == PULL_REQUEST:
+        update_prs(store, event.owner, event.repo, event.payload["pull_request"])
+
+
+def update_prs(
+    store: state.StateStore, owner: str, name: str, pull_request: dict[str, Any]
+) -> None:
+    """Update the title of a known pull request, and add a merged one to its commit."""
+    previous = store.load(owner, name)
+    if previous is None:
+        return
+    # The same shape as the PRs found with the GraphQL api.
+    pr = {
+        "id": pull_request["id"],
+        "title": pull_request["title"],
+        "html_url": pull_request["html_url"],
+    }
+    for prs in previous.prs.values():
+        for i, known in enumerate(prs):
+            if known["id"] == pr["id"]:
+                prs[i] = pr
+    sha = pull_request.get("merge_commit_sha")
+    if pull_request.get("merged") and sha in previous.prs:
+        if pr not in previous.prs[sha]:
+            previous.prs[sha].append(pr)
+    store.put(previous)
@@ -0,0 +1,51 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from sector import bench, client, server
+
+
+@pytest.fixture(autouse=True)
+def client_options() -> Iterator[None]:
+    """Put back the GitHub client options changed by a test, or by a command it ran."""
+    saved = client.options()
+    yield
+    client.restore(saved)
+
+
+@pytest.fixture
+def corpus() -> bench.Corpus:
+    """The corpus served by `fixtures`, a test module overrides it for one of its own."""
+    return bench.Corpus.generate(repos=3, commits=4)
+
+
+@pytest.fixture
+def fixtures(
+    corpus: bench.Corpus, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[bench.FixtureServer]:
+    """A fixture server serving the corpus, with the GitHub client pointed at it."""
+    # The commands turn the cache on, it must not be the user's.
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    with bench.FixtureServer(corpus) as fixtures, bench.pointed_at(fixtures, 4):
+        yield fixtures
+
+
+@pytest.fixture
+def secret() -> str | None:
+    """The webhook secret of `daemon`, webhooks are not accepted without one."""
+    return None
+
+
+@pytest.fixture
+def daemon(
+    fixtures: bench.FixtureServer,
+    secret: str | None,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> Iterator[server.Server]:
+    """A published daemon answering from the fixture server."""
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    with server.Server(server.Daemon(jobs=4), secret=secret) as running:
+        running.publish()
+        yield running
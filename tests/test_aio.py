@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from sector import aio, bench, client, defaults, github, output
+
+httpx = pytest.importorskip("httpx")
+
+log = logging.getLogger("test")
+
+
+@pytest.fixture(autouse=True)
+def reset_client() -> Any:
+    yield
+    aio._client = None
+
+
+@pytest.fixture
+def server() -> Any:
+    corpus = bench.Corpus.generate(repos=3, commits=120)
+    with bench.FixtureServer(corpus) as server, bench.pointed_at(server, 4):
+        yield server
+
+
+def repos() -> list[github.Repo]:
+    return [github.Repo(name) for name in bench.Corpus.generate(3, 0).repos]
+
+
+class TestAsyncClient:
+    """Test the async GitHub client."""
+
+    def test_missing_httpx(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a clear error is raised when httpx is not installed."""
+        monkeypatch.setattr(aio, "HAS_HTTPX", False)
+
+        with pytest.raises(ValueError, match="install sector\\[async\\]"):
+            aio.AsyncGitHubClient()
+
+    def test_retries_throttled_response(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a 429 is retried after the Retry-After delay."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+        statuses = iter([429, 200])
+
+        def handler(request: Any) -> Any:
+            return httpx.Response(next(statuses), json={}, headers={"Retry-After": "0"})
+
+        async def main() -> int:
+            async with aio.AsyncGitHubClient() as gh:
+                gh.http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+                response = await gh.get("/repos/kuadrant/authorino")
+                assert gh.limiter.retries == 1
+                return int(response.status_code)
+
+        assert asyncio.run(main()) == 200
+
+    def test_cache_serves_pinned_content(
+        self,
+        server: bench.FixtureServer,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that immutable responses are read back from the cache."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        path = "/repos/bench/bench-1/releases/tags/v1.0.0"
+
+        async def main() -> list[str]:
+            async with aio.AsyncGitHubClient(base_url=server.url, cache=True) as gh:
+                first = await gh.get(path, immutable=True)
+                second = await gh.get(path, immutable=True)
+                return [first.json()["tag_name"], second.json()["tag_name"]]
+
+        assert asyncio.run(main()) == ["v1.0.0", "v1.0.0"]
+        assert server.requests["releases"] == 1
+
+
+class TestAsyncFunctions:
+    """Test the async GitHub calls against the fixture server."""
+
+    def test_memoized_calls_are_shared(self, server: bench.FixtureServer) -> None:
+        """Test that concurrent calls for the same release make one request."""
+
+        async def main() -> list[github.ReleaseData]:
+            async with aio.connect() as gh:
+                repo = github.Repo("bench-1@v1.0.0")
+                return await asyncio.gather(
+                    *(aio.get_release(gh, "bench", repo) for _ in range(5))
+                )
+
+        releases = asyncio.run(main())
+
+        assert {r.tag for r in releases} == {"v1.0.0"}
+        assert server.requests["releases"] == 1
+
+    def test_commits_between_paginates(self, server: bench.FixtureServer) -> None:
+        """Test that every page of the comparison is followed."""
+
+        async def main() -> list[str]:
+            async with aio.connect() as gh:
+                commits = aio.get_commits_between(
+                    gh, "bench", "bench-1", "v1.0.0", "main"
+                )
+                return [sha async for sha in commits]
+
+        assert len(asyncio.run(main())) == 120
+        assert server.requests["compare"] == 2
+
+    def test_info_matches_threads(
+        self, server: bench.FixtureServer, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that both backends give the same detailed output."""
+        github.info("bench", repos(), log, "time", True, fmt=output.JSON)
+        expected = json.loads(capsys.readouterr().out)
+
+        asyncio.run(aio.info("bench", repos(), log, "time", True, fmt=output.JSON))
+
+        assert json.loads(capsys.readouterr().out) == expected
+        assert expected[0]["github"]["commit_count"] == 120
+        assert len(expected[0]["github"]["prs"]) == 60
+
+    def test_pulls_strategy_matches_commits(
+        self,
+        server: bench.FixtureServer,
+        capsys: pytest.CaptureFixture[str],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that the merged PRs give the same PRs as the per-commit lookups."""
+        monkeypatch.setattr(github, "pr_strategy", defaults.COMMITS)
+        github.info("bench", repos(), log, "time", True, fmt=output.JSON)
+        expected = json.loads(capsys.readouterr().out)
+        monkeypatch.setattr(github, "pr_strategy", defaults.PULLS)
+        server.requests.clear()
+
+        github.info("bench", repos(), log, "time", True, fmt=output.JSON)
+        threads = json.loads(capsys.readouterr().out)
+        asyncio.run(aio.info("bench", repos(), log, "time", True, fmt=output.JSON))
+
+        assert threads == expected
+        assert json.loads(capsys.readouterr().out) == expected
+        # The 61 PRs of each repo fit on one page of 100.
+        assert server.requests["pulls"] == 6
+
+    def test_owner_qualified_repos(
+        self,
+        server: bench.FixtureServer,
+        capsys: pytest.CaptureFixture[str],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that a repo of another owner is looked up with that owner's client."""
+        monkeypatch.setenv("GITHUB_TOKEN_BENCH", "bench")
+        qualified = [github.Repo("bench/bench-1"), github.Repo("bench/bench-2")]
+
+        github.info("other", qualified, log, "time", True, fmt=output.JSON)
+        expected = json.loads(capsys.readouterr().out)
+        asyncio.run(aio.info("other", qualified, log, "time", True, fmt=output.JSON))
+
+        assert json.loads(capsys.readouterr().out) == expected
+        assert [d["owner"] for d in expected] == ["bench", "bench"]
+        assert list(client.owners()) == ["bench"]
+        gh = aio.current()
+        assert gh is not None
+        assert list(gh.owners) == ["bench"]
+
+    def test_result_matches_threads(
+        self, server: bench.FixtureServer, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that both backends resolve the same dependency graph."""
+        config: dict[str, Any] = {"mapper": {}}
+        github.result("bench", bench.ROOT, log, config, "name", fmt=output.JSON)
+        expected = json.loads(capsys.readouterr().out)
+        requests = sum(server.requests.values())
+
+        asyncio.run(
+            aio.result("bench", bench.ROOT, log, config, "name", fmt=output.JSON)
+        )
+
+        assert json.loads(capsys.readouterr().out) == expected
+        assert len(expected["graph"]["nodes"]) == 3
+        assert sum(server.requests.values()) == 2 * requests
+
+    def test_ndjson_streams_records(
+        self, server: bench.FixtureServer, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that a record is written for each repo."""
+        asyncio.run(aio.info("bench", repos(), log, "time", False, fmt=output.NDJSON))
+
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert sorted(r["project"] for r in records) == sorted(
+            bench.Corpus.generate(3, 0).repos
+        )
+
+
+class TestAsyncBench:
+    """Test the async benchmark scenarios."""
+
+    def test_future_detailed_async(self) -> None:
+        """Test that the async scenario makes the same requests as the threaded one."""
+        corpus = bench.Corpus.generate(repos=2, commits=120)
+
+        result = bench.run("future-detailed-async", corpus)
+
+        assert result.requests_by_category == {
+            "releases": 2,
+            "compare": 4,
+            "graphql": 6,
+        }
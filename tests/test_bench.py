@@ -0,0 +1,110 @@
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from sector import bench, client
+from sector.cli import cli
+
+
+class TestCorpus:
+    """Test the generated corpus."""
+
+    def test_generate(self) -> None:
+        """Test that every repo has a release, a comparison and PRs."""
+        corpus = bench.Corpus.generate(repos=3, commits=4)
+
+        assert corpus.repos == ["bench-operator", "bench-1", "bench-2"]
+        assert "/repos/bench/bench-1/releases/tags/v1.0.0" in corpus.routes
+        assert (
+            len(corpus.routes["/repos/bench/bench-2/compare/v1.0.0...main"]["commits"])
+            == 4
+        )
+        assert len(corpus.pulls) == 12
+
+    def test_dump_and_load(self, tmp_path: Path) -> None:
+        """Test that a corpus can be saved and replayed."""
+        corpus = bench.Corpus.generate(repos=2, commits=1)
+        corpus.dump(tmp_path / "corpus.json")
+
+        assert bench.Corpus.load(tmp_path / "corpus.json") == corpus
+
+
+class TestRun:
+    """Test running the scenarios against the fixture server."""
+
+    def test_future(self) -> None:
+        """Test that the plain listing makes one release call per repo."""
+        result = bench.run("future", bench.Corpus.generate(repos=3, commits=5))
+
+        assert result.requests_by_category == {"releases": 3}
+        assert result.peak_memory > 0
+
+    def test_future_detailed_paginates(self) -> None:
+        """Test that the compare pages and GraphQL batches are all requested."""
+        result = bench.run(
+            "future-detailed", bench.Corpus.generate(repos=2, commits=120), jobs=2
+        )
+
+        assert result.commits == 120
+        assert result.requests_by_category == {
+            "releases": 2,
+            "compare": 4,
+            "graphql": 6,
+        }
+
+    def test_current(self) -> None:
+        """Test that the dependency chain is resolved from the root release.yaml."""
+        result = bench.run("current", bench.Corpus.generate(repos=3, commits=2))
+
+        # Only the root release and release.yaml are fetched on their own, the
+        # dependencies' releases and files are looked up together with GraphQL.
+        assert result.requests_by_category["contents"] == 1
+        assert result.requests_by_category["releases"] == 2
+        assert result.requests_by_category["compare"] == 3
+
+    def test_pointed_at_restores_options(self) -> None:
+        """Test that the client options from before the run are put back."""
+        before = client.options()
+        corpus = bench.Corpus.generate(repos=1, commits=1)
+
+        with bench.FixtureServer(corpus) as server, bench.pointed_at(server, 8):
+            assert client.options()["base_url"] == server.url
+
+        assert client.options() == before
+
+    def test_unknown_scenario(self) -> None:
+        """Test that an unknown scenario is rejected."""
+        with pytest.raises(ValueError, match="Unknown scenario"):
+            bench.run("nope", bench.Corpus.generate(repos=1, commits=1))
+
+
+class TestBenchCommand:
+    """Test the bench command."""
+
+    def test_bench_json(self) -> None:
+        """Test that the results can be written as json."""
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            [
+                "--no-cache",
+                "bench",
+                "--repos",
+                "2",
+                "--commits",
+                "3",
+                "--latency",
+                "0",
+                "-s",
+                "future",
+                "-o",
+                "json",
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        records = json.loads(result.output)
+        assert records[0]["scenario"] == "future"
+        assert records[0]["requests"] == 2
@@ -0,0 +1,148 @@
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from sector.cache import HttpCache
+from sector.client import GitHubClient
+
+
+def make_response(
+    status_code: int = 200, body: bytes = b"{}", headers: dict[str, str] | None = None
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.url = "https://api.github.com/repos/kuadrant/authorino"
+    response.headers.update(headers or {})
+    return response
+
+
+@pytest.fixture
+def gh(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> GitHubClient:
+    monkeypatch.setenv("GITHUB_TOKEN", "test")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    return GitHubClient(cache=True, cache_ttl=60)
+
+
+class TestHttpCache:
+    """Test the on-disk response store."""
+
+    def test_put_and_get(self, tmp_path: Path) -> None:
+        """Test that a stored response round trips with its validators."""
+        cache = HttpCache(tmp_path / "http.sqlite")
+        response = make_response(
+            body=b'{"tag_name": "v1.0.0"}',
+            headers={"ETag": '"abc"', "Content-Encoding": "gzip"},
+        )
+
+        cache.put("key", response, immutable=True)
+        entry = cache.get("key")
+
+        assert entry is not None
+        assert entry.etag == '"abc"'
+        assert entry.immutable
+        assert "Content-Encoding" not in entry.headers
+        assert entry.response().json() == {"tag_name": "v1.0.0"}
+
+    def test_get_missing(self, tmp_path: Path) -> None:
+        """Test that unknown keys are not found."""
+        cache = HttpCache(tmp_path / "http.sqlite")
+
+        assert cache.get("missing") is None
+
+    def test_entry_freshness(self, tmp_path: Path) -> None:
+        """Test that only mutable entries expire."""
+        cache = HttpCache(tmp_path / "http.sqlite")
+        cache.put("mutable", make_response(), immutable=False)
+        cache.put("immutable", make_response(), immutable=True)
+
+        mutable = cache.get("mutable")
+        immutable = cache.get("immutable")
+        assert mutable is not None and immutable is not None
+
+        mutable.stored_at = immutable.stored_at = time.time() - 3600
+        assert not mutable.fresh(60)
+        assert immutable.fresh(60)
+
+
+class TestCachingClient:
+    """Test the conditional request handling in the client."""
+
+    def test_immutable_content_skips_network(self, gh: GitHubClient) -> None:
+        """Test that pinned content is only fetched once."""
+        with patch.object(gh.session, "get") as mock_get:
+            mock_get.return_value = make_response(body=b'{"tag_name": "v1.0.0"}')
+
+            gh.get("/repos/kuadrant/authorino/releases/tags/v1.0.0", immutable=True)
+            response = gh.get(
+                "/repos/kuadrant/authorino/releases/tags/v1.0.0", immutable=True
+            )
+
+        assert mock_get.call_count == 1
+        assert response.json() == {"tag_name": "v1.0.0"}
+
+    def test_stale_content_is_revalidated(self, gh: GitHubClient) -> None:
+        """Test that an expired entry sends If-None-Match and reuses the body on 304."""
+        gh.cache_ttl = 0
+        with patch.object(gh.session, "get") as mock_get:
+            mock_get.side_effect = [
+                make_response(body=b'{"tag_name": "v1.0.0"}', headers={"ETag": '"a"'}),
+                make_response(status_code=304, body=b""),
+            ]
+
+            gh.get("/repos/kuadrant/authorino/releases/latest")
+            response = gh.get("/repos/kuadrant/authorino/releases/latest")
+
+        assert mock_get.call_count == 2
+        assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"a"'
+        assert response.status_code == 200
+        assert response.json() == {"tag_name": "v1.0.0"}
+
+    def test_refresh_revalidates_immutable(self, gh: GitHubClient) -> None:
+        """Test that refresh goes to the network even for pinned content."""
+        gh.refresh = True
+        with patch.object(gh.session, "get") as mock_get:
+            mock_get.side_effect = [
+                make_response(headers={"ETag": '"a"'}),
+                make_response(status_code=304, body=b""),
+            ]
+
+            gh.get("/repos/kuadrant/authorino/releases/tags/v1.0.0", immutable=True)
+            gh.get("/repos/kuadrant/authorino/releases/tags/v1.0.0", immutable=True)
+
+        assert mock_get.call_count == 2
+
+    def test_errors_are_not_cached(self, gh: GitHubClient) -> None:
+        """Test that failed responses are passed through and not stored."""
+        with patch.object(gh.session, "get") as mock_get:
+            mock_get.return_value = make_response(status_code=404)
+
+            gh.get("/repos/kuadrant/authorino/releases/tags/v9", immutable=True)
+            response = gh.get(
+                "/repos/kuadrant/authorino/releases/tags/v9", immutable=True
+            )
+
+        assert mock_get.call_count == 2
+        assert response.status_code == 404
+
+    def test_cached(self, gh: GitHubClient) -> None:
+        """Test that only a fresh entry for the same headers answers a path."""
+        path = "/repos/kuadrant/authorino/contents/release.yaml?ref=v1.0.0"
+        raw = {"Accept": "application/vnd.github.raw"}
+        with patch.object(gh.session, "get") as mock_get:
+            mock_get.return_value = make_response(body=b"dependencies: {}")
+            gh.get(path, headers=raw, immutable=True)
+
+        assert gh.cached(path, raw)
+        assert not gh.cached(path)
+        gh.refresh = True
+        assert not gh.cached(path, raw)
+
+    def test_no_cache(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the cache is not created when disabled."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+
+        assert GitHubClient(cache=False).cache is None
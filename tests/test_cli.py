@@ -1,11 +1,16 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
 from typing import Any
 from unittest.mock import Mock, patch
 
 import pytest
 from click.testing import CliRunner
 
-from sector.cli import current
-from sector.github import ReleaseData
+from sector.cli import current, future
+from sector.github import Data, ReleaseData, Repo
 
 
 class TestResultCommand:
@@ -49,9 +54,13 @@ dependencies:
         # Mock parsed repos from YAML (without kuadrant-operator)
         class MockRepo:
             def __init__(self, name: str):
+                self.owner = None
                 self.name = name
                 self.tag = "v1.0.0" if "authorino" in name else "v2.0.0"
 
+            def owned_by(self, owner: str) -> str:
+                return owner
+
             def __str__(self) -> str:
                 return self.name
 
@@ -122,3 +131,144 @@ dependencies:
         output_text = result_output.output
         assert "Error:" in output_text
         assert "Configuration file not found" in output_text
+
+    @patch("sector.github.process_repo")
+    @patch("sector.github.expand")
+    @patch("sector.github.expand_root")
+    @patch("sector.configuration.load")
+    def test_result_json_output(
+        self,
+        mock_config_load: Mock,
+        mock_expand_root: Mock,
+        mock_expand: Mock,
+        mock_process_repo: Mock,
+    ) -> None:
+        """Test that json output contains the graph and the release data."""
+        from sector.github import Data, Repo
+        from sector.graph import RELEASE_YAML, Edge
+
+        mock_config_load.return_value = {"mapper": {}}
+
+        def expand_root(log: Any, owner: str, root: Repo, *args: Any) -> list[Edge]:
+            root.tag = "v3.0.0"
+            return [Edge(Repo("authorino@v1.0.0"), RELEASE_YAML)]
+
+        mock_expand_root.side_effect = expand_root
+        mock_expand.return_value = []
+        mock_process_repo.side_effect = lambda owner, repo, detailed: Data(
+            owner=owner, project=repo.name, github=ReleaseData(tag=repo.tag)
+        )
+
+        runner = CliRunner()
+        result_output = runner.invoke(current, ["--owner", "kuadrant", "-o", "json"])
+
+        assert result_output.exit_code == 0
+        document = json.loads(result_output.output)
+        assert document["graph"]["root"] == "kuadrant-operator@v3.0.0"
+        assert [r["project"] for r in document["repos"]] == [
+            "authorino",
+            "kuadrant-operator",
+        ]
+
+
+class TestFutureCommand:
+    """Test the future command functionality."""
+
+    @patch("sector.github.process_repo")
+    @patch("sector.github.discover_repos")
+    def test_future_discovers_repos(
+        self, mock_discover_repos: Mock, mock_process_repo: Mock
+    ) -> None:
+        """Test that discovered repos are processed along with the given projects."""
+        mock_discover_repos.return_value = iter([Repo("authorino"), Repo("limitador")])
+        mock_process_repo.side_effect = lambda owner, repo, detailed: Data(
+            owner=owner, project=repo.name, github=ReleaseData(tag=repo.tag or "")
+        )
+
+        runner = CliRunner()
+        result_output = runner.invoke(
+            future,
+            ["--topic", "kuadrant", "-p", "authorino@v1.0.0", "-o", "json"],
+        )
+
+        assert result_output.exit_code == 0, result_output.output
+        mock_discover_repos.assert_called_once_with("kuadrant", ("kuadrant",), None)
+        records = json.loads(result_output.output)
+        assert [(r["project"], r["github"]["tag"]) for r in records] == [
+            ("authorino", "v1.0.0"),
+            ("limitador", ""),
+        ]
+
+    @patch("sector.github.process_repo")
+    @patch("sector.github.discover_repos")
+    def test_future_all_skips_defaults(
+        self, mock_discover_repos: Mock, mock_process_repo: Mock
+    ) -> None:
+        """Test that the default projects are not used when discovering."""
+        mock_discover_repos.return_value = iter([Repo("wasm-shim")])
+        mock_process_repo.side_effect = lambda owner, repo, detailed: Data(
+            owner=owner, project=repo.name, github=ReleaseData()
+        )
+
+        runner = CliRunner()
+        result_output = runner.invoke(future, ["--all", "-o", "ndjson"])
+
+        assert result_output.exit_code == 0, result_output.output
+        assert mock_process_repo.call_count == 1
+
+
+class TestStartup:
+    """Test that the CLI starts without loading the GitHub clients."""
+
+    # Budget for the imports of `sector --help`, the interpreter start up is not counted.
+    BUDGET_MS = 100
+    HEAVY = (
+        "requests",
+        "yaml",
+        "httpx",
+        "rich.progress",
+        "sector.github",
+        "sector.client",
+    )
+
+    @pytest.mark.parametrize("args", [["--help"], ["future", "--help"]])
+    def test_help_imports(self, args: list[str], tmp_path: Path) -> None:
+        """Test that the help loads none of the heavy modules and writes no log."""
+        imports = self.help_imports(args, tmp_path)
+
+        assert not [name for name in self.HEAVY if name in imports]
+        assert not list(tmp_path.iterdir())
+
+    @pytest.mark.timing
+    def test_help_import_time(self, tmp_path: Path) -> None:
+        """Test that `sector --help` stays within the import time budget."""
+        # The fastest of a few runs, so a busy machine or stale bytecode is not counted.
+        runs = [self.help_imports(["--help"], tmp_path) for _ in range(3)]
+
+        assert min(imports["sector.cli"] for imports in runs) / 1000 < self.BUDGET_MS
+
+    def help_imports(self, args: list[str], cwd: Path) -> dict[str, int]:
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                f"from sector.cli import cli; cli({args!r})",
+            ],
+            capture_output=True,
+            text=True,
+            cwd=cwd,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert "Usage:" in result.stdout
+        # Lines look like "import time: self [us] | cumulative | imported package".
+        imports = {}
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, cumulative, name = line.split("|")
+                if cumulative.strip().isdigit():
+                    imports[name.strip()] = int(cumulative)
+        return imports
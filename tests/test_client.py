@@ -0,0 +1,162 @@
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from sector import client
+from sector.client import GitHubClient, set_headers
+
+
+def make_response(
+    body: bytes = b"{}", status_code: int = 200, headers: dict[str, str] | None = None
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.url = "https://api.github.com/graphql"
+    response.headers.update(headers or {})
+    return response
+
+
+class TestSetHeaders:
+    """Test the GitHub request headers."""
+
+    def test_set_headers_missing_token(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a missing token raises a ValueError."""
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+
+        with pytest.raises(ValueError, match="GITHUB_TOKEN not set"):
+            set_headers()
+
+    def test_set_headers_with_token(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the token and gzip encoding are set."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+
+        headers = set_headers()
+
+        assert headers["Authorization"] == "token test"
+        assert "gzip" in headers["Accept-Encoding"]
+
+    def test_set_headers_owner_token(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that an owner's own token is used, and GITHUB_TOKEN otherwise."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+        monkeypatch.setenv("GITHUB_TOKEN_MY_ORG", "org")
+
+        assert set_headers("my-org")["Authorization"] == "token org"
+        assert set_headers("kuadrant")["Authorization"] == "token test"
+
+
+class TestGitHubClient:
+    """Test the shared GitHub client."""
+
+    def test_client_session_is_pooled(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the session has prebuilt headers and a sized pool."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+
+        gh = GitHubClient(pool_size=8)
+
+        assert gh.session.headers["Authorization"] == "token test"
+        adapter = gh.session.get_adapter("https://api.github.com")
+        assert adapter._pool_maxsize == 8  # type: ignore[attr-defined]
+
+    def test_adapter_leaves_responses_to_limiter(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the adapter does not retry 429 and 503, even with Retry-After."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+
+        gh = GitHubClient()
+
+        retry = gh.session.get_adapter("https://api.github.com").max_retries  # type: ignore[attr-defined]
+        assert not retry.is_retry("GET", 429, True)
+        assert not retry.is_retry("GET", 503, True)
+
+    def test_client_get_joins_base_url(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that paths are resolved against the base url."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+        gh = GitHubClient(base_url="http://localhost:8000/", timeout=5)
+
+        with patch.object(gh.session, "get") as mock_get:
+            mock_get.return_value = make_response()
+            gh.get("/repos/kuadrant/authorino")
+            gh.get("https://example.com/commits")
+
+        mock_get.assert_any_call(
+            "http://localhost:8000/repos/kuadrant/authorino", timeout=5
+        )
+        mock_get.assert_any_call("https://example.com/commits", timeout=5)
+
+    def test_get_client_is_shared(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the same client is returned until it is reconfigured."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+
+        first = client.get_client()
+        assert client.get_client() is first
+
+        client.configure(pool_size=4)
+        second = client.get_client()
+
+        assert second is not first
+        assert second.session.get_adapter("https://api.github.com")._pool_maxsize == 4  # type: ignore[attr-defined]
+
+    def test_get_client_per_owner(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that only an owner with its own token gets a client of its own."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+        monkeypatch.setenv("GITHUB_TOKEN_ENVOYPROXY", "envoy")
+
+        shared = client.get_client()
+        owned = client.get_client("EnvoyProxy")
+
+        assert client.get_client("kuadrant") is shared
+        assert client.get_client("envoyproxy") is owned
+        assert owned.session.headers["Authorization"] == "token envoy"
+        assert client.owners() == {"envoyproxy": owned}
+
+        client.configure(pool_size=4)
+
+        assert client.owners() == {}
+
+    def test_graphql_returns_data(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the data of a GraphQL response is returned."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+        gh = GitHubClient()
+
+        with patch.object(gh.session, "post") as mock_post:
+            mock_post.return_value = make_response(b'{"data": {"viewer": {}}}')
+            data = gh.graphql("query { viewer { login } }", {})
+
+        assert data == {"viewer": {}}
+        assert mock_post.call_args.args[0] == "https://api.github.com/graphql"
+
+    def test_graphql_failure(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a GraphQL response without data raises a ValueError."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+        gh = GitHubClient()
+
+        with patch.object(gh.session, "post") as mock_post:
+            mock_post.return_value = make_response(
+                b'{"errors": [{"message": "bad query"}]}'
+            )
+            with pytest.raises(ValueError, match="GraphQL query failed"):
+                gh.graphql("query { nope }", {})
+
+    def test_send_retries_throttled_responses(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a rate limited response is retried after Retry-After."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+        gh = GitHubClient()
+        mock_get = Mock(
+            side_effect=[
+                make_response(status_code=429, headers={"Retry-After": "2"}),
+                make_response(b'{"ok": true}'),
+            ]
+        )
+
+        with patch.object(gh.limiter, "wait") as mock_wait:
+            response = gh.send(mock_get, "https://api.github.com/repos")
+
+        assert response.json() == {"ok": True}
+        assert mock_get.call_count == 2
+        mock_wait.assert_any_call(2.0)
+        assert gh.limiter.retries == 1
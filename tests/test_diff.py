@@ -0,0 +1,135 @@
+import base64
+import json
+import logging
+from typing import Any
+
+import pytest
+from click.testing import CliRunner
+
+from sector import bench, diff, output
+from sector.cli import cli
+from sector.github import Repo
+from sector.graph import CSV, RELEASE_YAML, Edge, resolve
+
+log = logging.getLogger("test")
+
+
+@pytest.fixture
+def corpus() -> bench.Corpus:
+    """A corpus with a v1.1.0 of the root which moves bench-1, drops bench-3 and adds bench-4."""
+    corpus = bench.Corpus.generate(repos=5, commits=6)
+    routes = corpus.routes
+    root = f"/repos/{bench.OWNER}/{bench.ROOT}"
+    routes[f"{root}/releases/tags/v1.1.0"] = {
+        **routes[f"{root}/releases/latest"],
+        "tag_name": "v1.1.0",
+    }
+    routes[f"{root}/contents/release.yaml?ref=v1.1.0"] = {
+        "content": base64.b64encode(
+            b"dependencies:\n  bench-1: 1.1.0\n  bench-2: 1.0.0\n  bench-4: 1.0.0\n"
+        ).decode()
+    }
+    routes[f"{root}/contents/release.yaml?ref=v1.0.0"] = {
+        "content": base64.b64encode(
+            b"dependencies:\n  bench-1: 1.0.0\n  bench-2: 1.0.0\n  bench-3: 1.0.0\n"
+        ).decode()
+    }
+    bench_1 = f"/repos/{bench.OWNER}/bench-1"
+    routes[f"{bench_1}/releases/tags/v1.1.0"] = {
+        **routes[f"{bench_1}/releases/latest"],
+        "tag_name": "v1.1.0",
+    }
+    routes[f"{bench_1}/compare/v1.0.0...v1.1.0"] = routes[
+        f"{bench_1}/compare/v1.0.0...main"
+    ]
+    return corpus
+
+
+class TestCompareGraphs:
+    """Test finding the changed dependencies of two graphs."""
+
+    def test_statuses(self) -> None:
+        """Test that each dependency is compared by the tag closest to the root."""
+        before = resolve(
+            Repo("kuadrant-operator@v1.0.0"),
+            [
+                Edge(Repo("authorino@v0.1.0"), RELEASE_YAML),
+                Edge(Repo("limitador@v0.1.0"), RELEASE_YAML),
+            ],
+            lambda repo: [Edge(Repo("wasm-shim@v0.1.0"), CSV)],
+            jobs=1,
+        )
+        after = resolve(
+            Repo("kuadrant-operator@v1.1.0"),
+            [
+                Edge(Repo("authorino@v0.2.0"), RELEASE_YAML),
+                Edge(Repo("dns-operator@v0.1.0"), RELEASE_YAML),
+                Edge(Repo("wasm-shim@v0.1.0"), RELEASE_YAML),
+            ],
+            lambda repo: [Edge(Repo("wasm-shim@v0.0.1"), CSV)],
+            jobs=1,
+        )
+
+        changes = diff.compare_graphs(before, after, "kuadrant")
+
+        assert [(c.project, c.old, c.new, c.status) for c in changes] == [
+            ("kuadrant-operator", "v1.0.0", "v1.1.0", diff.CHANGED),
+            ("authorino", "v0.1.0", "v0.2.0", diff.CHANGED),
+            ("dns-operator", None, "v0.1.0", diff.ADDED),
+            ("limitador", "v0.1.0", None, diff.REMOVED),
+            ("wasm-shim", "v0.1.0", "v0.1.0", diff.UNCHANGED),
+        ]
+
+
+class TestDiff:
+    """Test comparing two releases against the fixture server."""
+
+    def test_only_changed_are_compared(
+        self, fixtures: bench.FixtureServer, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that the commits are only looked up for the dependency which moved."""
+        config: dict[str, Any] = {"mapper": {}}
+
+        diff.diff(
+            bench.OWNER, bench.ROOT, log, config, "v1.0.0", "v1.1.0", 4, None, "json"
+        )
+        document = json.loads(capsys.readouterr().out)
+
+        changes = {c["project"]: c for c in document["changes"]}
+        assert {name: c["status"] for name, c in changes.items()} == {
+            bench.ROOT: diff.CHANGED,
+            "bench-1": diff.CHANGED,
+            "bench-2": diff.UNCHANGED,
+            "bench-3": diff.REMOVED,
+            "bench-4": diff.ADDED,
+        }
+        assert changes["bench-1"]["commit_count"] == 6
+        assert len(changes["bench-1"]["prs"]) == 3
+        # The root has no compare route, which is logged and left without commits.
+        assert changes[bench.ROOT]["commit_count"] == 0
+        assert fixtures.requests["compare"] == 2
+
+    def test_ndjson(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test that a record is written for each dependency."""
+        changes = [diff.Change("bench", "bench-1", "v1.0.0", "v1.1.0")]
+
+        diff.report(changes, "v1.0.0", "v1.1.0", output.NDJSON)
+
+        record = json.loads(capsys.readouterr().out)
+        assert record["kind"] == "change"
+        assert record["status"] == diff.CHANGED
+
+    def test_cli(self, fixtures: bench.FixtureServer) -> None:
+        """Test that the text output lists what changed."""
+        runner = CliRunner()
+
+        result = runner.invoke(
+            cli,
+            ["diff", "v1.0.0", "v1.1.0", "--owner", bench.OWNER, "-p", bench.ROOT],
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "bench/bench-1: v1.0.0 -> v1.1.0 (3 PRs, 6 commits)" in result.stdout
+        assert "bench/bench-4: added at v1.0.0" in result.stdout
+        assert "bench/bench-3: removed, was v1.0.0" in result.stdout
+        assert "1 unchanged" in result.stdout
@@ -1,17 +1,36 @@
-from typing import Any
+from typing import Any, Iterator
 from unittest.mock import Mock, patch
 
 import pytest
 import requests
 import yaml
 
-from sector import logger
+from sector import github, logger, memo
+from sector.defaults import COMMITS, PULLS
 from sector.github import (
+    Data,
+    PrData,
+    PrIndex,
     ReleaseData,
     Repo,
+    add_merged,
+    dedup,
+    discover_owners,
+    discover_repos,
+    find_prs_for_commits,
+    get_commits_between,
     get_file_content,
     get_operator_release_yaml,
+    get_related_images,
+    get_release,
+    info,
+    mapper,
+    merged_pulls,
     parse_release_yaml_to_repos,
+    pinned,
+    prefetch_files,
+    process_repo,
+    use_pulls,
     version_formatter,
 )
 
@@ -24,23 +43,15 @@ log.debug(f"{locals()=}")
 class TestGitHubFunctions:
     """Test GitHub API interaction functions."""
 
-    @patch("sector.github.set_headers")
-    @patch("requests.get")
-    def test_get_file_content_success(
-        self, mock_get: Mock, mock_set_headers: Mock
-    ) -> None:
-        """Test successful file content retrieval."""
-        # Mock the headers
-        mock_set_headers.return_value = {"Authorization": "token test"}
-
-        # Mock the response
-        import base64
+    @patch("sector.github.get_client")
+    def test_get_file_content_success(self, mock_get_client: Mock) -> None:
+        """Test successful file content retrieval with the raw media type."""
+        mock_get = mock_get_client.return_value.get
 
         test_content = "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: test"
-        encoded_content = base64.b64encode(test_content.encode()).decode()
 
-        mock_response = Mock()
-        mock_response.json.return_value = {"content": encoded_content}
+        mock_response = Mock(status_code=200)
+        mock_response.content = test_content.encode()
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
 
@@ -52,19 +63,15 @@ class TestGitHubFunctions:
         # Verify the result
         assert result == test_content
         mock_get.assert_called_once_with(
-            "https://api.github.com/repos/kuadrant/kuadrant-operator/contents/release.yaml?ref=v1.0.0",
-            headers={"Authorization": "token test"},
-            timeout=30,
+            "/repos/kuadrant/kuadrant-operator/contents/release.yaml?ref=v1.0.0",
+            immutable=True,
+            headers={"Accept": "application/vnd.github.raw+json"},
         )
 
-    @patch("sector.github.set_headers")
-    @patch("requests.get")
-    def test_get_file_content_not_found(
-        self, mock_get: Mock, mock_set_headers: Mock
-    ) -> None:
+    @patch("sector.github.get_client")
+    def test_get_file_content_not_found(self, mock_get_client: Mock) -> None:
         """Test file content retrieval when file is not found."""
-        # Mock the headers
-        mock_set_headers.return_value = {"Authorization": "token test"}
+        mock_get = mock_get_client.return_value.get
 
         # Mock a 404 response
         mock_response = Mock()
@@ -149,6 +156,622 @@ class TestGitHubFunctions:
         ):
             get_operator_release_yaml(log, "kuadrant", "kuadrant-operator")
 
+    def test_release_data_empty(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test that a missing release is logged and stdout is left for the output."""
+        assert github.release_data({}) == ReleaseData()
+        assert capsys.readouterr().out == ""
+
+
+class TestCommitsBetween:
+    """Test the paginated compare lookup."""
+
+    @patch("sector.github.get_client")
+    def test_get_commits_between_follows_pages(self, mock_get_client: Mock) -> None:
+        """Test that every page of the comparison is read lazily."""
+        first = Mock()
+        first.json.return_value = {"commits": [{"sha": "a"}, {"sha": "b"}]}
+        first.links = {"next": {"url": "https://api.github.com/compare?page=2"}}
+        second = Mock()
+        second.json.return_value = {"commits": [{"sha": "c"}]}
+        second.links = {}
+        mock_get = mock_get_client.return_value.get
+        mock_get.side_effect = [first, second]
+
+        commits = get_commits_between("kuadrant", "authorino", "v1.0.0", "main")
+
+        assert mock_get.call_count == 0
+        assert next(commits) == "a"
+        assert mock_get.call_count == 1
+        assert list(commits) == ["b", "c"]
+        mock_get.assert_called_with(
+            "https://api.github.com/compare?page=2", immutable=False
+        )
+
+    @patch("sector.github.get_client")
+    def test_get_commits_between_fast_forward(self, mock_get_client: Mock) -> None:
+        """Test that a diverged or missing base raises a ValueError."""
+        diverged = Mock(status_code=200)
+        diverged.json.return_value = {"status": "diverged", "commits": []}
+        missing = Mock(status_code=404)
+        mock_get_client.return_value.get.side_effect = [diverged, missing]
+
+        with pytest.raises(ValueError, match="main is diverged from abc"):
+            list(get_commits_between("kuadrant", "authorino", "abc", "main", True))
+        with pytest.raises(ValueError, match="abc is no longer in"):
+            list(get_commits_between("kuadrant", "authorino", "abc", "main", True))
+
+
+class TestPullRequests:
+    """Test resolving pull requests for commits."""
+
+    @patch("sector.github.GRAPHQL_BATCH", 2)
+    @patch("sector.github.get_client")
+    def test_find_prs_for_commits_batches(self, mock_get_client: Mock) -> None:
+        """Test that commits are resolved in batches of aliased queries."""
+        pr = {"id": 1, "title": "Fix", "html_url": "https://github.com/pr/1"}
+        mock_graphql = mock_get_client.return_value.graphql
+        mock_graphql.side_effect = [
+            {
+                "repository": {
+                    "c0": {"associatedPullRequests": {"nodes": [pr]}},
+                    "c1": {"associatedPullRequests": {"nodes": []}},
+                }
+            },
+            {"repository": {"c0": None}},
+        ]
+
+        prs = find_prs_for_commits("kuadrant", "authorino", ["a", "b", "c"])
+
+        assert mock_graphql.call_count == 2
+        first_variables = mock_graphql.call_args_list[0].args[1]
+        assert first_variables == {
+            "owner": "kuadrant",
+            "repo": "authorino",
+            "c0": "a",
+            "c1": "b",
+        }
+        assert prs == {"a": [pr], "b": [], "c": []}
+
+    @patch("sector.github.find_prs_for_commits")
+    @patch("sector.github.compare_pages")
+    @patch("sector.github.get_release")
+    def test_process_repo_detailed(
+        self,
+        mock_get_release: Mock,
+        mock_compare_pages: Mock,
+        mock_find_prs: Mock,
+    ) -> None:
+        """Test that the PR list and commit count are built from the batched lookup."""
+        mock_get_release.return_value = ReleaseData(tag="v1.0.0")
+        mock_compare_pages.return_value = iter([(3, ["a", "b", "c"])])
+        fix = {"id": 1, "title": "Fix", "html_url": "https://github.com/pr/1"}
+        feat = {"id": 2, "title": "Feat", "html_url": "https://github.com/pr/2"}
+        mock_find_prs.return_value = {"a": [fix], "b": [fix], "c": [feat]}
+
+        data = process_repo("kuadrant", Repo("authorino"), detailed=True)
+
+        mock_compare_pages.assert_called_once_with(
+            "kuadrant", "authorino", "v1.0.0", "main", False
+        )
+        assert data.github.commit_count == 3
+        assert data.github.prs == [
+            PrData(title="Fix", url="https://github.com/pr/1"),
+            PrData(title="Feat", url="https://github.com/pr/2"),
+        ]
+
+    @patch("sector.github.GRAPHQL_BATCH", 2)
+    @patch("sector.github.find_prs_for_commits")
+    @patch("sector.github.compare_pages")
+    @patch("sector.github.get_release")
+    def test_process_repo_resolves_batches(
+        self,
+        mock_get_release: Mock,
+        mock_compare_pages: Mock,
+        mock_find_prs: Mock,
+    ) -> None:
+        """Test that streamed commits are resolved batch by batch."""
+        mock_get_release.return_value = ReleaseData(tag="v1.0.0")
+        mock_compare_pages.return_value = iter([(3, ["a"]), (3, ["b", "c"])])
+        mock_find_prs.side_effect = lambda owner, repo, shas: {sha: [] for sha in shas}
+
+        data = process_repo("kuadrant", Repo("authorino"), detailed=True)
+
+        assert [call.args[2] for call in mock_find_prs.call_args_list] == [
+            ["a", "b"],
+            ["c"],
+        ]
+        assert data.github.commit_count == 3
+
+
+class TestMergedPulls:
+    """Test finding the PRs of a range from the PRs merged since the release."""
+
+    def pull(self, number: int, sha: str, updated_at: str) -> dict[str, Any]:
+        return {
+            "id": number,
+            "title": f"PR {number}",
+            "html_url": f"https://github.com/pr/{number}",
+            "merge_commit_sha": sha,
+            "merged_at": updated_at,
+            "updated_at": updated_at,
+        }
+
+    def test_use_pulls(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that auto only lists the merged PRs for a large range."""
+        since = "2024-01-01T00:00:00Z"
+
+        assert not use_pulls(200, since)
+        assert use_pulls(201, since)
+        assert not use_pulls(201, "No date")
+        monkeypatch.setattr(github, "pr_strategy", PULLS)
+        assert use_pulls(1, since)
+        monkeypatch.setattr(github, "pr_strategy", COMMITS)
+        assert not use_pulls(1000, since)
+
+    @patch("sector.github.get_client")
+    def test_merged_pulls_stops_at_release(self, mock_get_client: Mock) -> None:
+        """Test that the pages stop once the PRs were last updated before the release."""
+        first = Mock()
+        first.json.return_value = [
+            self.pull(3, "c", "2024-03-01T00:00:00Z"),
+            {**self.pull(2, "x", "2024-02-15T00:00:00Z"), "merged_at": None},
+            self.pull(1, "a", "2024-02-01T00:00:00Z"),
+        ]
+        first.links = {"next": {"url": "/next"}}
+        second = Mock()
+        second.json.return_value = [self.pull(0, "z", "2023-12-01T00:00:00Z")]
+        second.links = {"next": {"url": "/last"}}
+        mock_get_client.return_value.get.side_effect = [first, second]
+        prs: dict[str, list[dict[str, Any]]] = {"a": [], "b": [], "c": []}
+
+        add_merged(prs, merged_pulls("kuadrant", "authorino", "main", "2024-01-01"))
+
+        assert mock_get_client.return_value.get.call_count == 2
+        assert prs == {
+            "a": [{"id": 1, "title": "PR 1", "html_url": "https://github.com/pr/1"}],
+            "b": [],
+            "c": [{"id": 3, "title": "PR 3", "html_url": "https://github.com/pr/3"}],
+        }
+
+    @patch("sector.github.find_prs_for_commits")
+    @patch("sector.github.merged_pulls")
+    @patch("sector.github.compare_pages")
+    @patch("sector.github.get_release")
+    def test_process_repo_large_range(
+        self,
+        mock_get_release: Mock,
+        mock_compare_pages: Mock,
+        mock_merged_pulls: Mock,
+        mock_find_prs: Mock,
+    ) -> None:
+        """Test that the total on the first compare page picks the merged PRs."""
+        shas = [f"{i:040x}" for i in range(github.PULLS_THRESHOLD + 1)]
+        mock_get_release.return_value = ReleaseData(
+            tag="v1.0.0", date="2024-01-01T00:00:00Z"
+        )
+        mock_compare_pages.return_value = iter(
+            (len(shas), shas[i : i + 100]) for i in range(0, len(shas), 100)
+        )
+        mock_merged_pulls.return_value = [
+            self.pull(1, shas[-1], "2024-02-01T00:00:00Z")
+        ]
+
+        data = process_repo("kuadrant", Repo("authorino"), detailed=True)
+
+        mock_merged_pulls.assert_called_once_with(
+            "kuadrant", "authorino", "main", "2024-01-01T00:00:00Z"
+        )
+        mock_find_prs.assert_not_called()
+        assert data.github.commit_count == len(shas)
+        assert [pr.title for pr in data.github.prs] == ["PR 1"]
+
+    @patch("sector.github.find_prs_for_commits")
+    @patch("sector.github.merged_pulls")
+    @patch("sector.github.compare_pages")
+    def test_small_range_streams(
+        self,
+        mock_compare_pages: Mock,
+        mock_merged_pulls: Mock,
+        mock_find_prs: Mock,
+    ) -> None:
+        """Test that a small total on the first page looks up the commits batch by batch."""
+        first = [f"a{i}" for i in range(github.GRAPHQL_BATCH)]
+        second = [f"b{i}" for i in range(github.GRAPHQL_BATCH)]
+        mock_compare_pages.return_value = iter(
+            [(2 * github.GRAPHQL_BATCH, first), (2 * github.GRAPHQL_BATCH, second)]
+        )
+        mock_find_prs.side_effect = lambda owner, repo, shas: {sha: [] for sha in shas}
+
+        shas, _ = github.commit_prs(
+            "kuadrant", "authorino", "v1.0.0", "main", since="2024-01-01T00:00:00Z"
+        )
+
+        mock_merged_pulls.assert_not_called()
+        assert shas == first + second
+        assert mock_find_prs.call_count == 2
+
+
+class TestPrIndex:
+    """Test the index of the pull requests of a range of commits."""
+
+    def pr(self, number: int) -> dict[str, Any]:
+        return {
+            "id": number,
+            "title": f"PR {number}",
+            "html_url": f"https://github.com/pr/{number}",
+        }
+
+    def test_build(self) -> None:
+        """Test that each PR is kept once, including the ones after a PR already seen."""
+        prs_by_sha = {
+            "a": [self.pr(1)],
+            "b": [self.pr(1), self.pr(2)],
+            "c": [],
+            "d": [self.pr(3), self.pr(2)],
+        }
+
+        index = PrIndex.build(["a", "b", "c", "d"], prs_by_sha)
+
+        assert list(index.prs) == [1, 2, 3]
+        assert index.prs[2] == PrData(title="PR 2", url="https://github.com/pr/2")
+        assert index.commits == {"a": [1], "b": [1, 2], "c": [], "d": [3, 2]}
+
+    def test_queries(self) -> None:
+        """Test finding the PRs of some commits and the commits without a PR."""
+        prs_by_sha = {"a": [self.pr(1)], "b": [], "c": [self.pr(2), self.pr(1)]}
+
+        index = PrIndex.build(["a", "b", "c", "d"], prs_by_sha)
+
+        assert [pr.title for pr in index.covering(["c", "a"])] == ["PR 2", "PR 1"]
+        assert index.covering(["b", "missing"]) == []
+        assert index.unattributed() == ["b", "d"]
+
+    def test_large_range(self) -> None:
+        """Test that a range with many commits per PR keeps an accurate count."""
+        shas = [f"{i:040x}" for i in range(20000)]
+        prs_by_sha = {sha: [self.pr(i // 4), self.pr(-1)] for i, sha in enumerate(shas)}
+
+        index = PrIndex.build(shas, prs_by_sha)
+
+        assert len(index.prs) == 5001
+        assert len(index.covering(shas[:8])) == 3
+
+
+class TestInfo:
+    """Test the concurrent processing of repositories."""
+
+    @patch("sector.github.print_data")
+    @patch("sector.github.process_repo")
+    def test_info_keeps_order_when_parallel(
+        self, mock_process_repo: Mock, mock_print_data: Mock
+    ) -> None:
+        """Test that results are printed in input order regardless of completion order."""
+        import time
+
+        def slow_process(owner: str, repo: Repo, detailed: bool) -> Data:
+            # The first repo finishes last.
+            time.sleep(0.05 if repo.name == "authorino" else 0.0)
+            return Data(owner=owner, project=repo.name, github=ReleaseData())
+
+        mock_process_repo.side_effect = slow_process
+        repos = [Repo("authorino"), Repo("limitador"), Repo("wasm-shim")]
+
+        info("kuadrant", repos, log, "name", False, jobs=3)
+
+        assert mock_process_repo.call_count == 3
+        printed = [call.args[0].project for call in mock_print_data.call_args_list]
+        assert printed == ["authorino", "limitador", "wasm-shim"]
+
+    @patch("sector.github.print_data")
+    @patch("sector.github.process_repo")
+    def test_info_sorts_by_time(
+        self, mock_process_repo: Mock, mock_print_data: Mock
+    ) -> None:
+        """Test that the time sort is applied after parallel processing."""
+        dates = {"authorino": "2024-03-01", "limitador": "2024-01-01"}
+        mock_process_repo.side_effect = lambda owner, repo, detailed: Data(
+            owner=owner, project=repo.name, github=ReleaseData(date=dates[repo.name])
+        )
+
+        info("kuadrant", [Repo("authorino"), Repo("limitador")], log, "time", False)
+
+        printed = [call.args[0].project for call in mock_print_data.call_args_list]
+        assert printed == ["limitador", "authorino"]
+
+    @patch("sector.github.process_repo")
+    def test_results_while_listing(self, mock_process_repo: Mock) -> None:
+        """Test that a finished repo is reported before the listing is read to the end."""
+        import time
+
+        mock_process_repo.side_effect = lambda owner, repo, detailed: Data(
+            owner=owner, project=repo.name, github=ReleaseData()
+        )
+        reported: list[str] = []
+        seen: list[list[str]] = []
+
+        def listing() -> Iterator[Repo]:
+            for name in ["authorino", "limitador", "wasm-shim"]:
+                # Give the previous repo time to finish.
+                time.sleep(0.1)
+                seen.append(list(reported))
+                yield Repo(name)
+
+        data = github.process_repos(
+            "kuadrant",
+            listing(),
+            False,
+            jobs=2,
+            on_result=lambda d: reported.append(d.project),
+        )
+
+        assert "authorino" in seen[2]
+        assert sorted(reported) == ["authorino", "limitador", "wasm-shim"]
+        assert [d.project for d in data] == ["authorino", "limitador", "wasm-shim"]
+
+
+def repo_node(
+    name: str, releases: int = 1, topics: tuple[str, ...] = (), archived: bool = False
+) -> dict[str, Any]:
+    return {
+        "name": name,
+        "isArchived": archived,
+        "releases": {"totalCount": releases},
+        "repositoryTopics": {"nodes": [{"topic": {"name": t}} for t in topics]},
+    }
+
+
+class TestDiscovery:
+    """Test discovering the repos of an owner."""
+
+    @patch("sector.github.get_client")
+    def test_discover_repos_follows_pages(self, mock_get_client: Mock) -> None:
+        """Test that every page is listed and repos without releases are skipped."""
+        mock_graphql = mock_get_client.return_value.graphql
+        mock_graphql.side_effect = [
+            {
+                "repositoryOwner": {
+                    "repositories": {
+                        "pageInfo": {"hasNextPage": True, "endCursor": "abc"},
+                        "nodes": [repo_node("authorino"), repo_node("docs", 0)],
+                    }
+                }
+            },
+            {
+                "repositoryOwner": {
+                    "repositories": {
+                        "pageInfo": {"hasNextPage": False, "endCursor": None},
+                        "nodes": [
+                            repo_node("limitador"),
+                            repo_node("old-operator", archived=True),
+                        ],
+                    }
+                }
+            },
+        ]
+
+        repos = list(discover_repos("kuadrant"))
+
+        assert [repo.name for repo in repos] == ["authorino", "limitador"]
+        assert mock_graphql.call_args_list[1].args[1]["cursor"] == "abc"
+        assert "ownerAffiliations: [OWNER]" in mock_graphql.call_args.args[0]
+
+    @patch("sector.github.get_client")
+    def test_discover_repos_filters(self, mock_get_client: Mock) -> None:
+        """Test that repos need one of the topics and to match the pattern."""
+        mock_get_client.return_value.graphql.return_value = {
+            "repositoryOwner": {
+                "repositories": {
+                    "pageInfo": {"hasNextPage": False, "endCursor": None},
+                    "nodes": [
+                        repo_node("authorino-operator", topics=("kubernetes",)),
+                        repo_node("dns-operator", topics=("dns",)),
+                        repo_node("authorino", topics=("kubernetes",)),
+                    ],
+                }
+            }
+        }
+
+        repos = discover_repos("kuadrant", ["kubernetes", "gateway"], "*-operator")
+
+        assert [repo.name for repo in repos] == ["authorino-operator"]
+
+    @patch("sector.github.get_client")
+    def test_discover_repos_unknown_owner(self, mock_get_client: Mock) -> None:
+        """Test that an unknown owner raises a ValueError."""
+        mock_get_client.return_value.graphql.return_value = {"repositoryOwner": None}
+
+        with pytest.raises(ValueError, match="No GitHub user or organization"):
+            list(discover_repos("nobody"))
+
+    @patch("sector.github.get_client")
+    def test_discover_owners(self, mock_get_client: Mock) -> None:
+        """Test that the repos of every owner are found and named with their owner."""
+        names = {"kuadrant": ["authorino", "limitador"], "envoyproxy": ["envoy"]}
+
+        def graphql(query: str, variables: dict[str, Any]) -> dict[str, Any]:
+            return {
+                "repositoryOwner": {
+                    "repositories": {
+                        "pageInfo": {"hasNextPage": False, "endCursor": None},
+                        "nodes": [repo_node(n) for n in names[variables["owner"]]],
+                    }
+                }
+            }
+
+        mock_get_client.return_value.graphql.side_effect = graphql
+
+        repos = list(discover_owners(["kuadrant", "envoyproxy"]))
+
+        assert sorted(str(repo) for repo in repos) == [
+            "envoyproxy/envoy",
+            "kuadrant/authorino",
+            "kuadrant/limitador",
+        ]
+        assert {call.args[0] for call in mock_get_client.call_args_list} == {
+            "kuadrant",
+            "envoyproxy",
+        }
+
+    @patch("sector.github.get_client")
+    def test_discover_owners_unknown_owner(self, mock_get_client: Mock) -> None:
+        """Test that an unknown owner raises a ValueError."""
+        mock_get_client.return_value.graphql.return_value = {"repositoryOwner": None}
+
+        with pytest.raises(ValueError, match="No GitHub user or organization"):
+            list(discover_owners(["kuadrant", "nobody"]))
+
+
+class TestPrefetch:
+    """Test looking up the files of a graph level with GraphQL."""
+
+    @patch("sector.github.get_client")
+    def test_prefetch_primes_memo(self, mock_get_client: Mock) -> None:
+        """Test that expand finds the releases and files without any REST calls."""
+        release = {
+            "name": "Authorino v1",
+            "tagName": "v1.0.0",
+            "publishedAt": "2024-01-01T00:00:00Z",
+            "url": "https://github.com/kuadrant/authorino/releases/tag/v1.0.0",
+        }
+        csv = "spec:\n  relatedImages:\n  - image: quay.io/kuadrant/wasm-shim:v0.4.0\n"
+        mock_get_client.return_value.cached.return_value = False
+        mock_graphql = mock_get_client.return_value.graphql
+        mock_graphql.side_effect = [
+            {
+                "r0": {"release": release, "f0": {"text": csv, "isTruncated": False}},
+                "r1": {"release": release, "f0": None},
+            },
+            {"r0": {"f0": {"text": "dependencies: {}", "isTruncated": False}}},
+        ]
+
+        with memo.scope():
+            prefetch_files(
+                "kuadrant", [Repo("authorino-operator@v1.0.0"), Repo("limitador")]
+            )
+            images = get_related_images(
+                log, "kuadrant", Repo("authorino-operator@v1.0.0")
+            )
+            latest = get_release("kuadrant", Repo("limitador@latest"))
+            with pytest.raises(ValueError, match="file not found"):
+                get_related_images(log, "kuadrant", Repo("limitador"))
+            _, release_yaml = get_operator_release_yaml(log, "kuadrant", "limitador")
+
+        assert images == ["quay.io/kuadrant/wasm-shim:v0.4.0"]
+        assert latest.tag == "v1.0.0"
+        assert release_yaml == "dependencies: {}"
+        mock_get_client.return_value.get.assert_not_called()
+        first_variables = mock_graphql.call_args_list[0].args[1]
+        assert first_variables["t0"] == "v1.0.0"
+        assert first_variables["f0_1"] == "v1.0.0:release.yaml"
+        assert "t1" not in first_variables
+        second_variables = mock_graphql.call_args_list[1].args[1]
+        assert second_variables["f0_0"] == "v1.0.0:release.yaml"
+
+    def test_branch_is_looked_up_as_tag(self) -> None:
+        """Test that a dependency at main gets the release tagged main, as over REST."""
+        lookups = github.prefetch_lookups([Repo("authorino@main")])
+        query, variables = github.lookup_query("kuadrant", lookups)
+
+        assert "latestRelease" not in query
+        assert variables["t0"] == "main"
+        assert variables["f0_1"] == "main:release.yaml"
+        _, follow_up = github.lookup_results(
+            "kuadrant", lookups, {"r0": {"release": None}}
+        )
+        assert follow_up == []
+
+    def test_cached_repos_are_left_out(self) -> None:
+        """Test that a repo is only looked up when the cache misses one of its calls."""
+        raw = github.RAW["Accept"]
+        cached = {
+            ("/repos/kuadrant/authorino/releases/tags/v1.0.0", ""),
+            ("/repos/kuadrant/authorino/contents/release.yaml?ref=v1.0.0", raw),
+            (
+                "/repos/kuadrant/authorino/contents/"
+                "bundle/manifests/authorino.clusterserviceversion.yaml?ref=v1.0.0",
+                raw,
+            ),
+            ("/repos/kuadrant/limitador/releases/latest", ""),
+        }
+        lookups = github.prefetch_lookups([Repo("authorino@v1.0.0"), Repo("limitador")])
+
+        needed = github.uncached(
+            "kuadrant",
+            lookups,
+            lambda path, headers: (path, headers.get("Accept", "")) in cached,
+        )
+
+        assert [lookup.name for lookup in needed] == ["limitador"]
+
+    @patch("sector.github.get_client")
+    def test_prefetch_failure_is_ignored(self, mock_get_client: Mock) -> None:
+        """Test that a failed lookup leaves the calls to be made over REST."""
+        mock_get_client.return_value.graphql.side_effect = ValueError("failed")
+
+        with memo.scope() as store:
+            prefetch_files("kuadrant", [Repo("authorino@v1.0.0")])
+
+        assert store.misses == 0
+
+
+class TestPinned:
+    """Test which refs are treated as immutable."""
+
+    def test_tags_are_pinned(self) -> None:
+        """Test that release tags can be cached indefinitely."""
+        assert pinned("v1.0.0")
+        assert pinned("0.1.0")
+
+    def test_moving_refs_are_not_pinned(self) -> None:
+        """Test that branches and 'latest' are revalidated."""
+        assert not pinned(None)
+        assert not pinned("latest")
+        assert not pinned("main")
+
+
+class TestDedup:
+    """Test removing repeated repositories."""
+
+    def test_dedup_keeps_first_occurrence(self) -> None:
+        """Test that repeated name and tag pairs are dropped in order."""
+        repos = [
+            Repo("authorino@v1.0.0"),
+            Repo("limitador@v2.0.0"),
+            Repo("authorino@v1.0.0"),
+            Repo("authorino@v1.1.0"),
+        ]
+
+        assert [str(r) for r in dedup(repos)] == [
+            "authorino@v1.0.0",
+            "limitador@v2.0.0",
+            "authorino@v1.1.0",
+        ]
+
+
+class TestRepo:
+    """Test the repo specs."""
+
+    def test_owner_is_optional(self) -> None:
+        """Test that the owner, name and tag are read from the spec."""
+        repo = Repo("envoyproxy/envoy@v1.30.0")
+
+        assert (repo.owner, repo.name, repo.tag) == ("envoyproxy", "envoy", "v1.30.0")
+        assert str(repo) == "envoyproxy/envoy@v1.30.0"
+        assert repo.owned_by("kuadrant") == "envoyproxy"
+        assert Repo("authorino").owned_by("kuadrant") == "kuadrant"
+        assert str(Repo("authorino")) == "authorino"
+
+    def test_mapper_moves_owner(self) -> None:
+        """Test that a mapping to owner/name moves the repo to that owner."""
+        repos = [Repo("envoy@v1.30.0"), Repo("authorino@v1.0.0")]
+
+        mapper({"envoy": "envoyproxy/envoy"}, repos)
+
+        assert [str(repo) for repo in repos] == [
+            "envoyproxy/envoy@v1.30.0",
+            "authorino@v1.0.0",
+        ]
+
 
 class TestVersionProcessing:
     """Test version processing functions."""
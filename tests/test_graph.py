@@ -0,0 +1,110 @@
+from rich.console import Console
+
+from sector.github import Repo
+from sector.graph import CSV, RELEASE_YAML, Edge, render, resolve
+
+DEPENDENCIES = {
+    "kuadrant-operator@v1.0.0": [
+        "authorino-operator@v0.1.0",
+        "limitador-operator@v0.2.0",
+    ],
+    "authorino-operator@v0.1.0": ["authorino@v0.3.0", "wasm-shim@v0.4.0"],
+    "limitador-operator@v0.2.0": ["limitador@v0.5.0", "wasm-shim@v0.4.0"],
+    "limitador@v0.5.0": ["limitador-operator@v0.2.0"],
+}
+
+
+def edges_for(repo: Repo) -> list[Edge]:
+    return [Edge(Repo(dep), RELEASE_YAML) for dep in DEPENDENCIES.get(str(repo), [])]
+
+
+def render_text(tree: object) -> str:
+    console = Console(width=120)
+    with console.capture() as capture:
+        console.print(tree)
+    return capture.get()
+
+
+class TestResolve:
+    """Test the dependency graph resolver."""
+
+    def test_resolve_expands_every_node_once(self) -> None:
+        """Test that diamonds and cycles are only expanded once."""
+        expanded: list[str] = []
+
+        def expand(repo: Repo) -> list[Edge]:
+            expanded.append(str(repo))
+            return edges_for(repo)
+
+        root = Repo("kuadrant-operator@v1.0.0")
+        graph = resolve(root, edges_for(root), expand, jobs=4)
+
+        assert sorted(expanded) == sorted(set(expanded))
+        assert "wasm-shim@v0.4.0" in expanded
+        assert "kuadrant-operator@v1.0.0" not in expanded
+        assert len(graph.nodes) == 6
+        assert graph.nodes[(None, "limitador", "v0.5.0")].depth == 2
+
+    def test_resolve_max_depth(self) -> None:
+        """Test that nodes past the depth limit are kept but not expanded."""
+        expanded: list[str] = []
+
+        def expand(repo: Repo) -> list[Edge]:
+            expanded.append(str(repo))
+            return edges_for(repo)
+
+        root = Repo("kuadrant-operator@v1.0.0")
+        graph = resolve(root, edges_for(root), expand, jobs=2, max_depth=1)
+
+        assert expanded == []
+        assert sorted(str(r) for r in graph.repos()) == [
+            "authorino-operator@v0.1.0",
+            "kuadrant-operator@v1.0.0",
+            "limitador-operator@v0.2.0",
+        ]
+
+    def test_resolve_keeps_edge_sources(self) -> None:
+        """Test that the source of each dependency is recorded."""
+        root = Repo("authorino-operator@v0.1.0")
+        graph = resolve(
+            root,
+            [Edge(Repo("authorino@v0.3.0"), CSV)],
+            lambda repo: [],
+            jobs=1,
+        )
+
+        assert [edge.source for edge in graph.root.edges] == [CSV]
+
+    def test_resolve_prefetches_each_level(self) -> None:
+        """Test that every level is prefetched as a whole before it is expanded."""
+        levels: list[list[str]] = []
+
+        root = Repo("kuadrant-operator@v1.0.0")
+        resolve(
+            root,
+            edges_for(root),
+            edges_for,
+            jobs=2,
+            prefetch=lambda repos: levels.append(sorted(str(r) for r in repos)),
+        )
+
+        assert levels == [
+            ["authorino-operator@v0.1.0", "limitador-operator@v0.2.0"],
+            ["authorino@v0.3.0", "limitador@v0.5.0", "wasm-shim@v0.4.0"],
+        ]
+
+
+class TestRender:
+    """Test rendering the dependency graph."""
+
+    def test_render_shows_shared_dependencies_once(self) -> None:
+        """Test that shared nodes are listed everywhere but only expanded once."""
+        root = Repo("kuadrant-operator@v1.0.0")
+        graph = resolve(root, edges_for(root), edges_for, jobs=1)
+
+        text = render_text(render(graph))
+
+        assert text.splitlines()[0] == "kuadrant-operator@v1.0.0"
+        assert text.count("wasm-shim@v0.4.0") == 2
+        assert text.count("limitador-operator@v0.2.0") == 2
+        assert text.count("limitador@v0.5.0") == 1
@@ -0,0 +1,110 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from pathlib import Path
+
+from rich.console import Console
+
+from sector.instrument import Recorder, category, percentile
+
+
+def render_text(table: object) -> str:
+    console = Console(width=160)
+    with console.capture() as capture:
+        console.print(table)
+    return capture.get()
+
+
+class TestCategory:
+    """Test grouping API calls by endpoint."""
+
+    def test_category(self) -> None:
+        """Test that each endpoint used by sector has its own category."""
+        base = "https://api.github.com/repos/kuadrant/authorino"
+        assert category(f"{base}/releases/latest") == "releases"
+        assert category(f"{base}/compare/v1.0.0...main?per_page=100") == "compare"
+        assert category(f"{base}/commits/abc/pulls") == "commit-pulls"
+        assert category(f"{base}/pulls?state=closed") == "pulls"
+        assert category(f"{base}/contents/release.yaml?ref=v1") == "contents"
+        assert category(f"{base}/git/blobs/abc") == "blobs"
+        assert category("https://api.github.com/graphql") == "graphql"
+
+
+class TestPercentile:
+    """Test the percentile calculation."""
+
+    def test_percentile(self) -> None:
+        """Test nearest rank percentiles."""
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile([3.0], 95) == 3.0
+
+
+class TestRecorder:
+    """Test recording API calls."""
+
+    def test_disabled_recorder_is_empty(self) -> None:
+        """Test that nothing is kept unless the recorder is enabled."""
+        recorder = Recorder()
+
+        recorder.request("https://api.github.com/graphql", time.perf_counter(), 200, 10)
+        with recorder.span("authorino"):
+            pass
+
+        assert recorder.requests == []
+        assert recorder.spans == []
+
+    def test_requests_are_attributed_to_repo(self) -> None:
+        """Test that requests inside a span, including copied contexts, carry the repo."""
+        recorder = Recorder()
+        recorder.enabled = True
+
+        def lookup() -> None:
+            recorder.request(
+                "https://api.github.com/graphql", time.perf_counter(), 200, 10
+            )
+
+        with recorder.span("authorino"):
+            lookup()
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pool.submit(copy_context().run, lookup).result()
+        lookup()
+
+        assert [e.repo for e in recorder.requests] == ["authorino", "authorino", None]
+        assert [s.name for s in recorder.spans] == ["authorino"]
+
+    def test_tables(self) -> None:
+        """Test that the summary tables list endpoints and repos."""
+        recorder = Recorder()
+        recorder.enabled = True
+        url = "https://api.github.com/repos/kuadrant/authorino/releases/latest"
+        recorder.call(
+            "authorino", recorder.request, url, time.perf_counter(), 200, 10, "hit"
+        )
+
+        endpoints = render_text(recorder.endpoint_table())
+        repos = render_text(recorder.repo_table())
+
+        assert "releases" in endpoints
+        assert "authorino" in repos
+
+    def test_chrome_trace(self, tmp_path: Path) -> None:
+        """Test that the trace uses complete events with the request details."""
+        recorder = Recorder()
+        recorder.enabled = True
+        url = "https://api.github.com/repos/kuadrant/authorino/releases/latest"
+        with recorder.span("authorino"):
+            recorder.request(url, time.perf_counter(), 304, 0, "revalidate", 1)
+
+        recorder.write_trace(str(tmp_path / "trace.json"))
+        with open(tmp_path / "trace.json") as f:
+            trace = json.load(f)
+
+        events = trace["traceEvents"]
+        assert [e["cat"] for e in events] == ["repo", "request"]
+        assert all(e["ph"] == "X" for e in events)
+        assert events[1]["args"]["status"] == 304
+        assert events[1]["args"]["cache"] == "revalidate"
+        assert events[1]["args"]["retries"] == 1
@@ -0,0 +1,82 @@
+import yaml
+
+from sector import manifest
+
+CSV = """
+apiVersion: operators.coreos.com/v1alpha1
+kind: ClusterServiceVersion
+metadata:
+  annotations:
+    alm-examples: &examples '[{"kind": "Kuadrant"}]'
+  name: kuadrant-operator.v1.0.0
+spec:
+  description: |
+    A long description that is skipped over.
+  install:
+    spec:
+      deployments:
+        - name: kuadrant-operator-controller-manager
+          spec:
+            replicas: 1
+  relatedImages:
+    - image: quay.io/kuadrant/authorino-operator:v0.11.0
+      name: authorino-operator
+    - image: quay.io/kuadrant/limitador-operator:v0.9.0
+      name: limitador-operator
+  version: 1.0.0
+"""
+
+
+class TestExtract:
+    """Test loading a single value from a YAML document."""
+
+    def test_extracts_path(self) -> None:
+        """Test that the value at the path matches a full load."""
+        images = manifest.extract(CSV, ["spec", "relatedImages"])
+
+        assert images == yaml.safe_load(CSV)["spec"]["relatedImages"]
+
+    def test_missing_path(self) -> None:
+        """Test that None is returned when a key is missing."""
+        assert manifest.extract(CSV, ["spec", "missing"]) is None
+        assert manifest.extract(CSV, ["kind", "name"]) is None
+        assert manifest.extract("- a\n- b\n", ["spec"]) is None
+        assert manifest.extract("", ["spec"]) is None
+
+    def test_scalars_are_typed(self) -> None:
+        """Test that scalars are resolved as yaml.safe_load does."""
+        document = (
+            "spec:\n  values: {count: 3, enabled: true, version: '1.0', none: ~}\n"
+        )
+
+        assert manifest.extract(document, ["spec", "values"]) == {
+            "count": 3,
+            "enabled": True,
+            "version": "1.0",
+            "none": None,
+        }
+
+    def test_anchors_in_value(self) -> None:
+        """Test that an alias to an anchor inside the value is resolved."""
+        document = "spec:\n  images:\n    - &image {image: a}\n    - *image\n"
+
+        assert manifest.extract(document, ["spec", "images"]) == [
+            {"image": "a"},
+            {"image": "a"},
+        ]
+
+    def test_anchors_outside_value(self) -> None:
+        """Test that an alias to an anchor outside the value falls back to a full load."""
+        document = CSV + "  examples: *examples\n"
+
+        assert manifest.extract(document, ["spec", "examples"]) == (
+            '[{"kind": "Kuadrant"}]'
+        )
+
+
+class TestLoad:
+    """Test loading a whole YAML document."""
+
+    def test_matches_safe_load(self) -> None:
+        """Test that the result is the same as yaml.safe_load."""
+        assert manifest.load(CSV) == yaml.safe_load(CSV)
@@ -0,0 +1,109 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sector import memo
+from sector.memo import Memo, memoized
+
+
+class TestMemo:
+    """Test the memoization of calls."""
+
+    def test_completed_calls_are_reused(self) -> None:
+        """Test that a repeated key does not call the function again."""
+        store = Memo()
+        calls = []
+
+        def func() -> list[str]:
+            calls.append("called")
+            return ["value"]
+
+        assert store.call("key", func) == ["value"]
+        assert store.call("key", func) == ["value"]
+        assert len(calls) == 1
+        assert (store.hits, store.misses) == (1, 1)
+
+    def test_results_are_copied(self) -> None:
+        """Test that changing a result does not change the stored value."""
+        store = Memo()
+
+        first = store.call("key", lambda: {"prs": []})
+        first["prs"].append("pr")
+
+        assert store.call("key", lambda: {"prs": []}) == {"prs": []}
+
+    def test_in_flight_calls_are_shared(self) -> None:
+        """Test that concurrent callers wait on the first call."""
+        store = Memo()
+        calls = []
+        lock = threading.Lock()
+
+        def func() -> str:
+            with lock:
+                calls.append("called")
+            time.sleep(0.05)
+            return "value"
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: store.call("key", func), range(4)))
+
+        assert results == ["value"] * 4
+        assert len(calls) == 1
+
+    def test_exceptions_are_shared(self) -> None:
+        """Test that a failed call raises for every caller."""
+        store = Memo()
+        calls = []
+
+        def func() -> None:
+            calls.append("called")
+            raise ValueError("not found")
+
+        for _ in range(2):
+            with pytest.raises(ValueError, match="not found"):
+                store.call("key", func)
+        assert len(calls) == 1
+
+    def test_primed_calls_are_not_made(self) -> None:
+        """Test that a primed result or error is returned without calling the function."""
+        store = Memo()
+        store.prime("found", ["value"])
+        store.prime("missing", error=KeyError("missing"))
+        store.prime("found", ["other"])
+
+        assert store.call("found", lambda: pytest.fail("called")) == ["value"]
+        with pytest.raises(KeyError):
+            store.call("missing", lambda: pytest.fail("called"))
+
+
+class TestScope:
+    """Test the memoization scope."""
+
+    def test_memoized_only_within_scope(self) -> None:
+        """Test that calls are only memoized while a scope is active."""
+        calls = []
+
+        @memoized(key=lambda owner, repo: (owner, repo))
+        def lookup(owner: str, repo: str) -> str:
+            calls.append(repo)
+            return f"{owner}/{repo}"
+
+        lookup("kuadrant", "authorino")
+        lookup("kuadrant", "authorino")
+        assert len(calls) == 2
+
+        with memo.scope():
+            lookup("kuadrant", "authorino")
+            lookup(owner="kuadrant", repo="authorino")
+            lookup("kuadrant", "limitador")
+        assert calls == ["authorino", "authorino", "authorino", "limitador"]
+
+    def test_nested_scopes_share_the_memo(self) -> None:
+        """Test that an inner scope reuses the outer memo."""
+        with memo.scope() as outer:
+            with memo.scope() as inner:
+                assert inner is outer
+            assert memo._memo is outer
+        assert memo._memo is None
@@ -0,0 +1,135 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+import yaml
+
+from sector import logger
+from sector.github import Data, PrData, ReleaseData, Repo, info
+from sector.graph import CSV, RELEASE_YAML, Edge, resolve
+from sector.output import data_record, graph_record, read_data, read_graph
+
+log = logger.get_logger("cli")
+
+
+def make_data(owner: str, repo: Repo, detailed: bool) -> Data:
+    dates = {"authorino": "2024-03-01", "limitador": "2024-01-01"}
+    return Data(
+        owner=owner,
+        project=repo.name,
+        github=ReleaseData(
+            name=repo.name,
+            tag="v1.0.0",
+            date=dates[repo.name],
+            prs=[PrData(title="Fix", url="https://github.com/pr/1")],
+        ),
+    )
+
+
+class TestRecords:
+    """Test serialising the data classes."""
+
+    def test_data_record(self) -> None:
+        """Test that release data and its PRs are included."""
+        record = data_record(make_data("kuadrant", Repo("authorino"), True))
+
+        assert record["owner"] == "kuadrant"
+        assert record["project"] == "authorino"
+        assert record["github"]["tag"] == "v1.0.0"
+        assert record["github"]["prs"] == [
+            {"title": "Fix", "url": "https://github.com/pr/1"}
+        ]
+
+    def test_graph_record(self) -> None:
+        """Test that nodes and sourced edges are included."""
+        root = Repo("kuadrant-operator@v1.0.0")
+        graph = resolve(
+            root,
+            [
+                Edge(Repo("authorino-operator@v0.1.0"), RELEASE_YAML),
+                Edge(Repo("wasm-shim@v0.2.0"), CSV),
+            ],
+            lambda repo: [],
+            jobs=1,
+        )
+
+        record = graph_record(graph)
+
+        assert record["root"] == "kuadrant-operator@v1.0.0"
+        assert record["nodes"][0]["dependencies"] == [
+            {"name": "authorino-operator", "tag": "v0.1.0", "source": "release.yaml"},
+            {"name": "wasm-shim", "tag": "v0.2.0", "source": "csv"},
+        ]
+        assert [node["depth"] for node in record["nodes"]] == [0, 1, 1]
+
+    def test_records_are_read_back(self) -> None:
+        """Test that reading a record gives back what was written."""
+        data = make_data("kuadrant", Repo("authorino"), True)
+        graph = resolve(
+            Repo("kuadrant-operator@v1.0.0"),
+            [Edge(Repo("authorino-operator@v0.1.0"), RELEASE_YAML)],
+            lambda repo: [Edge(Repo("authorino"), CSV)],
+            jobs=1,
+        )
+
+        assert read_data(data_record(data)) == data
+        read = read_graph(graph_record(graph))
+        assert read == graph
+        assert read.root is read.nodes[(None, "kuadrant-operator", "v1.0.0")]
+
+
+class TestInfoOutput:
+    """Test the machine readable output of info."""
+
+    @patch("sector.github.process_repo")
+    def test_info_json(
+        self, mock_process_repo: Mock, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that json output is a sorted list of records."""
+        mock_process_repo.side_effect = make_data
+
+        info(
+            "kuadrant",
+            [Repo("authorino"), Repo("limitador")],
+            log,
+            "time",
+            True,
+            fmt="json",
+        )
+
+        records = json.loads(capsys.readouterr().out)
+        assert [r["project"] for r in records] == ["limitador", "authorino"]
+
+    @patch("sector.github.process_repo")
+    def test_info_yaml(
+        self, mock_process_repo: Mock, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that yaml output can be loaded again."""
+        mock_process_repo.side_effect = make_data
+
+        info("kuadrant", [Repo("authorino")], log, "name", True, fmt="yaml")
+
+        records = yaml.safe_load(capsys.readouterr().out)
+        assert records[0]["github"]["name"] == "authorino"
+
+    @patch("sector.github.process_repo")
+    def test_info_ndjson_streams(
+        self, mock_process_repo: Mock, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that ndjson writes a release record per project."""
+        mock_process_repo.side_effect = make_data
+
+        info(
+            "kuadrant",
+            [Repo("authorino"), Repo("limitador")],
+            log,
+            "time",
+            True,
+            fmt="ndjson",
+        )
+
+        lines = capsys.readouterr().out.splitlines()
+        records = [json.loads(line) for line in lines]
+        assert len(records) == 2
+        assert {r["kind"] for r in records} == {"release"}
+        assert {r["project"] for r in records} == {"authorino", "limitador"}
@@ -0,0 +1,140 @@
+import time
+
+import pytest
+import requests
+
+from sector.ratelimit import RateLimiter, resource_for
+
+
+def make_response(
+    status_code: int = 200, headers: dict[str, str] | None = None, body: bytes = b""
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.url = "https://api.github.com/repos/kuadrant/authorino"
+    response.headers.update(headers or {})
+    return response
+
+
+def rate_headers(
+    remaining: int, reset: float, resource: str = "core"
+) -> dict[str, str]:
+    return {
+        "X-RateLimit-Limit": "5000",
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(reset)),
+        "X-RateLimit-Resource": resource,
+    }
+
+
+class TestResource:
+    """Test which rate limit budget a request uses."""
+
+    def test_resource_for(self) -> None:
+        """Test that GraphQL and search have their own budgets."""
+        assert resource_for("https://api.github.com/graphql") == "graphql"
+        assert resource_for("https://api.github.com/search/issues") == "search"
+        assert resource_for("https://api.github.com/repos/a/b") == "core"
+
+
+class TestPacing:
+    """Test pacing requests against the remaining budget."""
+
+    def test_no_delay_with_budget(self) -> None:
+        """Test that requests are not delayed while the budget is healthy."""
+        limiter = RateLimiter(reserve=10)
+        limiter.update(make_response(headers=rate_headers(4000, time.time() + 60)))
+
+        assert limiter.delay("core") == 0.0
+
+    def test_delay_when_budget_low(self) -> None:
+        """Test that the remaining budget is spread until the reset."""
+        limiter = RateLimiter(reserve=10)
+        limiter.update(make_response(headers=rate_headers(5, time.time() + 50)))
+
+        assert 9 < limiter.delay("core") <= 10
+        assert limiter.budgets["core"].remaining == 4
+
+    def test_delay_until_reset_when_exhausted(self) -> None:
+        """Test that an exhausted budget waits for the reset."""
+        limiter = RateLimiter(reserve=10)
+        limiter.update(make_response(headers=rate_headers(0, time.time() + 30)))
+
+        assert 29 < limiter.delay("core") <= 30
+        assert limiter.delay("graphql") == 0.0
+
+    def test_stale_window_is_ignored(self) -> None:
+        """Test that a late response from an old window does not reset the budget."""
+        limiter = RateLimiter()
+        now = time.time()
+        limiter.update(make_response(headers=rate_headers(4999, now + 3600)))
+        limiter.update(make_response(headers=rate_headers(10, now + 60)))
+
+        assert limiter.budgets["core"].remaining == 4999
+
+
+class TestBackoff:
+    """Test retrying failed responses."""
+
+    def test_success_is_not_retried(self) -> None:
+        """Test that successful and client errors are returned."""
+        limiter = RateLimiter()
+
+        assert limiter.backoff(make_response(200), 0) is None
+        assert limiter.backoff(make_response(404), 0) is None
+
+    def test_retry_after_is_respected(self) -> None:
+        """Test that the Retry-After header sets the delay."""
+        limiter = RateLimiter()
+
+        delay = limiter.backoff(make_response(429, {"Retry-After": "7"}), 0)
+
+        assert delay == 7.0
+        assert limiter.retries == 1
+        assert limiter.delay("core") > 6
+
+    def test_primary_limit_waits_for_reset(self) -> None:
+        """Test that an exhausted budget 403 waits until the reset."""
+        limiter = RateLimiter()
+        response = make_response(403, rate_headers(0, time.time() + 20))
+
+        delay = limiter.backoff(response, 0)
+
+        assert delay is not None and 19 < delay <= 21
+
+    def test_forbidden_is_not_retried(self) -> None:
+        """Test that a 403 which is not a rate limit fails straight away."""
+        limiter = RateLimiter()
+        response = make_response(403, body=b'{"message": "Resource not accessible"}')
+
+        assert limiter.backoff(response, 0) is None
+
+    def test_secondary_limit_is_retried(self) -> None:
+        """Test that a secondary rate limit 403 backs off."""
+        limiter = RateLimiter(backoff_base=1, backoff_max=4)
+        response = make_response(
+            403, body=b'{"message": "You have exceeded a secondary rate limit"}'
+        )
+
+        delay = limiter.backoff(response, 2)
+
+        assert delay is not None and 0 <= delay <= 4
+
+    def test_server_errors_give_up(self) -> None:
+        """Test that retries stop after the maximum attempts."""
+        limiter = RateLimiter(max_retries=2)
+
+        assert limiter.backoff(make_response(502), 1) is not None
+        assert limiter.backoff(make_response(502), 2) is None
+
+    def test_summary(self) -> None:
+        """Test that the summary reports the remaining quota."""
+        limiter = RateLimiter()
+        limiter.update(make_response(headers=rate_headers(4321, time.time() + 60)))
+        limiter.delay("core")
+
+        summary = limiter.summary()
+
+        assert "1 requests" in summary
+        assert "core 4320/5000 remaining" in summary
@@ -0,0 +1,131 @@
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+from click.testing import CliRunner
+
+from sector import bench, server
+from sector.cli import cli
+
+
+@pytest.fixture
+def corpus() -> bench.Corpus:
+    return bench.Corpus.generate(repos=3, commits=20)
+
+
+def future_query() -> dict[str, Any]:
+    projects = bench.Corpus.generate(3, 0).repos
+    return {"owner": bench.OWNER, "projects": projects, "detailed": True}
+
+
+class TestDaemon:
+    """Test answering queries from memory."""
+
+    def test_answers_are_kept(self, fixtures: bench.FixtureServer) -> None:
+        """Test that a repeated query is answered without calling GitHub."""
+        daemon = server.Daemon(jobs=4)
+
+        first = daemon.ask(server.FUTURE, future_query())
+        requests = sum(fixtures.requests.values())
+        second = daemon.ask(server.FUTURE, future_query())
+
+        assert second is first
+        assert second.hits == 1
+        assert sum(fixtures.requests.values()) == requests
+        assert len(first.document["repos"]) == 3
+
+    def test_refresh(self, fixtures: bench.FixtureServer) -> None:
+        """Test that a refresh works out every answer again."""
+        daemon = server.Daemon(jobs=4)
+        answer = daemon.ask(server.FUTURE, future_query())
+        updated_at = answer.updated_at
+        requests = sum(fixtures.requests.values())
+
+        daemon.refresh()
+
+        assert answer.updated_at > updated_at
+        assert sum(fixtures.requests.values()) > requests
+
+    def test_unknown_query(self) -> None:
+        """Test that only the known queries are answered."""
+        with pytest.raises(ValueError, match="Unknown query"):
+            server.Daemon().ask("bench", {})
+
+
+class TestServer:
+    """Test the HTTP front of the daemon."""
+
+    def test_runtime_file(self, daemon: server.Server) -> None:
+        """Test that the CLI can find the daemon, and that only the user can read the token."""
+        connection = server.find()
+
+        assert connection == server.Connection(daemon.url, daemon.token)
+        assert server.runtime_file().stat().st_mode & 0o777 == 0o600
+
+    def test_stale_runtime_file(self, tmp_path: Path) -> None:
+        """Test that a runtime file left by a process which is gone is ignored."""
+        path = tmp_path / "server.json"
+        path.write_text(json.dumps({"url": "", "token": "", "pid": 2**22 + 1}))
+
+        assert server.find(path) is None
+
+    def test_wrong_token(self, daemon: server.Server) -> None:
+        """Test that a caller without the token is turned away."""
+        connection = server.Connection(daemon.url, "wrong")
+
+        with pytest.raises(server.Unavailable, match="refused the token"):
+            connection.ask(server.FUTURE, future_query())
+
+    def test_bad_query(self, daemon: server.Server) -> None:
+        """Test that a query which cannot be answered raises a ValueError."""
+        connection = server.Connection(daemon.url, daemon.token)
+
+        with pytest.raises(ValueError, match="projects"):
+            connection.ask(server.FUTURE, {"owner": bench.OWNER})
+
+    def test_cli_uses_daemon(
+        self, daemon: server.Server, fixtures: bench.FixtureServer
+    ) -> None:
+        """Test that the commands are answered by the daemon once it has the answer."""
+        args = ["future", "--owner", bench.OWNER, "--detailed", "-o", "json"]
+        for project in bench.Corpus.generate(3, 0).repos:
+            args.extend(["-p", project])
+        runner = CliRunner()
+        expected = runner.invoke(cli, ["--no-daemon", *args])
+        runner.invoke(cli, args)
+        requests = sum(fixtures.requests.values())
+
+        answered = runner.invoke(cli, args)
+
+        assert answered.exit_code == 0, answered.output
+        assert json.loads(answered.stdout) == json.loads(expected.stdout)
+        assert sum(fixtures.requests.values()) == requests
+        assert len(daemon.daemon.answers) == 1
+
+    def test_cli_current_uses_daemon(
+        self, daemon: server.Server, fixtures: bench.FixtureServer
+    ) -> None:
+        """Test that the dependency graph comes back from the daemon as it was resolved."""
+        args = ["current", "--owner", bench.OWNER, "-p", bench.ROOT, "-o", "json"]
+        runner = CliRunner()
+        expected = runner.invoke(cli, ["--no-daemon", *args])
+
+        answered = runner.invoke(cli, args)
+
+        assert answered.exit_code == 0, answered.output
+        assert json.loads(answered.stdout) == json.loads(expected.stdout)
+        assert len(daemon.daemon.answers) == 1
+
+    def test_cli_falls_back(self, tmp_path: Path) -> None:
+        """Test that a daemon which is not answering is skipped."""
+        path = tmp_path / "server.json"
+        path.write_text(
+            json.dumps({"url": "http://127.0.0.1:1", "token": "", "pid": os.getpid()})
+        )
+        connection = server.find(path)
+
+        assert connection is not None
+        with pytest.raises(server.Unavailable, match="not answering"):
+            connection.ask(server.FUTURE, future_query())
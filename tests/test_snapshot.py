@@ -0,0 +1,120 @@
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from sector import bench, snapshot
+from sector.cli import cli
+from sector.github import Data, PrData, ReleaseData, Repo
+from sector.graph import CSV, RELEASE_YAML, Edge, resolve
+
+
+def make_snapshot(tag: str, dependency: str) -> snapshot.Snapshot:
+    graph = resolve(
+        Repo(f"kuadrant-operator@{tag}"),
+        [Edge(Repo(dependency), RELEASE_YAML)],
+        lambda repo: [Edge(Repo("envoyproxy/envoy@v1.30.0"), CSV)],
+        jobs=1,
+    )
+    data = [
+        Data(
+            "kuadrant",
+            repo.name,
+            ReleaseData(
+                name=repo.name,
+                tag=repo.tag or "",
+                date="2024-01-01T00:00:00Z",
+                commit_count=1,
+                prs=[PrData(title="Fix", url="https://github.com/pr/1")],
+            ),
+        )
+        for repo in graph.repos()
+    ]
+    return snapshot.Snapshot("kuadrant", "kuadrant-operator", tag, graph, data)
+
+
+class TestSnapshot:
+    """Test writing and reading snapshots."""
+
+    @pytest.mark.parametrize("name", ["snapshot.jsonl", "snapshot.jsonl.gz"])
+    def test_round_trip(self, tmp_path: Path, name: str) -> None:
+        """Test that a snapshot is read back as it was written, gzipped or not."""
+        saved = make_snapshot("v1.0.0", "authorino@v0.1.0")
+
+        snapshot.write(tmp_path / name, saved)
+
+        assert snapshot.read(tmp_path / name) == saved
+
+    def test_not_a_snapshot(self, tmp_path: Path) -> None:
+        """Test that any other file raises a ValueError."""
+        path = tmp_path / "other.json"
+        path.write_text('{"kind": "release"}\n')
+        newer = tmp_path / "newer.jsonl"
+        newer.write_text('{"kind": "snapshot", "format": 1000}\n')
+
+        with pytest.raises(ValueError, match="is not a snapshot"):
+            snapshot.read(path)
+        with pytest.raises(ValueError, match="newer sector"):
+            snapshot.read(newer)
+
+    def test_is_snapshot(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a version is only a snapshot by its suffix, not because a file has its name."""
+        monkeypatch.chdir(tmp_path)
+        Path("v1.0.0").write_text("")
+
+        assert not snapshot.is_snapshot("v1.0.0")
+        assert snapshot.is_snapshot("v1.0.0.jsonl")
+        assert snapshot.is_snapshot("v1.0.0.jsonl.gz")
+
+
+class TestCommands:
+    """Test the commands which save and read snapshots."""
+
+    def test_current_from_snapshot(
+        self, fixtures: bench.FixtureServer, tmp_path: Path
+    ) -> None:
+        """Test that a saved snapshot gives the same report without calling GitHub."""
+        path = tmp_path / "snapshot.jsonl.gz"
+        args = ["current", "--owner", bench.OWNER, "-p", bench.ROOT, "-o", "json"]
+        runner = CliRunner()
+        saved = runner.invoke(cli, ["--no-daemon", *args, "--save-snapshot", str(path)])
+        fixtures.requests.clear()
+
+        read = runner.invoke(cli, [*args, "--snapshot", str(path)])
+
+        assert saved.exit_code == 0, saved.output
+        assert read.exit_code == 0, read.output
+        assert json.loads(read.stdout) == json.loads(saved.stdout)
+        assert len(json.loads(read.stdout)["repos"]) == 3
+        assert sum(fixtures.requests.values()) == 0
+
+    def test_save_snapshot_suffix(self, tmp_path: Path) -> None:
+        """Test that a snapshot is only saved under a name diff reads as one."""
+        result = CliRunner().invoke(
+            cli, ["current", "--save-snapshot", str(tmp_path / "snapshot.json")]
+        )
+
+        assert result.exit_code == 2
+        assert "must end in .jsonl or .jsonl.gz" in result.output
+
+    def test_diff_snapshots(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that two snapshots are compared offline."""
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        old, new = tmp_path / "v1.0.0.jsonl", tmp_path / "v1.1.0.jsonl"
+        snapshot.write(old, make_snapshot("v1.0.0", "authorino@v0.1.0"))
+        snapshot.write(new, make_snapshot("v1.1.0", "authorino@v0.2.0"))
+
+        result = CliRunner().invoke(cli, ["diff", str(old), str(new), "-o", "json"])
+
+        assert result.exit_code == 0, result.output
+        changes = json.loads(result.stdout)["changes"]
+        assert [(c["owner"], c["project"], c["status"]) for c in changes] == [
+            ("kuadrant", "kuadrant-operator", "changed"),
+            ("kuadrant", "authorino", "changed"),
+            ("envoyproxy", "envoy", "unchanged"),
+        ]
+        assert changes[1]["commit_count"] == 0
@@ -0,0 +1,125 @@
+from pathlib import Path
+from typing import Any, Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+
+from sector import state
+from sector.github import ReleaseData, Repo, process_repo
+from sector.state import RepoState, StateStore
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> Iterator[StateStore]:
+    yield state.enable(tmp_path / "state.sqlite")
+    state.disable()
+
+
+def pr(number: int) -> dict[str, Any]:
+    return {"id": number, "title": f"PR {number}", "html_url": f"/pull/{number}"}
+
+
+class TestStateStore:
+    """Test the per repo state store."""
+
+    def test_record_and_get(self, store: StateStore) -> None:
+        """Test that the last commit is kept as the head for the next run."""
+        store.record("kuadrant", "authorino", "v1.0.0", ["a", "b"], {"a": [pr(1)]})
+
+        saved = store.get("kuadrant", "authorino", "v1.0.0")
+
+        assert saved is not None
+        assert saved.head == "b"
+        assert saved.shas == ["a", "b"]
+        assert saved.prs == {"a": [pr(1)]}
+        assert saved.updated_at > 0
+
+    def test_new_release_drops_state(self, store: StateStore) -> None:
+        """Test that state from an older release is not used."""
+        store.put(RepoState("kuadrant", "authorino", "v1.0.0", "b", ["a", "b"]))
+
+        assert store.get("kuadrant", "authorino", "v1.1.0") is None
+
+    def test_no_commits_starts_from_base(self, store: StateStore) -> None:
+        """Test that the release tag is the head when main has no new commits."""
+        store.record("kuadrant", "authorino", "v1.0.0", [], {})
+
+        saved = store.get("kuadrant", "authorino", "v1.0.0")
+
+        assert saved is not None
+        assert saved.head == "v1.0.0"
+
+    def test_delete(self, store: StateStore) -> None:
+        """Test that the state of a repo can be removed."""
+        store.record("kuadrant", "authorino", "v1.0.0", ["a"], {})
+        store.delete("kuadrant", "authorino")
+
+        assert store.get("kuadrant", "authorino", "v1.0.0") is None
+
+    def test_state_dir(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that XDG_STATE_HOME is used when set."""
+        monkeypatch.setenv("XDG_STATE_HOME", "/tmp/state")
+
+        assert state.state_dir() == Path("/tmp/state/sector")
+
+
+class TestIncrementalRuns:
+    """Test that detailed runs only look up the new commits."""
+
+    @patch("sector.github.find_prs_for_commits")
+    @patch("sector.github.compare_pages")
+    @patch("sector.github.get_release")
+    def test_second_run_compares_from_last_head(
+        self,
+        mock_get_release: Mock,
+        mock_compare_pages: Mock,
+        mock_find_prs: Mock,
+        store: StateStore,
+    ) -> None:
+        """Test that the new commits are merged into the stored ones."""
+        mock_get_release.return_value = ReleaseData(tag="v1.0.0")
+        mock_compare_pages.side_effect = [iter([(2, ["a", "b"])]), iter([(1, ["c"])])]
+        mock_find_prs.side_effect = [{"a": [pr(1)], "b": [pr(1)]}, {"c": [pr(2)]}]
+
+        process_repo("kuadrant", Repo("authorino"), detailed=True)
+        data = process_repo("kuadrant", Repo("authorino"), detailed=True)
+
+        assert mock_compare_pages.call_args_list[1].args == (
+            "kuadrant",
+            "authorino",
+            "b",
+            "main",
+            True,
+        )
+        assert mock_find_prs.call_args_list[1].args[2] == ["c"]
+        assert data.github.commit_count == 3
+        assert [p.title for p in data.github.prs] == ["PR 1", "PR 2"]
+
+    @patch("sector.github.find_prs_for_commits")
+    @patch("sector.github.compare_pages")
+    @patch("sector.github.get_release")
+    def test_rewritten_history_recomputes(
+        self,
+        mock_get_release: Mock,
+        mock_compare_pages: Mock,
+        mock_find_prs: Mock,
+        store: StateStore,
+    ) -> None:
+        """Test that everything is looked up again when main no longer contains the last head."""
+
+        def diverged() -> Iterator[tuple[int, list[str]]]:
+            raise ValueError("main is diverged from b")
+            yield
+
+        mock_get_release.return_value = ReleaseData(tag="v1.0.0")
+        store.record("kuadrant", "authorino", "v1.0.0", ["a", "b"], {})
+        mock_compare_pages.side_effect = [diverged(), iter([(2, ["a", "x"])])]
+        mock_find_prs.return_value = {"a": [], "x": [pr(3)]}
+
+        data = process_repo("kuadrant", Repo("authorino"), detailed=True)
+
+        assert mock_compare_pages.call_args_list[1].args[2] == "v1.0.0"
+        assert data.github.commit_count == 2
+        saved = store.get("kuadrant", "authorino", "v1.0.0")
+        assert saved is not None
+        assert saved.head == "x"
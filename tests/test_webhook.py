@@ -0,0 +1,272 @@
+import json
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+import requests
+from click.testing import CliRunner
+
+from sector import bench, client, github, server, state, webhook
+from sector.cache import HttpCache
+from sector.cli import cli
+from sector.github import Data, ReleaseData
+
+SECRET = "It's a Secret to Everybody"
+
+
+def payload(repo: str, owner: str = bench.OWNER, **fields: Any) -> dict[str, Any]:
+    repository = {
+        "name": repo,
+        "owner": {"login": owner},
+        "default_branch": "main",
+    }
+    return {"repository": repository, **fields}
+
+
+def pull_request(number: int, title: str, **fields: Any) -> dict[str, Any]:
+    return {
+        "id": number,
+        "title": title,
+        "html_url": f"https://github.com/bench/bench-1/pull/{number}",
+        **fields,
+    }
+
+
+@pytest.fixture
+def corpus() -> bench.Corpus:
+    return bench.Corpus.generate(repos=2, commits=4)
+
+
+@pytest.fixture
+def secret() -> str | None:
+    return SECRET
+
+
+class TestSignature:
+    """Test the webhook signatures."""
+
+    def test_sign(self) -> None:
+        """Test the example from the GitHub documentation."""
+        assert webhook.sign(SECRET, b"Hello, World!") == (
+            "sha256=757107ea0eb2509fc211221cce984b8a37570b6d7586c22c46f4379c8b043e17"
+        )
+
+    def test_verify(self) -> None:
+        """Test that only the signature made with the secret is accepted."""
+        signature = webhook.sign(SECRET, b"{}")
+
+        assert webhook.verify(SECRET, b"{}", signature)
+        assert not webhook.verify("other", b"{}", signature)
+        assert not webhook.verify(SECRET, b"{ }", signature)
+        assert not webhook.verify(SECRET, b"{}", "")
+
+
+class TestParse:
+    """Test reading the events from webhook payloads."""
+
+    def test_release(self) -> None:
+        """Test that the repo of the event is found."""
+        event = webhook.parse(webhook.RELEASE, payload("bench-1", action="published"))
+
+        assert event is not None
+        assert (event.name, event.owner, event.repo) == ("release", "bench", "bench-1")
+
+    def test_case_insensitive(self) -> None:
+        """Test that the owner and repo are lower case, as GitHub sends the login as spelled."""
+        event = webhook.parse(webhook.RELEASE, payload("Bench-1", owner="Bench"))
+
+        assert event is not None
+        assert (event.owner, event.repo) == ("bench", "bench-1")
+
+    def test_ignored(self) -> None:
+        """Test that events which do not change any data are ignored."""
+        assert webhook.parse("ping", {"zen": "Keep it logically awesome."}) is None
+        assert webhook.parse("issues", payload("bench-1")) is None
+        assert (
+            webhook.parse(webhook.PUSH, payload("bench-1", ref="refs/heads/feature"))
+            is None
+        )
+        assert webhook.parse(webhook.PUSH, payload("bench-1", ref="refs/heads/main"))
+
+
+class TestInvalidate:
+    """Test dropping the data made stale by an event."""
+
+    def test_cache(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that only the responses of the repo which can change are dropped."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+        client.configure(cache=True)
+        cache = HttpCache()
+        urls = {
+            "/repos/bench/bench-1/releases/latest": False,
+            "/repos/Bench/Bench-1/contents/release.yaml?ref=main": False,
+            "/repos/bench/bench-1/releases/tags/v1.0.0": True,
+            "/repos/bench/bench-10/releases/latest": False,
+        }
+        for url, immutable in urls.items():
+            response = requests.Response()
+            response.url = f"https://api.github.com{url}"
+            response._content = b"{}"
+            cache.put(url, response, immutable)
+
+        webhook.invalidate(webhook.Event("release", "bench", "bench-1", {}))
+
+        assert [url for url in urls if cache.get(url) is not None] == [
+            "/repos/bench/bench-1/releases/tags/v1.0.0",
+            "/repos/bench/bench-10/releases/latest",
+        ]
+
+    def test_state(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a release drops the state and a pull request is updated in place."""
+        monkeypatch.setenv("GITHUB_TOKEN", "test")
+        store = state.enable(tmp_path / "state.sqlite")
+        store.record(
+            "bench", "bench-1", "v1.0.0", ["a", "b"], {"a": [pull_request(1, "Old")]}
+        )
+        # Kept as the owner was spelled, the event is always lower case.
+        store.record("Bench", "Bench-2", "v1.0.0", ["c"], {"c": []})
+        try:
+            webhook.invalidate(
+                webhook.Event(
+                    "pull_request",
+                    "bench",
+                    "bench-1",
+                    payload("bench-1", pull_request=pull_request(1, "New")),
+                )
+            )
+            webhook.invalidate(webhook.Event("release", "bench", "bench-2", {}))
+
+            previous = store.load("bench", "bench-1")
+            assert previous is not None
+            assert previous.prs == {"a": [pull_request(1, "New")]}
+            assert store.load("Bench", "Bench-2") is None
+        finally:
+            state.disable()
+
+    def test_merged_pull_request(self, tmp_path: Path) -> None:
+        """Test that a merged pull request is added to its merge commit."""
+        store = state.StateStore(tmp_path / "state.sqlite")
+        store.record("bench", "bench-1", "v1.0.0", ["a", "b"], {"a": [], "b": []})
+        merged = pull_request(2, "Merged", merged=True, merge_commit_sha="b")
+
+        webhook.update_prs(store, "bench", "bench-1", merged)
+
+        previous = store.load("bench", "bench-1")
+        assert previous is not None
+        assert previous.prs == {"a": [], "b": [pull_request(2, "Merged")]}
+
+
+class TestDaemonWebhook:
+    """Test the webhook endpoint of the daemon."""
+
+    def test_release_updates_answer(
+        self, daemon: server.Server, fixtures: bench.FixtureServer
+    ) -> None:
+        """Test that only the repo of the event is looked up again."""
+        query = {
+            "owner": "bench",
+            "projects": ["bench-1", "bench-operator"],
+            "detailed": False,
+        }
+        answer = daemon.daemon.ask(server.FUTURE, query)
+        release = fixtures.corpus.routes["/repos/bench/bench-1/releases/latest"]
+        release["tag_name"] = "v1.1.0"
+        fixtures.requests.clear()
+        body = json.dumps(payload("bench-1", action="published")).encode()
+
+        status, reply = daemon.receive("release", body, webhook.sign(SECRET, body))
+        daemon.daemon.wait()
+
+        assert (status, reply) == (202, {"event": "release", "repo": "bench/bench-1"})
+        assert [r["github"]["tag"] for r in answer.document["repos"]] == [
+            "v1.1.0",
+            "v1.0.0",
+        ]
+        assert fixtures.requests == {"releases": 1}
+
+    def test_other_owner_updates_answer(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a dependency of another owner in a current answer is looked up again."""
+        daemon = server.Daemon()
+        records = [
+            {
+                "owner": "bench",
+                "project": "bench-operator",
+                "github": {"tag": "v1.0.0"},
+            },
+            {"owner": "envoyproxy", "project": "envoy", "github": {"tag": "v1.30.0"}},
+        ]
+        daemon.answers["current"] = server.Answer(
+            server.CURRENT, {"owner": "bench"}, {"repos": records}
+        )
+        data = Data("envoyproxy", "envoy", ReleaseData(tag="v1.30.0"))
+        process_repo = Mock(return_value=data)
+        monkeypatch.setattr(github, "process_repo", process_repo)
+
+        daemon.update(webhook.Event("push", "envoyproxy", "envoy", {}))
+
+        process_repo.assert_called_once()
+        assert process_repo.call_args.args[0] == "envoyproxy"
+        assert daemon.answers["current"].document["repos"][1]["owner"] == "envoyproxy"
+
+    def test_mixed_case_login(
+        self, daemon: server.Server, fixtures: bench.FixtureServer
+    ) -> None:
+        """Test that an answer for an owner is updated by a delivery naming it in another case."""
+        query = {"owner": "bench", "projects": ["bench-1"], "detailed": False}
+        answer = daemon.daemon.ask(server.FUTURE, query)
+        release = fixtures.corpus.routes["/repos/bench/bench-1/releases/latest"]
+        release["tag_name"] = "v1.1.0"
+        body = json.dumps(
+            payload("Bench-1", owner="Bench", action="published")
+        ).encode()
+
+        status, reply = daemon.receive("release", body, webhook.sign(SECRET, body))
+        daemon.daemon.wait()
+
+        assert (status, reply) == (202, {"event": "release", "repo": "bench/bench-1"})
+        assert answer.document["repos"][0]["github"]["tag"] == "v1.1.0"
+
+    def test_rejected(self, daemon: server.Server) -> None:
+        """Test that a delivery with a wrong signature is turned away."""
+        body = json.dumps(payload("bench-1")).encode()
+
+        status, _ = daemon.receive("release", body, webhook.sign("other", body))
+
+        assert status == 401
+
+    def test_disabled(self, fixtures: bench.FixtureServer) -> None:
+        """Test that webhooks are not accepted without a secret."""
+        with server.Server(server.Daemon()) as running:
+            status, _ = running.receive("release", b"{}", webhook.sign(SECRET, b"{}"))
+
+        assert status == 404
+
+    def test_replay(
+        self, daemon: server.Server, fixtures: bench.FixtureServer, tmp_path: Path
+    ) -> None:
+        """Test that captured payloads are delivered to the running daemon."""
+        query = {"owner": "bench", "projects": ["bench-1"], "detailed": True}
+        answer = daemon.daemon.ask(server.FUTURE, query)
+        updated_at = answer.updated_at
+        path = tmp_path / "push.json"
+        path.write_text(json.dumps(payload("bench-1", ref="refs/heads/main")))
+        ping = tmp_path / "ping.json"
+        ping.write_text(json.dumps({"zen": "Design for failure."}))
+
+        runner = CliRunner()
+        result = runner.invoke(
+            cli,
+            ["replay", "--event", "push", str(path)],
+            env={"SECTOR_WEBHOOK_SECRET": SECRET},
+        )
+        daemon.daemon.wait()
+        ignored = runner.invoke(
+            cli, ["replay", "--event", "ping", "--webhook-secret", SECRET, str(ping)]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "bench/bench-1" in result.stdout
+        assert answer.updated_at > updated_at
+        assert "ignored" in ignored.stdout